@@ -15,6 +15,7 @@
 # limitations under the License.
 #
 
+import base64
 import os
 import mimetypes
 
@@ -149,6 +150,10 @@ class StreamingResponseAPIView(APIView):
         response = StreamingHttpResponse(generator, content_type=mimetype)
         if file_size:
             response['Content-Length'] = file_size
+        hash_sum = getattr(generator, 'hash_sum', None)
+        if hash_sum:
+            # RFC 3230 instance digest
+            response['Digest'] = 'md5={}'.format(base64.b64encode(bytes.fromhex(hash_sum)).decode())
         response['Content-Disposition'] = 'attachment; filename="{}"'.format(file_name)
         return response
 
@@ -204,6 +204,7 @@ REPORT_ARCHIVE = {
     'verifier_files': 'VerifierFiles.zip',
     'error_trace': 'ErrorTrace.zip',
     'original_sources': 'OriginalSources.zip',
+    'original_source_file': 'OriginalSourceFile.zip',
     'additional_sources': 'AdditionalSources.zip',
     'problem_description': 'ProblemDescription.zip'
 }
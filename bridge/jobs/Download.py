@@ -168,6 +168,9 @@ class JobArchiveGenerator:
             qs_filter = Q(reportcomponent__decision__job_id=self.job.id)
         sources = {}
         for src_arch in OriginalSources.objects.filter(qs_filter):
+            # Original sources uploaded by source files do not have the single archive until the first download.
+            if not src_arch.archive:
+                src_arch.compose_archive()
             sources[src_arch.identifier] = src_arch.archive.name
             self._arch_files.add((src_arch.archive.path, src_arch.archive.name))
         return self.__get_json(sources)
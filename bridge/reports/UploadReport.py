@@ -20,6 +20,7 @@ import json
 import time
 import zipfile
 from collections import OrderedDict
+from io import BytesIO
 
 from django.core.files import File
 from django.db import transaction
@@ -34,7 +35,7 @@ from bridge.utils import logger, extract_archive
 
 from reports.models import (
     ReportComponent, ReportSafe, ReportUnsafe, ReportUnknown, ReportAttr, ReportComponentLeaf,
-    CoverageArchive, AttrFile, Computer, OriginalSources, AdditionalSources, DecisionCache
+    CoverageArchive, AttrFile, Computer, OriginalSources, OriginalSourceFile, AdditionalSources, DecisionCache
 )
 from service.models import Task
 from caches.models import ReportSafeCache, ReportUnsafeCache, ReportUnknownCache
@@ -873,3 +874,55 @@ class UploadReports:
                 time.sleep(0.1)
                 cnt += 1
         return False
+
+
+class UploadOriginalSources:
+    """
+    Compose original sources from source files and their cross references that were uploaded before and from new ones.
+    Original sources of different jobs usually differ in a few source files, so Klever Core uploads just them.
+    """
+
+    def __init__(self, identifier):
+        self.identifier = identifier
+
+    def upload(self, hash_sums, new_files, archive):
+        if OriginalSources.objects.filter(identifier=self.identifier).exists():
+            # Klever Core expects the same error as for uploading the whole original sources archive.
+            raise exceptions.ValidationError({
+                'identifier': ['original sources with this identifier already exists.']
+            })
+
+        self.__upload_files(new_files, archive)
+
+        src_files_ids = list(OriginalSourceFile.objects.filter(hash_sum__in=hash_sums).values_list('id', flat=True))
+        missing_num = len(set(hash_sums)) - len(src_files_ids)
+        if missing_num:
+            raise exceptions.ValidationError({
+                'hash_sums': ['{} source files were not uploaded'.format(missing_num)]
+            })
+
+        # Original sources are not composed into the single archive since source files are got from their own
+        # archives.
+        with transaction.atomic():
+            src_obj = OriginalSources.objects.create(identifier=self.identifier)
+            src_obj.files.add(*src_files_ids)
+
+    def __upload_files(self, new_files, archive):
+        if not new_files:
+            return
+
+        with zipfile.ZipFile(archive) as zfp:
+            for hash_sum, file_names in new_files.items():
+                # Source files could be uploaded for other original sources in the meantime.
+                if OriginalSourceFile.objects.filter(hash_sum=hash_sum).exists():
+                    continue
+
+                content = BytesIO()
+                with zipfile.ZipFile(content, mode='w', compression=zipfile.ZIP_DEFLATED) as src_zfp:
+                    for file_name in file_names:
+                        src_zfp.writestr(file_name, zfp.read(file_name))
+                content.seek(0)
+
+                # Klever Core puts the source file name before the name of its index data.
+                src_file = OriginalSourceFile(hash_sum=hash_sum, name=file_names[0])
+                src_file.add_archive(content, save=True)
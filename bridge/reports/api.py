@@ -15,6 +15,7 @@
 # limitations under the License.
 #
 
+import gzip
 import json
 
 from django.http import HttpResponse
@@ -37,14 +38,16 @@ from bridge.CustomViews import TemplateAPIRetrieveView
 from tools.profiling import LoggedCallMixin
 
 from jobs.models import Decision
-from reports.models import Report, ReportComponent, OriginalSources, CoverageArchive, ReportAttr, CompareDecisionsInfo
+from reports.models import (
+    Report, ReportComponent, OriginalSources, OriginalSourceFile, CoverageArchive, ReportAttr, CompareDecisionsInfo
+)
 
 from jobs.utils import JobAccess, DecisionAccess
 from reports.comparison import FillComparisonCache, ComparisonData
 from reports.coverage import GetCoverageData, ReportCoverageStatistics
 from reports.serializers import OriginalSourcesSerializer, PatchReportAttrSerializer
 from reports.source import GetSource
-from reports.UploadReport import UploadReports
+from reports.UploadReport import UploadReports, UploadOriginalSources
 
 
 class FillComparisonView(LoggedCallMixin, APIView):
@@ -102,6 +105,36 @@ class UploadOriginalSourcesView(LoggedCallMixin, CreateAPIView):
     permission_classes = (ServicePermission,)
 
 
+class MissingOriginalSourceFilesView(LoggedCallMixin, APIView):
+    permission_classes = (ServicePermission,)
+
+    def post(self, request):
+        if 'hash_sums' not in request.FILES:
+            raise exceptions.APIException('Provide hash sums of source files')
+        # Klever Core uploads hash sums as compressed JSON since there may be too many of them for form fields
+        hash_sums = json.loads(gzip.decompress(request.FILES['hash_sums'].read()).decode('utf8'))
+        existing = set(OriginalSourceFile.objects.filter(hash_sum__in=hash_sums).values_list('hash_sum', flat=True))
+        return Response({'missing': [hash_sum for hash_sum in hash_sums if hash_sum not in existing]})
+
+
+class UploadOriginalSourceFilesView(LoggedCallMixin, APIView):
+    unparallel = ['OriginalSources', 'OriginalSourceFile']
+    permission_classes = (ServicePermission,)
+
+    def post(self, request):
+        if 'identifier' not in request.data:
+            raise exceptions.APIException('Provide "identifier" of original sources')
+        # Klever Core uploads hash sums and names of new source files as compressed JSON since there may be too many of
+        # them for form fields
+        for arg in ('hash_sums', 'new_files'):
+            if arg not in request.FILES:
+                raise exceptions.APIException('Provide "{}" of original sources'.format(arg))
+        hash_sums, new_files = (json.loads(gzip.decompress(request.FILES[arg].read()).decode('utf8'))
+                                for arg in ('hash_sums', 'new_files'))
+        UploadOriginalSources(request.data['identifier']).upload(hash_sums, new_files, request.FILES.get('archive'))
+        return Response({})
+
+
 class UploadReportView(LoggedCallMixin, APIView):
     permission_classes = (ServicePermission,)
 
@@ -113,7 +146,12 @@ class UploadReportView(LoggedCallMixin, APIView):
         reports_uploader = UploadReports(decision)
         if 'archives' in request.POST:
             reports_uploader.validate_archives(json.loads(request.POST['archives']), request.FILES)
-        reports_uploader.upload_all(json.loads(request.POST['reports']))
+        if 'reports' in request.FILES:
+            # Klever Core uploads reports as compressed JSON
+            reports = json.loads(gzip.decompress(request.FILES['reports'].read()).decode('utf8'))
+        else:
+            reports = json.loads(request.POST['reports'])
+        reports_uploader.upload_all(reports)
         return Response({})
 
 
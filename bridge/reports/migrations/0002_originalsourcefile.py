@@ -0,0 +1,26 @@
+from django.db import migrations, models
+
+import bridge.utils
+
+
+class Migration(migrations.Migration):
+    dependencies = [('reports', '0001_initial')]
+
+    operations = [
+        migrations.CreateModel(
+            name='OriginalSourceFile',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('hash_sum', models.CharField(db_index=True, max_length=255, unique=True)),
+                ('name', models.CharField(db_index=True, max_length=1024)),
+                ('archive', models.FileField(upload_to='OriginalSourceFiles')),
+            ],
+            options={'db_table': 'report_original_source_file'},
+            bases=(bridge.utils.WithFilesMixin, models.Model),
+        ),
+        migrations.AddField(
+            model_name='originalsources',
+            name='files',
+            field=models.ManyToManyField(to='reports.OriginalSourceFile'),
+        ),
+    ]
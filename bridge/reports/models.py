@@ -16,6 +16,8 @@
 #
 
 import os
+import tempfile
+import zipfile
 
 from django.conf import settings
 from django.contrib.contenttypes.fields import GenericForeignKey, GenericRelation
@@ -36,6 +38,7 @@ from service.models import Decision
 
 MAX_COMPONENT_LEN = 20
 ORIGINAL_SOURCES_DIR = 'OriginalSources'
+ORIGINAL_SOURCE_FILES_DIR = 'OriginalSourceFiles'
 COVERAGE_STAT_COLOR = ['#f18fa6', '#f1c0b2', '#f9e19b', '#e4f495', '#acf1a8']
 
 
@@ -119,15 +122,48 @@ class Computer(models.Model):
         db_table = 'computer'
 
 
+class OriginalSourceFile(WithFilesMixin, models.Model):
+    # Original source file and its cross references are stored separately to share them between original sources.
+    # Klever Core calculates hash sums by contents of source files and all data affecting their cross references.
+    hash_sum = models.CharField(max_length=255, unique=True, db_index=True)
+    # Name of the source file within original sources. Its archive contains also index data of the source file.
+    name = models.CharField(max_length=1024, db_index=True)
+    archive = models.FileField(upload_to=ORIGINAL_SOURCE_FILES_DIR)
+
+    def add_archive(self, fp, save=False):
+        self.archive.save(REPORT_ARCHIVE['original_source_file'], File(fp), save)
+        if not os.path.isfile(os.path.join(settings.MEDIA_ROOT, self.archive.name)):
+            raise RuntimeError('OriginalSourceFile.archive was not saved')
+
+    class Meta:
+        db_table = 'report_original_source_file'
+
+
 class OriginalSources(WithFilesMixin, models.Model):
     identifier = models.CharField(max_length=128, unique=True, db_index=True)
+    # Original sources uploaded by source files do not have this archive. Source files are got from archives of
+    # particular source files instead.
     archive = models.FileField(upload_to=ORIGINAL_SOURCES_DIR)
+    files = models.ManyToManyField(OriginalSourceFile)
 
     def add_archive(self, fp, save=False):
         self.archive.save(REPORT_ARCHIVE['original_sources'], File(fp), save)
         if not os.path.isfile(os.path.join(settings.MEDIA_ROOT, self.archive.name)):
             raise RuntimeError('OriginalSources.archive was not saved')
 
+    def compose_archive(self):
+        # This duplicates archives of source files, so do this just when the whole archive is required, i.e. for
+        # downloading jobs. The archive is kept for following downloads and it is removed together with original
+        # sources.
+        with tempfile.TemporaryFile() as fp:
+            with zipfile.ZipFile(fp, mode='w', compression=zipfile.ZIP_DEFLATED) as zfp:
+                for src_file in self.files.all():
+                    with zipfile.ZipFile(src_file.archive.path) as src_zfp:
+                        for zinfo in src_zfp.infolist():
+                            zfp.writestr(zinfo, src_zfp.read(zinfo))
+            fp.seek(0)
+            self.add_archive(fp, save=True)
+
     class Meta:
         db_table = 'report_original_sources'
         ordering = ('identifier',)
@@ -394,6 +430,7 @@ class SourceCodeCache(WithFilesMixin, models.Model):
 
 post_delete.connect(remove_instance_files, sender=AttrFile)
 post_delete.connect(remove_instance_files, sender=OriginalSources)
+post_delete.connect(remove_instance_files, sender=OriginalSourceFile)
 post_delete.connect(remove_instance_files, sender=AdditionalSources)
 post_delete.connect(remove_instance_files, sender=ReportComponent)
 post_delete.connect(remove_instance_files, sender=ReportUnsafe)
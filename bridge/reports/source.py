@@ -314,9 +314,16 @@ class ParseSource:
             return None
         return res.content.decode('utf8')
 
+    def __get_original_sources(self, original_sources):
+        # Original sources uploaded by source files do not have the single archive. The source file and its index data
+        # are got from the archive of the particular source file.
+        if original_sources is None or original_sources.archive:
+            return original_sources
+        return original_sources.files.filter(name=self.file_name).only('archive').first()
+
     def __get_source_code(self):
         for report in self._ancestors:
-            for file_obj in [report.additional_sources, report.original_sources]:
+            for file_obj in [report.additional_sources, self.__get_original_sources(report.original_sources)]:
                 content = self.__extract_file(file_obj, self.file_name)
                 if content:
                     return content
@@ -326,7 +333,7 @@ class ParseSource:
     def _indexes(self):
         index_name = self.file_name + self.index_postfix
         for report in self._ancestors:
-            for file_obj in [report.additional_sources, report.original_sources]:
+            for file_obj in [report.additional_sources, self.__get_original_sources(report.original_sources)]:
                 content = self.__extract_file(file_obj, index_name)
                 if content:
                     index_data = json.loads(content)
@@ -17,12 +17,15 @@
 
 import os
 import re
+import gzip
 import json
 from multiprocessing import Process, Pipe
 import random
 import requests
 import time
+import zipfile
 from io import BytesIO
+from types import SimpleNamespace
 
 from django.conf import settings
 from django.core.exceptions import ObjectDoesNotExist
@@ -30,9 +33,14 @@ from django.db.models import Q
 from django.test import Client
 from django.urls import reverse
 
-from bridge.vars import SCHEDULER_TYPE, JOB_ROLES
+from bridge.vars import SCHEDULER_TYPE, JOB_ROLES, USER_ROLES, ETV_FORMAT
 from bridge.utils import KleverTestCase, logger, RMQConnect
 
+from users.models import User
+from reports.models import OriginalSources, OriginalSourceFile
+from reports.source import ParseSource, SourceNotFound
+from tools.utils import ClearFiles, objects_without_relations
+
 
 LINUX_ATTR = {'name': 'Linux kernel', 'value': [
     {'name': 'Version', 'value': '3.5.0'},
@@ -1042,6 +1050,98 @@ class TestReports(KleverTestCase):
         super().tearDown()
 
 
+class TestOriginalSourceFiles(KleverTestCase):
+    def setUp(self):
+        super().setUp()
+        self.client.force_login(User.objects.create_user('service', password='service', role=USER_ROLES[4][0]))
+        self.__add_source_file('hash1', 'a.c', {'a.c': 'int a;', 'a.c.idx.json': '{}'})
+
+    def test_missing_source_files(self):
+        response = self.client.post('/reports/api/missing-source-files/', {
+            'hash_sums': self.__get_compressed_json(['hash1', 'hash2'])
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {'missing': ['hash2']})
+
+    def test_upload_source_files(self):
+        index = json.dumps({'format': ETV_FORMAT, 'highlight': []})
+        response = self.__upload('sources', ['hash1', 'hash2'], {'hash2': ['b.c', 'b.c.idx.json']},
+                                 {'b.c': 'int b;', 'b.c.idx.json': index, 'c.c': 'int c;'})
+        self.assertEqual(response.status_code, 200)
+        src_obj = OriginalSources.objects.get(identifier='sources')
+        self.assertEqual(set(src_obj.files.values_list('hash_sum', 'name')), {('hash1', 'a.c'), ('hash2', 'b.c')})
+        with zipfile.ZipFile(src_obj.files.get(hash_sum='hash2').archive.path) as zfp:
+            self.assertEqual(set(zfp.namelist()), {'b.c', 'b.c.idx.json'})
+
+        # Source files and their index data are got from archives of particular source files.
+        self.assertFalse(src_obj.archive)
+        ancestors = [SimpleNamespace(additional_sources=None, original_sources=src_obj)]
+        src = ParseSource(None, 'b.c', ancestors, [], False)
+        self.assertEqual(src.file_content, 'int b;')
+        self.assertEqual(src._indexes, json.loads(index))
+        with self.assertRaises(SourceNotFound):
+            ParseSource(None, 'c.c', ancestors, [], False)
+
+        # The whole archive is composed for downloading jobs.
+        src_obj.compose_archive()
+        src_obj.refresh_from_db()
+        with zipfile.ZipFile(src_obj.archive.path) as zfp:
+            self.assertEqual(set(zfp.namelist()), {'a.c', 'a.c.idx.json', 'b.c', 'b.c.idx.json'})
+            self.assertEqual(zfp.read('b.c'), b'int b;')
+
+    def test_upload_existing_source_files(self):
+        self.assertEqual(self.__upload('sources', ['hash1'], {}).status_code, 200)
+        response = self.__upload('sources', ['hash1'], {})
+        self.assertEqual(response.status_code, 400)
+        # Klever Core ignores just this error.
+        self.assertEqual(response.json(), {'identifier': ['original sources with this identifier already exists.']})
+
+    def test_upload_missing_source_files(self):
+        response = self.__upload('sources', ['hash1', 'hash2'], {})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('hash_sums', response.json())
+        self.assertFalse(OriginalSources.objects.filter(identifier='sources').exists())
+
+    def test_clear_source_files(self):
+        self.__add_source_file('hash2', 'b.c', {'b.c': 'int b;'})
+        self.assertEqual(self.__upload('sources', ['hash1'], {}).status_code, 200)
+        self.assertEqual(list(objects_without_relations(OriginalSourceFile).values_list('hash_sum', flat=True)),
+                         ['hash2'])
+
+        # Original sources are not referred by reports, so both they and their source files are removed.
+        archive = OriginalSourceFile.objects.get(hash_sum='hash1').archive.path
+        ClearFiles()
+        self.assertFalse(OriginalSources.objects.exists())
+        self.assertFalse(OriginalSourceFile.objects.exists())
+        self.assertFalse(os.path.exists(archive))
+
+    def __add_source_file(self, hash_sum, name, files):
+        src_file = OriginalSourceFile(hash_sum=hash_sum, name=name)
+        src_file.add_archive(self.__get_archive(files), save=True)
+
+    def __get_archive(self, files):
+        archive = BytesIO()
+        with zipfile.ZipFile(archive, mode='w') as zfp:
+            for name, content in files.items():
+                zfp.writestr(name, content)
+        archive.seek(0)
+        archive.name = 'original sources.zip'
+        return archive
+
+    def __get_compressed_json(self, data):
+        content = BytesIO(gzip.compress(json.dumps(data).encode('utf8')))
+        content.name = 'data'
+        return content
+
+    def __upload(self, identifier, hash_sums, new_files, files=None):
+        return self.client.post('/reports/api/upload-source-files/', {
+            'identifier': identifier,
+            'hash_sums': self.__get_compressed_json(hash_sums),
+            'new_files': self.__get_compressed_json(new_files),
+            'archive': self.__get_archive(files or {})
+        })
+
+
 class ResponseError(Exception):
     pass
 
@@ -52,6 +52,8 @@ urlpatterns = [
     # Utils
     path('api/has-sources/', api.HasOriginalSources.as_view()),
     path('api/upload-sources/', api.UploadOriginalSourcesView.as_view()),
+    path('api/missing-source-files/', api.MissingOriginalSourceFilesView.as_view()),
+    path('api/upload-source-files/', api.UploadOriginalSourceFilesView.as_view()),
     path('api/upload/<uuid:decision_uuid>/', api.UploadReportView.as_view()),
     path('api/report-attr/<uuid:decision>/', api.UpdateReportAttrView.as_view()),
     path('api/clear-verification-files/<int:decision_id>/', api.ClearVerificationFilesView.as_view(),
@@ -15,6 +15,8 @@
 # limitations under the License.
 #
 
+import json
+
 from rest_framework import exceptions
 from rest_framework.generics import (
     get_object_or_404, RetrieveAPIView, CreateAPIView, RetrieveDestroyAPIView, RetrieveUpdateAPIView
@@ -63,7 +65,12 @@ class TaskAPIViewset(LoggedCallMixin, ModelViewSet):
 
     def filter_queryset(self, queryset):
         if 'job' in self.request.query_params:
-            return queryset.filter(decision__identifier=self.request.query_params['job'])
+            queryset = queryset.filter(decision__identifier=self.request.query_params['job'])
+            if 'finished_after' in self.request.query_params:
+                # Get just tasks that were finished after the given finish index
+                queryset = queryset.filter(finish_index__gt=int(self.request.query_params['finished_after']))\
+                    .order_by('finish_index')
+            return queryset
         return super().filter_queryset(queryset)
 
     def perform_destroy(self, instance):
@@ -75,6 +82,28 @@ class TaskAPIViewset(LoggedCallMixin, ModelViewSet):
         instance.delete()
 
 
+class RemoveTasksView(LoggedCallMixin, APIView):
+    unparallel = [Decision]
+    permission_classes = (ServicePermission,)
+
+    def post(self, request):
+        if 'ids' not in request.data:
+            raise exceptions.ValidationError({'ids': 'Tasks identifiers are required'})
+        tasks_ids = set(int(task_id) for task_id in json.loads(request.data['ids']))
+        tasks_qs = Task.objects.filter(id__in=tasks_ids)
+        if len(tasks_qs) != len(tasks_ids):
+            raise exceptions.ValidationError({'ids': 'Some of the tasks were not found'})
+
+        solved_ids = set(Solution.objects.filter(task_id__in=tasks_ids).values_list('task_id', flat=True))
+        for task in tasks_qs:
+            if task.status not in {TASK_STATUS[2][0], TASK_STATUS[3][0], TASK_STATUS[4][0]}:
+                raise exceptions.ValidationError({'status': 'The task {} is not finished'.format(task.id)})
+            if task.status == TASK_STATUS[2][0] and task.id not in solved_ids:
+                raise exceptions.ValidationError({'solution': 'The task {} solution was not uploaded'.format(task.id)})
+        tasks_qs.delete()
+        return Response({})
+
+
 class DownloadTaskArchiveView(StreamingResponseAPIView):
     permission_classes = (ServicePermission,)
 
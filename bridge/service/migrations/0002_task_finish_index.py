@@ -0,0 +1,12 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [('service', '0001_initial')]
+
+    operations = [
+        migrations.AddField(
+            model_name='task', name='finish_index',
+            field=models.PositiveIntegerField(db_index=True, null=True),
+        ),
+    ]
@@ -0,0 +1,12 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [('service', '0002_task_finish_index')]
+
+    operations = [
+        migrations.AddField(
+            model_name='solution', name='hash_sum',
+            field=models.CharField(max_length=255, null=True),
+        ),
+    ]
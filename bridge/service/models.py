@@ -77,6 +77,8 @@ class Task(WithFilesMixin, models.Model):
     filename = models.CharField(max_length=256)
     archive = models.FileField(upload_to=SERVICE_DIR)
     description = JSONField()
+    # Sequential number of the task among finished tasks of the decision
+    finish_index = models.PositiveIntegerField(null=True, db_index=True)
 
     class Meta:
         db_table = 'task'
@@ -87,6 +89,7 @@ class Solution(WithFilesMixin, models.Model):
     task = models.OneToOneField(Task, models.CASCADE, related_name='solution')
     filename = models.CharField(max_length=256)
     archive = models.FileField(upload_to=SERVICE_DIR)
+    hash_sum = models.CharField(max_length=255, null=True)
     description = JSONField()
 
     class Meta:
@@ -26,7 +26,7 @@ from django.utils.translation import ugettext_lazy as _
 from rest_framework import serializers, exceptions, fields
 
 from bridge.vars import DECISION_STATUS, PRIORITY, SCHEDULER_TYPE, SCHEDULER_STATUS, TASK_STATUS
-from bridge.utils import logger, require_lock, RMQConnect
+from bridge.utils import logger, require_lock, RMQConnect, file_checksum
 from bridge.serializers import TimeStampField, DynamicFieldsModelSerializer
 
 from users.models import SchedulerUser
@@ -208,6 +208,12 @@ class TaskSerializer(DynamicFieldsModelSerializer):
         old_status = instance.status
         instance = super().update(instance, validated_data)
         self.update_decision(instance.decision, instance.status, old_status=old_status)
+        if instance.status in {TASK_STATUS[2][0], TASK_STATUS[3][0]}:
+            # Counters of finished tasks never decrease and tasks are updated unparallel,
+            # so the index can be used by clients as a cursor for getting status changes.
+            instance.finish_index = instance.decision.tasks_finished + instance.decision.tasks_error + \
+                instance.decision.tasks_cancelled
+            instance.save(update_fields=['finish_index'])
         on_task_change(instance.id, instance.status, instance.decision.scheduler.type)
         return instance
 
@@ -236,6 +242,8 @@ class SolutionSerializer(DynamicFieldsModelSerializer):
     def create(self, validated_data):
         # Set file name
         validated_data['filename'] = validated_data['archive'].name[:256]
+        # Clients check downloaded solutions with this checksum instead of testing archives
+        validated_data['hash_sum'] = file_checksum(validated_data['archive'])
 
         # Get and validate decision
         decision = Decision.objects.only('id', 'status').get(id=validated_data['task'].decision_id)
@@ -260,7 +268,7 @@ class SolutionSerializer(DynamicFieldsModelSerializer):
 
     class Meta:
         model = Solution
-        exclude = ('decision', 'filename')
+        exclude = ('decision', 'filename', 'hash_sum')
         extra_kwargs = {'archive': {'write_only': True}}
 
 
@@ -246,4 +246,5 @@ class SolutionArchiveGenerator(FileWrapper):
         self._solution = solution
         self.size = len(self._solution.archive)
         self.name = self._solution.filename
+        self.hash_sum = self._solution.hash_sum
         super().__init__(self._solution.archive, 8192)
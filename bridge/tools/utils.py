@@ -41,7 +41,8 @@ from marks.models import (
 )
 from reports.models import (
     ReportComponent, ReportSafe, ReportUnsafe, ReportUnknown, ReportComponentLeaf,
-    CoverageArchive, OriginalSources, DecisionCache, SourceCodeCache, ORIGINAL_SOURCES_DIR
+    CoverageArchive, OriginalSources, OriginalSourceFile, DecisionCache, SourceCodeCache, ORIGINAL_SOURCES_DIR,
+    ORIGINAL_SOURCE_FILES_DIR
 )
 from marks.tasks import connect_safe_report, connect_unsafe_report, connect_unknown_report
 
@@ -52,7 +53,7 @@ from reports.coverage import FillCoverageStatistics
 def objects_without_relations(table):
     filters = {}
     for rel in [f for f in getattr(table, '_meta').get_fields()
-                if (f.one_to_one or f.one_to_many) and f.auto_created and not f.concrete]:
+                if (f.one_to_one or f.one_to_many or f.many_to_many) and f.auto_created and not f.concrete]:
         accessor_name = rel.get_accessor_name()
         if not rel.related_name and accessor_name.endswith('_set'):
             accessor_name = accessor_name[:-4]
@@ -83,6 +84,8 @@ class ClearFiles:
     def __init__(self):
         self.__clear_files_with_ref(JobFile, JOBFILE_DIR)
         self.__clear_files_with_ref(OriginalSources, ORIGINAL_SOURCES_DIR)
+        # Source files are shared between original sources, so remove them after all original sources referring them.
+        self.__clear_files_with_ref(OriginalSourceFile, ORIGINAL_SOURCE_FILES_DIR)
         self.__clear_files_with_ref(ConvertedTrace, CONVERTED_DIR)
         self.__clear_service_files()
 
@@ -107,7 +110,8 @@ class ClearFiles:
     def __files_paths(self, instance):
         paths_list = []
         for field in getattr(instance, '_meta').fields:
-            if isinstance(field, FileField):
+            # Archives of original sources uploaded by source files are composed just when jobs are downloaded.
+            if isinstance(field, FileField) and getattr(instance, field.name):
                 paths_list.append(getattr(instance, field.name).path)
         return paths_list
 
@@ -38,7 +38,7 @@ from bridge.utils import logger, BridgeException
 from bridge.access import ManagerPermission
 
 from jobs.models import JobFile, Decision
-from reports.models import Computer, OriginalSources, CompareDecisionsInfo
+from reports.models import Computer, OriginalSources, OriginalSourceFile, CompareDecisionsInfo
 from marks.models import ConvertedTrace
 from service.models import Task
 from tools.models import LockTable
@@ -72,7 +72,7 @@ class ManagerPageView(LoginRequiredMixin, TemplateView):
 
 
 class ClearSystemAPIView(LoggedCallMixin, APIView):
-    unparallel = [JobFile, OriginalSources, ConvertedTrace, Computer]
+    unparallel = [JobFile, OriginalSources, OriginalSourceFile, ConvertedTrace, Computer]
     permission_classes = (ManagerPermission,)
 
     def post(self, request):
@@ -18,6 +18,7 @@
 import glob
 import json
 import multiprocessing
+import multiprocessing.connection
 import os
 import shutil
 import signal
@@ -162,16 +163,16 @@ def launch_workers(logger, workers, monitoring_list=None):
             w.start()
 
         logger.info('Wait for components')
-        while True:
-            operating_subcomponents_num = 0
-
-            for p in workers:
-                p.join(1.0 / len(workers))
-                operating_subcomponents_num += p.is_alive()
+        operating_subcomponents = list(workers)
+        while operating_subcomponents:
+            # Sleep until some of workers or monitored components exits.
+            multiprocessing.connection.wait([p.sentinel for p in operating_subcomponents] +
+                                            get_sentinels(monitoring_list))
+
+            for p in [p for p in operating_subcomponents if not p.is_alive()]:
+                operating_subcomponents.remove(p)
+                p.join()
             check_components(logger, monitoring_list)
-
-            if not operating_subcomponents_num:
-                break
     finally:
         for p in workers:
             if p.is_alive():
@@ -197,42 +198,20 @@ def launch_queue_workers(logger, queue, constructor, number, fail_tolerant, moni
     elements = []
     components = []
     ret = 0
+    # It is possible to wait for new elements just for multiprocessing.Queue. Other queues are polled.
+    reader = getattr(queue, '_reader', None)
     try:
         while True:
             # Fetch all new elements
             if active:
                 active = klever.core.utils.drain_queue(elements, queue)
 
-            # Then run new workers
-            diff = number - len(components)
-            if len(components) < number and len(elements) > 0:
-                logger.debug("Going to start {} new workers".format(diff))
-                for _ in range(min(number - len(components), len(elements))):
-                    element = elements.pop(0)
-                    worker = constructor(element)
-                    if isinstance(worker, Component):
-                        components.append(worker)
-                        worker.start()
-                    else:
-                        raise TypeError("Incorrect constructor, expect Component but get {}".
-                                        format(type(worker).__name__))
-
             # Wait for components termination
             finished = 0
             # Because we use i for deletion we always delete the element near the end to not break order of
             # following of the rest unprocessed elements
             for i, p in reversed(list(enumerate(list(components)))):
-                try:
-                    p.join(1.0 / len(components))
-                except ComponentError:
-                    # Ignore or terminate the rest
-                    if fail_tolerant:
-                        ret = 1
-                    else:
-                        raise
-                # If all is OK
                 if not p.is_alive():
-                    # Make to be sure to execute join the last time
                     try:
                         p.join()
                     except ComponentError:
@@ -252,12 +231,33 @@ def launch_queue_workers(logger, queue, constructor, number, fail_tolerant, moni
             if finished > 0:
                 logger.debug("Finished {} workers".format(finished))
 
+            # Then run new workers in place of finished ones
+            diff = number - len(components)
+            if diff > 0 and len(elements) > 0:
+                logger.debug("Going to start {} new workers".format(min(diff, len(elements))))
+                for _ in range(min(diff, len(elements))):
+                    element = elements.pop(0)
+                    worker = constructor(element)
+                    if isinstance(worker, Component):
+                        components.append(worker)
+                        worker.start()
+                    else:
+                        raise TypeError("Incorrect constructor, expect Component but get {}".
+                                        format(type(worker).__name__))
+
             # Check that we can quit or must wait
-            if len(components) == 0 and len(elements) == 0:
-                if not active:
-                    break
+            if len(components) == 0 and len(elements) == 0 and not active:
+                break
+
+            # Sleep until some worker exits or, if there are free slots, until new elements come
+            objects = [p.sentinel for p in components] + get_sentinels(monitoring_list)
+            timeout = None
+            if active and len(components) < number:
+                if reader:
+                    objects.append(reader)
                 else:
-                    time.sleep(1)
+                    timeout = 1
+            multiprocessing.connection.wait(objects, timeout)
     finally:
         for p in components:
             if p.is_alive():
@@ -266,6 +266,18 @@ def launch_queue_workers(logger, queue, constructor, number, fail_tolerant, moni
     return ret
 
 
+def get_sentinels(components):
+    """
+    Get sentinels of alive components to wait for their termination.
+
+    :param components: List with Component objects.
+    :return: List of sentinels.
+    """
+    if isinstance(components, list):
+        return [m.sentinel for m in components if m.is_alive()]
+    return []
+
+
 def check_components(logger, components):
     """
     Check that all given processes are alive and raise an exception if it is not so.
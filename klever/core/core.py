@@ -16,12 +16,14 @@
 #
 
 import argparse
+import concurrent.futures
 import json
 import hashlib
 import multiprocessing
 import os
 import pkg_resources
 import shutil
+import threading
 import time
 import traceback
 import queue
@@ -275,66 +277,175 @@ class Core(klever.core.components.CallbacksCaller):
 
 
 class Reporter(klever.core.components.Component):
+    # Default thresholds for batching reports. Each batch is uploaded as soon as it contains the maximum number of
+    # reports or as soon as its first report waits for the maximum latency.
+    MAX_BATCH_SIZE = 10
+    MAX_BATCH_LATENCY = 3
+    MAX_UPLOADS_IN_FLIGHT = 4
+    # How often queue depth and upload latency are reported.
+    METRICS_INTERVAL = 60
 
     def __init__(self, conf, logger, parent_id, callbacks, mqs, vals, id=None, work_dir=None, attrs=None,
                  separate_from_parent=False, include_child_resources=False):
         super(Reporter, self).__init__(conf, logger, parent_id, callbacks, mqs, vals, id, work_dir, attrs,
                                        separate_from_parent, include_child_resources)
+        # Upload threads have their own sessions since sessions remember errors of their last requests.
+        self.sessions = threading.local()
+        self.uploads = {}
+        self.metrics = {
+            'batches': 0,
+            'reports': 0,
+            'total latency': 0.0,
+            'max latency': 0.0,
+            'max queue depth': 0,
+            'max uploads in flight': 0
+        }
+        self.metrics_time = 0
 
     def send_reports(self):
-        session = klever.core.session.Session(self.logger, self.conf['Klever Bridge'], self.conf['identifier'])
-        issleep = True
-        while True:
-            # Report batches of reports each 3 seconds. This reduces the number of requests quite considerably.
-            if issleep:
-                time.sleep(3)
-            else:
-                issleep = True
+        conf = self.conf.get('uploading reports', {})
+        max_batch_size = conf.get('max batch size', self.MAX_BATCH_SIZE)
+        max_batch_latency = conf.get('max batch latency', self.MAX_BATCH_LATENCY)
+        max_uploads_in_flight = conf.get('max uploads in flight', self.MAX_UPLOADS_IN_FLIGHT)
+        self.metrics_time = time.time()
 
-            reports_and_report_file_archives = []
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max_uploads_in_flight) as executor:
             is_finish = False
-            while True:
-                try:
-                    # TODO: replace MQ with "reports and report file archives".
-                    report_and_report_file_archives = self.mqs['report files'].get_nowait()
-
-                    if report_and_report_file_archives is None:
-                        self.logger.debug('Report files message queue was terminated')
-                        is_finish = True
-                        break
-
-                    reports_and_report_file_archives.append(report_and_report_file_archives)
-
-                    # Do not send more than 10 reports at once. Otherwise different strange issues may appear im Core
-                    # and Bridge.
-                    if len(reports_and_report_file_archives) == 10:
-                        # Do not sleep since there may be pending reports already.
-                        issleep = False
-                        break
-                except queue.Empty:
-                    break
-
-            if reports_and_report_file_archives:
-                for report_and_report_file_archives in reports_and_report_file_archives:
-                    report_file_archives = report_and_report_file_archives.get('report file archives')
-                    self.logger.debug('Upload report file "{0}"{1}'.format(
-                        report_and_report_file_archives['report file'],
-                        ' with report file archives:\n{0}'
-                        .format('\n'.join(['  {0}'.format(archive) for archive in report_file_archives]))
-                        if report_file_archives else ''))
-
-                session.upload_reports_and_report_file_archives(reports_and_report_file_archives)
-
-                # Remove reports and report file archives if needed.
-                if not self.conf['keep intermediate files']:
-                    for report_and_report_file_archives in reports_and_report_file_archives:
-                        os.remove(report_and_report_file_archives['report file'])
-                        report_file_archives = report_and_report_file_archives.get('report file archives')
-                        if report_file_archives:
-                            for archive in report_file_archives:
-                                os.remove(archive)
-
-            if is_finish:
-                break
+            while not is_finish:
+                reports_and_report_file_archives, is_finish = self.__get_batch(max_batch_size, max_batch_latency)
+
+                if reports_and_report_file_archives:
+                    self.__wait_uploads(reports_and_report_file_archives, max_uploads_in_flight)
+                    self.uploads[executor.submit(self.__upload, reports_and_report_file_archives)] = \
+                        reports_and_report_file_archives
+                    self.metrics['max uploads in flight'] = max(self.metrics['max uploads in flight'],
+                                                                len(self.uploads))
+
+                self.__check_uploads()
+                self.__report_metrics()
+
+            # Wait for all remaining uploads.
+            self.__wait_uploads(None, 1)
+
+        self.__report_metrics(force=True)
 
     main = send_reports
+
+    def __get_batch(self, max_batch_size, max_batch_latency):
+        reports_and_report_file_archives = []
+        is_finish = False
+        deadline = None
+
+        while len(reports_and_report_file_archives) < max_batch_size:
+            # Wait for the first report of the batch for some time to check finished uploads and to report metrics
+            # periodically.
+            timeout = max_batch_latency if deadline is None else deadline - time.time()
+            if timeout <= 0:
+                break
+
+            try:
+                # TODO: replace MQ with "reports and report file archives".
+                report_and_report_file_archives = self.mqs['report files'].get(timeout=timeout)
+            except queue.Empty:
+                break
+
+            if report_and_report_file_archives is None:
+                self.logger.debug('Report files message queue was terminated')
+                is_finish = True
+                break
+
+            reports_and_report_file_archives.append(report_and_report_file_archives)
+            if deadline is None:
+                deadline = time.time() + max_batch_latency
+
+        return reports_and_report_file_archives, is_finish
+
+    def __wait_uploads(self, reports_and_report_file_archives, max_uploads_in_flight):
+        # Bridge requires reports of parents to be uploaded before reports of their children, while finish reports of
+        # parents should be uploaded after all reports of their children. Since report identifiers include identifiers
+        # of parents, it is safe to upload simultaneously just batches without identifiers being prefixes of each other.
+        while self.uploads:
+            if reports_and_report_file_archives is None:
+                dependencies = list(self.uploads)
+            else:
+                dependencies = [upload for upload, uploading_reports_and_report_file_archives in self.uploads.items()
+                                if self.__depend(reports_and_report_file_archives,
+                                                 uploading_reports_and_report_file_archives)]
+
+            if not dependencies and len(self.uploads) < max_uploads_in_flight:
+                break
+
+            concurrent.futures.wait(dependencies or list(self.uploads),
+                                    return_when=concurrent.futures.FIRST_COMPLETED)
+            self.__check_uploads()
+
+    @staticmethod
+    def __depend(reports_and_report_file_archives1, reports_and_report_file_archives2):
+        for report_and_report_file_archives1 in reports_and_report_file_archives1:
+            # Reports without identifiers depend on everything.
+            identifier1 = report_and_report_file_archives1.get('identifier') or ''
+            for report_and_report_file_archives2 in reports_and_report_file_archives2:
+                identifier2 = report_and_report_file_archives2.get('identifier') or ''
+                if identifier1.startswith(identifier2) or identifier2.startswith(identifier1):
+                    return True
+
+        return False
+
+    def __check_uploads(self):
+        for upload in [upload for upload in self.uploads if upload.done()]:
+            reports_and_report_file_archives = self.uploads.pop(upload)
+            # Raise exception if uploading failed.
+            latency = upload.result()
+
+            self.metrics['batches'] += 1
+            self.metrics['reports'] += len(reports_and_report_file_archives)
+            self.metrics['total latency'] += latency
+            self.metrics['max latency'] = max(self.metrics['max latency'], latency)
+
+    def __upload(self, reports_and_report_file_archives):
+        for report_and_report_file_archives in reports_and_report_file_archives:
+            report_file_archives = report_and_report_file_archives.get('report file archives')
+            self.logger.debug('Upload report file "{0}"{1}'.format(
+                report_and_report_file_archives['report file'],
+                ' with report file archives:\n{0}'
+                .format('\n'.join(['  {0}'.format(archive) for archive in report_file_archives]))
+                if report_file_archives else ''))
+
+        if not hasattr(self.sessions, 'session'):
+            self.sessions.session = klever.core.session.Session(self.logger, self.conf['Klever Bridge'],
+                                                                self.conf['identifier'])
+
+        start_time = time.time()
+        self.sessions.session.upload_reports_and_report_file_archives(reports_and_report_file_archives)
+        latency = time.time() - start_time
+
+        # Remove reports and report file archives if needed.
+        if not self.conf['keep intermediate files']:
+            for report_and_report_file_archives in reports_and_report_file_archives:
+                os.remove(report_and_report_file_archives['report file'])
+                report_file_archives = report_and_report_file_archives.get('report file archives')
+                if report_file_archives:
+                    for archive in report_file_archives:
+                        os.remove(archive)
+
+        return latency
+
+    def __report_metrics(self, force=False):
+        try:
+            queue_depth = self.mqs['report files'].qsize()
+        except (NotImplementedError, OSError, EOFError):
+            queue_depth = None
+        if queue_depth is not None:
+            self.metrics['max queue depth'] = max(self.metrics['max queue depth'], queue_depth)
+
+        if not force and time.time() - self.metrics_time < self.METRICS_INTERVAL:
+            return
+        self.metrics_time = time.time()
+
+        self.logger.info(
+            'Reports queue depth is {0} (at most {1}), {2} uploads are in flight (at most {3}), {4} reports were '
+            'uploaded in {5} batches with average latency {6:.2f}s (at most {7:.2f}s)'.format(
+                queue_depth, self.metrics['max queue depth'], len(self.uploads), self.metrics['max uploads in flight'],
+                self.metrics['reports'], self.metrics['batches'],
+                self.metrics['total latency'] / self.metrics['batches'] if self.metrics['batches'] else 0,
+                self.metrics['max latency']))
@@ -19,6 +19,8 @@ import json
 import os
 import shutil
 import re
+import array
+import pickle
 import multiprocessing
 
 import klever.core.components
@@ -28,28 +30,83 @@ coverage_format_version = 1
 most_covered_lines_num = 100
 
 
-def add_to_coverage(merged_coverage_info, coverage_info):
-    for file_name, file_coverage_info in coverage_info.items():
-        merged_coverage_info.setdefault(file_name, {
-            'total functions': coverage_info[file_name]['total functions'],
-            'covered lines': dict(),
-            'covered functions': dict(),
-            'covered function names': list(),
-            'notes': dict()
-        })
+class CoverageAccumulator:
+    """
+    Accumulate code coverage of many verification tasks. Line and function coverage of each source file is kept in
+    integer arrays indexed by line numbers, covered function names are kept as sets of function identifiers. So,
+    merging is linear in the size of merged coverage whereas the memory consumption is bounded by sizes of source files
+    rather than by the number of tasks.
+    """
+
+    # Value of array items for lines that are not considered in code coverage
+    NO_LINE = -1
+
+    def __init__(self):
+        self._files = dict()
+        self._function_ids = dict()
+        self._function_names = []
+
+    def add(self, coverage_info):
+        """
+        Add code coverage of a verification task.
+
+        :param coverage_info: Dictionary with file names as keys and their code coverage as values. Line numbers may be
+                              either integers or strings like in code coverage dumped to JSON.
+        """
+        for file_name, file_coverage_info in coverage_info.items():
+            file_acc = self._files.get(file_name)
+            if file_acc is None:
+                file_acc = self._files[file_name] = {
+                    'total functions': file_coverage_info['total functions'],
+                    'original source file name': file_coverage_info.get('original source file name'),
+                    'covered lines': array.array('q'),
+                    'covered functions': array.array('q'),
+                    'covered function names': set(),
+                    'notes': dict()
+                }
 
-        for kind in ('covered lines', 'covered functions'):
-            for line, cov_num in file_coverage_info[kind].items():
-                merged_coverage_info[file_name][kind].setdefault(line, 0)
-                merged_coverage_info[file_name][kind][line] += cov_num
+            for kind in ('covered lines', 'covered functions'):
+                self.__add_hits(file_acc[kind], file_coverage_info[kind])
+
+            for func_name in file_coverage_info['covered function names']:
+                func_id = self._function_ids.get(func_name)
+                if func_id is None:
+                    func_id = self._function_ids[func_name] = len(self._function_names)
+                    self._function_names.append(func_name)
+                file_acc['covered function names'].add(func_id)
+
+            # TODO: What about multiple notes?
+            for line, note in file_coverage_info['notes'].items():
+                file_acc['notes'][int(line)] = note
+
+    def items(self):
+        """
+        Iterate over accumulated code coverage of source files in the format of code coverage of verification tasks.
+
+        :return: Generator of pairs of file names and dictionaries with their code coverage.
+        """
+        for file_name, file_acc in self._files.items():
+            yield file_name, {
+                'total functions': file_acc['total functions'],
+                'original source file name': file_acc['original source file name'],
+                'covered lines': self.__get_hits(file_acc['covered lines']),
+                'covered functions': self.__get_hits(file_acc['covered functions']),
+                'covered function names': sorted(self._function_names[f] for f in file_acc['covered function names']),
+                'notes': dict(file_acc['notes'])
+            }
 
-        for cov_func_name in file_coverage_info['covered function names']:
-            if cov_func_name not in merged_coverage_info[file_name]['covered function names']:
-                merged_coverage_info[file_name]['covered function names'].append(cov_func_name)
+    def __add_hits(self, hits, lines):
+        for line, cov_num in lines.items():
+            line = int(line)
+            if line >= len(hits):
+                hits.extend(array.array('q', [self.NO_LINE]) * (line + 1 - len(hits)))
+            if hits[line] == self.NO_LINE:
+                hits[line] = cov_num
+            else:
+                hits[line] += cov_num
 
-        # TODO: What about multiple notes?
-        for line, note in file_coverage_info['notes'].items():
-            merged_coverage_info[file_name]['notes'][line] = note
+    def __get_hits(self, hits):
+        return {line: cov_num for line, cov_num in enumerate(hits) if cov_num != self.NO_LINE}
 
 
 def convert_coverage(merged_coverage_info, coverage_dir, pretty, src_files_info=None, total=False):
@@ -144,8 +201,6 @@ def convert_coverage(merged_coverage_info, coverage_dir, pretty, src_files_info=
 
 class JCR(klever.core.components.Component):
 
-    COVERAGE_FILE_NAME = "cached coverage.json"
-
     def __init__(self, conf, logger, parent_id, callbacks, mqs, vals, id=None, work_dir=None, attrs=None,
                  separate_from_parent=True, include_child_resources=False, queues_to_terminate=None):
         super(JCR, self).__init__(conf, logger, parent_id, callbacks, mqs, vals, id, work_dir,
@@ -162,7 +217,6 @@ class JCR(klever.core.components.Component):
         total_coverage_infos = dict()
         arcfiles = {}
         os.mkdir('total coverages')
-        counters = dict()
         try:
             while True:
                 coverage_info = self.mqs['req spec ids and coverage info files'].get()
@@ -181,7 +235,6 @@ class JCR(klever.core.components.Component):
                         total_coverage_infos[sub_job_id] = dict()
                         arcfiles[sub_job_id] = dict()
                     req_spec_id = coverage_info['req spec id']
-                    total_coverage_infos[sub_job_id].setdefault(req_spec_id, {})
                     arcfiles[sub_job_id].setdefault(req_spec_id, {})
 
                     if os.path.isfile(coverage_info['coverage info file']):
@@ -193,19 +246,11 @@ class JCR(klever.core.components.Component):
                             os.remove(os.path.join(self.conf['main working directory'],
                                                    coverage_info['coverage info file']))
 
-                        add_to_coverage(total_coverage_infos[sub_job_id][req_spec_id], loaded_coverage_info)
+                        total_coverage_infos[sub_job_id].setdefault(req_spec_id, CoverageAccumulator()) \
+                            .add(loaded_coverage_info)
                         for file, file_coverage_info in loaded_coverage_info.items():
                             arcfiles[sub_job_id][req_spec_id][file_coverage_info['original source file name']] = file
                         del loaded_coverage_info
-
-                        counters.setdefault(sub_job_id, dict())
-                        counters[sub_job_id].setdefault(req_spec_id, 0)
-                        counters[sub_job_id][req_spec_id] += 1
-                        if counters[sub_job_id][req_spec_id] >= 10:
-                            self.__read_data(total_coverage_infos, sub_job_id, req_spec_id)
-                            self.__save_data(total_coverage_infos, sub_job_id, req_spec_id)
-                            self.__clean_data(total_coverage_infos, sub_job_id, req_spec_id)
-                            counters[sub_job_id][req_spec_id] = 0
                     else:
                         self.logger.warning("There is no coverage file {!r}".
                                             format(coverage_info['coverage info file']))
@@ -218,8 +263,7 @@ class JCR(klever.core.components.Component):
                     # This is ugly. But this should disappear after implementing TODO at klever.core.job.start_jobs.
                     sub_job_dir = sub_job_id.lower()
 
-                    for req_spec_id in counters[sub_job_id]:
-                        self.__read_data(total_coverage_infos, sub_job_id, req_spec_id)
+                    for req_spec_id in list(total_coverage_infos[sub_job_id]):
                         coverage_info = total_coverage_infos[sub_job_id][req_spec_id]
                         total_coverage_dir = os.path.join(self.__get_total_cov_dir(sub_job_id, req_spec_id), 'report')
 
@@ -231,8 +275,7 @@ class JCR(klever.core.components.Component):
                         total_coverage_dirs.append(total_coverage_dir)
 
                         total_coverages[req_spec_id] = klever.core.utils.ArchiveFiles([total_coverage_dir])
-                        self.__save_data(total_coverage_infos, sub_job_id, req_spec_id)
-                        self.__clean_data(total_coverage_infos, sub_job_id, req_spec_id)
+                        del total_coverage_infos[sub_job_id][req_spec_id]
 
                     # This isn't great to build component identifier in such the artificial way.
                     # But otherwise we need to pass it everywhere like "sub-job identifier".
@@ -294,47 +337,6 @@ class JCR(klever.core.components.Component):
 
         return total_coverage_dir
 
-    def __read_data(self, cache, sub_job_id, requirement):
-        file_name = os.path.join(self.__get_total_cov_dir(sub_job_id, requirement), self.COVERAGE_FILE_NAME)
-
-        if os.path.isfile(file_name):
-            with open(file_name, 'r', encoding='utf-8') as fp:
-                large_cache = json.load(fp)
-        else:
-            large_cache = dict()
-
-        cache.setdefault(sub_job_id, dict())
-        cache[sub_job_id].setdefault(requirement, dict())
-
-        for file_name in large_cache:
-            # todo: This code is close to function add_to_coverage
-            cache[sub_job_id][requirement].setdefault(file_name, {
-                'total functions': large_cache[file_name]['total functions'],
-                'covered lines': {},
-                'covered functions': {},
-                'covered function names': list(),
-                'notes': {}
-            })
-
-            for path in ('covered lines', 'covered functions'):
-                for line, value in large_cache[file_name][path].items():
-                    cache[sub_job_id][requirement][file_name][path].setdefault(line, 0)
-                    cache[sub_job_id][requirement][file_name][path][line] += value
-            if large_cache[file_name].get('covered function names'):
-                for name in large_cache[file_name]['covered function names']:
-                    if name not in cache[sub_job_id][requirement][file_name]['covered function names']:
-                        cache[sub_job_id][requirement][file_name]['covered function names'].append(name)
-
-    def __save_data(self, cache, sub_job_id, requirement):
-        file_name = os.path.join(self.__get_total_cov_dir(sub_job_id, requirement), self.COVERAGE_FILE_NAME)
-        cache.setdefault(sub_job_id, dict())
-        cache[sub_job_id].setdefault(requirement, dict())
-        with open(file_name, 'w', encoding='utf-8') as fp:
-            json.dump(cache[sub_job_id][requirement], fp)
-
-    def __clean_data(self, cache, job_id, requirement):
-        cache[job_id].pop(requirement, None)
-
 
 class LCOV:
     FILENAME_PREFIX = "SF:"
@@ -373,9 +375,7 @@ class LCOV:
             with open(coverage_id, 'w', encoding='utf-8') as fp:
                 klever.core.utils.json_dump(self.coverage_info, fp, self.conf['keep intermediate files'])
 
-            coverage = {}
-            add_to_coverage(coverage, self.coverage_info)
-            convert_coverage(coverage, 'coverage', self.conf['keep intermediate files'])
+            convert_coverage(self.coverage_info, 'coverage', self.conf['keep intermediate files'])
         except Exception:
             shutil.rmtree('coverage', ignore_errors=True)
             raise
@@ -384,22 +384,14 @@ class LCOV:
         if not os.path.isfile(self.coverage_file):
             raise Exception('There is no coverage file {0}'.format(self.coverage_file))
 
-        # Parse coverage file.
-        coverage_info = {}
-        line_map = {}
+        # Parse coverage file. Coverage is collected per identifiers of original source files from the CIL line map.
+        covered_lines = []
+        covered_functions = []
+        covered_function_names = []
+        notes = []
         func_map = {}
         func_reverse_map = {}
 
-        def init_file_coverage_info(file):
-            if file not in coverage_info:
-                coverage_info[file] = {
-                    'covered lines': {},
-                    'covered functions': {},
-                    'covered function names': [],
-                    'total functions': len(func_reverse_map[file]) if file in func_reverse_map else 0,
-                    'notes': {}
-                }
-
         with open(self.coverage_file, encoding='utf-8') as fp:
             # TODO: verification tasks consisting of several source files are not supported.
             # Get actual CIL source file name.
@@ -412,26 +404,48 @@ class LCOV:
                     cil_src_file_name = self.verification_task_files[cil_src_file_name]
                     break
 
-            # Build C source files line map.
-            with open(cil_src_file_name) as cil_fp:
-                line_num = 1
-                orig_file = None
-                orig_file_line_num = 0
-                line_preprocessor_directive = re.compile(r'\s*#line\s+(\d+)\s*(.*)')
-                for line in cil_fp:
-                    m = line_preprocessor_directive.match(line)
-                    if m:
-                        orig_file_line_num = int(m.group(1))
-                        if m.group(2):
-                            orig_file = m.group(2)[1:-1]
-                    else:
-                        line_map[line_num] = (orig_file, orig_file_line_num)
-                        orig_file_line_num += 1
-                    line_num += 1
+            # Get C source files line map.
+            orig_files, orig_file_ids, orig_lines = self.__get_cil_line_map(cil_src_file_name)
+            for _ in orig_files:
+                covered_lines.append({})
+                covered_functions.append({})
+                covered_function_names.append([])
+                notes.append({})
+            max_cil_src_line = len(orig_file_ids)
 
             add = None
             timers = None
+            line_prefix = self.LINE_PREFIX
+            line_prefix_len = len(line_prefix)
             for line in fp:
+                # Get line coverage. These lines prevail, so check them first.
+                if line.startswith(line_prefix):
+                    # There may be an optional checksum after the execution count
+                    comma = line.index(',', line_prefix_len)
+                    checksum_comma = line.find(',', comma + 1)
+                    cil_src_line = int(line[line_prefix_len:comma])
+                    cov_num = line[comma + 1:checksum_comma] if checksum_comma != -1 else line[comma + 1:]
+
+                    # TODO: Coverage can contain invalid references. Let's deal with this one day!
+                    if cil_src_line >= max_cil_src_line or orig_file_ids[cil_src_line] < 0:
+                        continue
+
+                    orig_file_id = orig_file_ids[cil_src_line]
+                    orig_line = orig_lines[cil_src_line]
+                    covered_lines[orig_file_id][orig_line] = int(cov_num)
+
+                    if add and timers:
+                        notes[orig_file_id][orig_line] = {'kind': 'Multiple notes', 'text': timers + '. ' + add}
+                        add = None
+                        timers = None
+                    elif add:
+                        notes[orig_file_id][orig_line] = {'kind': 'Verifier assumption', 'text': add}
+                        add = None
+                    elif timers:
+                        notes[orig_file_id][orig_line] = {'kind': 'Verifier operation statistics', 'text': timers}
+                        timers = None
+                    continue
+
                 line = line.rstrip('\n')
                 # Build C functions map.
                 if line.startswith(self.FUNCTION_NAME_PREFIX):
@@ -439,11 +453,12 @@ class LCOV:
                     cil_src_line = int(splts[0])
                     func_name = splts[1]
 
-                    orig_file, orig_line = line_map[cil_src_line]
-                    func_map[func_name] = orig_file, orig_line
-                    if orig_file not in func_reverse_map:
-                        func_reverse_map[orig_file] = {}
-                    func_reverse_map[orig_file][orig_line] = func_name
+                    if cil_src_line >= max_cil_src_line or orig_file_ids[cil_src_line] < 0:
+                        raise KeyError(cil_src_line)
+                    orig_file_id = orig_file_ids[cil_src_line]
+                    orig_line = orig_lines[cil_src_line]
+                    func_map[func_name] = orig_file_id, orig_line
+                    func_reverse_map.setdefault(orig_file_id, {})[orig_line] = func_name
                 elif line.startswith(self.FUNCTION_NAME_END_PREFIX):
                     pass
                 # Get function coverage.
@@ -452,35 +467,9 @@ class LCOV:
                     cov_num = int(splts[0])
                     func_name = splts[1]
 
-                    orig_file, orig_line = func_map[func_name]
-                    init_file_coverage_info(orig_file)
-                    coverage_info[orig_file]['covered functions'][orig_line] = cov_num
-                    coverage_info[orig_file]['covered function names'].append(func_name)
-                # Get line coverage.
-                elif line.startswith(self.LINE_PREFIX):
-                    splts = line[len(self.LINE_PREFIX):].split(',')
-                    cil_src_line = int(splts[0])
-                    cov_num = int(splts[1])
-
-                    # TODO: Coverage can contain invalid references. Let's deal with this one day!
-                    if cil_src_line not in line_map:
-                        continue
-
-                    orig_file, orig_line = line_map[cil_src_line]
-                    init_file_coverage_info(orig_file)
-                    coverage_info[orig_file]['covered lines'][orig_line] = cov_num
-
-                    if add and timers:
-                        coverage_info[orig_file]['notes'][orig_line] = {'kind': 'Multiple notes',
-                                                                        'text': timers + '. ' + add}
-                        add = None
-                        timers = None
-                    elif add:
-                        coverage_info[orig_file]['notes'][orig_line] = {'kind': 'Verifier assumption', 'text': add}
-                        add = None
-                    elif timers:
-                        coverage_info[orig_file]['notes'][orig_line] = {'kind': 'Verifier operation statistics', 'text': timers}
-                        timers = None
+                    orig_file_id, orig_line = func_map[func_name]
+                    covered_functions[orig_file_id][orig_line] = cov_num
+                    covered_function_names[orig_file_id].append(func_name)
                 # Remember data to be associated with the next line.
                 elif line.startswith(self.ADD_PREFIX):
                     add = line[len(self.ADD_PREFIX):]
@@ -494,10 +483,19 @@ class LCOV:
                     raise NotImplementedError(line)
 
             # Add not covered functions.
-            for orig_file, orig_line in func_map.values():
-                init_file_coverage_info(orig_file)
-                if orig_line not in coverage_info[orig_file]['covered functions']:
-                    coverage_info[orig_file]['covered functions'][orig_line] = 0
+            for orig_file_id, orig_line in func_map.values():
+                covered_functions[orig_file_id].setdefault(orig_line, 0)
+
+            coverage_info = {}
+            for orig_file_id, orig_file in enumerate(orig_files):
+                if covered_lines[orig_file_id] or covered_functions[orig_file_id]:
+                    coverage_info[orig_file] = {
+                        'covered lines': covered_lines[orig_file_id],
+                        'covered functions': covered_functions[orig_file_id],
+                        'covered function names': covered_function_names[orig_file_id],
+                        'total functions': len(func_reverse_map.get(orig_file_id, ())),
+                        'notes': notes[orig_file_id]
+                    }
 
             # Shrink source file names.
             new_coverage_info = {}
@@ -538,3 +536,59 @@ class LCOV:
                 "Resulting code coverage is empty, perhaps, produced code coverage or its parsing is wrong")
 
         return new_coverage_info
+
+    def __get_cil_line_map(self, cil_src_file_name):
+        """
+        Get the map from lines of the CIL source file to original source files and lines according to #line
+        directives. Building of the map requires matching each line of the CIL source file, so maps are cached in the
+        job cache directory by checksums of CIL source files.
+
+        :param cil_src_file_name: CIL source file name.
+        :return: List of original source file names, arrays with identifiers of original source files and with lines
+                 in them indexed by lines of the CIL source file. Identifiers of lines without counterparts are -1.
+        """
+        cache_file = None
+        if 'cache directory' in self.conf:
+            cache_file = os.path.join(self.conf['cache directory'], 'CIL',
+                                      klever.core.utils.get_file_checksum(cil_src_file_name) + '.line map')
+            if os.path.isfile(cache_file):
+                with open(cache_file, 'rb') as fp:
+                    orig_files, orig_file_ids, orig_lines = pickle.load(fp)
+                return orig_files, array.array('i', orig_file_ids), array.array('i', orig_lines)
+
+        orig_files = []
+        orig_file_id_map = {}
+        # There is no line 0
+        orig_file_ids = array.array('i', [-1])
+        orig_lines = array.array('i', [0])
+        with open(cil_src_file_name) as cil_fp:
+            orig_file_id = self.__get_orig_file_id(orig_files, orig_file_id_map, None)
+            orig_file_line_num = 0
+            line_preprocessor_directive = re.compile(r'\s*#line\s+(\d+)\s*(.*)')
+            for line in cil_fp:
+                m = line_preprocessor_directive.match(line) if '#line' in line else None
+                if m:
+                    orig_file_line_num = int(m.group(1))
+                    if m.group(2):
+                        orig_file_id = self.__get_orig_file_id(orig_files, orig_file_id_map, m.group(2)[1:-1])
+                    orig_file_ids.append(-1)
+                    orig_lines.append(0)
+                else:
+                    orig_file_ids.append(orig_file_id)
+                    orig_lines.append(orig_file_line_num)
+                    orig_file_line_num += 1
+
+        if cache_file:
+            os.makedirs(os.path.dirname(cache_file), exist_ok=True)
+            with open('{}.{}.tmp'.format(cache_file, os.getpid()), 'wb') as fp:
+                pickle.dump((orig_files, orig_file_ids.tobytes(), orig_lines.tobytes()), fp, pickle.HIGHEST_PROTOCOL)
+            os.replace('{}.{}.tmp'.format(cache_file, os.getpid()), cache_file)
+
+        return orig_files, orig_file_ids, orig_lines
+
+    @staticmethod
+    def __get_orig_file_id(orig_files, orig_file_id_map, orig_file):
+        if orig_file not in orig_file_id_map:
+            orig_file_id_map[orig_file] = len(orig_files)
+            orig_files.append(orig_file)
+        return orig_file_id_map[orig_file]
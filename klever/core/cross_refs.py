@@ -15,6 +15,7 @@
 # limitations under the License.
 #
 
+import json
 import os
 
 import klever.core.utils
@@ -24,7 +25,7 @@ from klever.core.highlight import Highlight
 class CrossRefs:
     INDEX_DATA_FORMAT_VERSION = 1
 
-    def __init__(self, conf, logger, clade, file_name, new_file_name, common_dirs, common_prefix=''):
+    def __init__(self, conf, logger, clade, file_name, new_file_name, common_dirs, common_prefix='', clade_refs=None):
         self.conf = conf
         self.logger = logger
         self.clade = clade
@@ -32,6 +33,33 @@ class CrossRefs:
         self.new_file_name = new_file_name
         self.common_dirs = common_dirs
         self.common_prefix = common_prefix
+        # Raw references to/from obtained by get_clade_refs() in advance for a bunch of source files.
+        self.clade_refs = clade_refs
+
+    @staticmethod
+    def get_clade_refs(clade, file_names):
+        """
+        Get raw references to/from for given source files at once. This is much faster than to load them for each
+        source file separately.
+        """
+        return clade.get_ref_to(file_names) or {}, clade.get_ref_from(file_names) or {}
+
+    def get_hash_sum(self, src_file_name):
+        """
+        Get hash sum of the source file content and of all data that affect its cross references. Cross references do
+        not need to be got again for the same hash sum.
+        """
+        clade_refs_to, clade_refs_from = self.__get_clade_refs()
+        return klever.core.utils.get_file_name_checksum(json.dumps([
+            self.INDEX_DATA_FORMAT_VERSION,
+            klever.core.utils.get_file_checksum(src_file_name),
+            self.file_name,
+            self.new_file_name,
+            self.common_dirs,
+            self.common_prefix,
+            clade_refs_to.get(self.file_name),
+            clade_refs_from.get(self.file_name)
+        ], sort_keys=True))
 
     def get_cross_refs(self):
         with open(self.new_file_name) as fp:
@@ -44,24 +72,25 @@ class CrossRefs:
         highlight = Highlight(self.logger, src)
         highlight.highlight()
 
-        # Get raw references to/from for a given source file. There is the only key-value pair in dictionaries
-        # returned by Clade where keys are always source file names.
+        # Get raw references to/from for a given source file. Clade references are queried for all source files handled
+        # by the worker at once, so dictionaries keys are source file names and references of the given source file
+        # are got by its name.
+        clade_refs_to, clade_refs_from = self.__get_clade_refs()
+
         raw_refs_to = {
             'decl_func': [],
             'def_func': [],
             'def_macro': []
         }
-        clade_refs_to = self.clade.get_ref_to([self.file_name])
-        if clade_refs_to:
-            raw_refs_to.update(list(clade_refs_to.values())[0])
+        if self.file_name in clade_refs_to:
+            raw_refs_to.update(clade_refs_to[self.file_name])
 
         raw_refs_from = {
             'call': [],
             'expand': []
         }
-        clade_refs_from = self.clade.get_ref_from([self.file_name])
-        if clade_refs_from:
-            raw_refs_from.update(list(clade_refs_from.values())[0])
+        if self.file_name in clade_refs_from:
+            raw_refs_from.update(clade_refs_from[self.file_name])
 
         # Get full list of referred source file names.
         ref_src_files = set()
@@ -84,31 +113,29 @@ class CrossRefs:
         refs_to_func_defs = []
         refs_to_func_decls = []
         refs_to_macro_defs = []
+        # Places of references to macro and function definitions. Huge generated source files can contain very many
+        # references, so do not look for them in lists.
+        macro_def_locs = set()
+        func_def_locs = set()
         for ref_to_kind in ('def_macro', 'def_func', 'decl_func'):
             refs_to = refs_to_func_defs if ref_to_kind == 'def_func' else refs_to_func_decls \
                 if ref_to_kind == 'decl_func' else refs_to_macro_defs
             for raw_ref_to in raw_refs_to[ref_to_kind]:
+                loc = tuple(raw_ref_to[0])
+
                 # Do not add references to function definitions/declarations if there are already references to macro
                 # definitions at the same places.
-                if ref_to_kind != 'def_macro':
-                    is_exist = False
-                    for ref_to_macro_def in refs_to_macro_defs:
-                        if ref_to_macro_def[0] == raw_ref_to[0]:
-                            is_exist = True
-                            break
-                    if is_exist:
-                        continue
+                if ref_to_kind == 'def_macro':
+                    macro_def_locs.add(loc)
+                elif loc in macro_def_locs:
+                    continue
 
                 # Do not add references to function declarations if there are already references to function definitions
                 # at the same places.
-                if ref_to_kind == 'decl_func':
-                    is_exist = False
-                    for ref_to_func_def in refs_to_func_defs:
-                        if ref_to_func_def[0] == raw_ref_to[0]:
-                            is_exist = True
-                            break
-                    if is_exist:
-                        continue
+                if ref_to_kind == 'def_func':
+                    func_def_locs.add(loc)
+                elif ref_to_kind == 'decl_func' and loc in func_def_locs:
+                    continue
 
                 # TODO: will it work if there will be multiple declarations of the same entity in the same source file?
                 refs_to.append([
@@ -170,13 +197,10 @@ class CrossRefs:
         highlight.extra_highlight([['FuncDefRefTo', *r[0]] for r in refs_to_func_defs])
 
         # There may be several references to declarations of the same function. Add highlights for them just ones.
-        cur_func_loc = None
+        func_decl_locs = dict()
         for r in refs_to_func_decls:
-            if r[0] == cur_func_loc:
-                continue
-
-            cur_func_loc = r[0]
-            highlight.extra_highlight([['FuncDeclRefTo', *r[0]]])
+            func_decl_locs.setdefault(tuple(r[0]), None)
+        highlight.extra_highlight([['FuncDeclRefTo', *loc] for loc in func_decl_locs])
 
         highlight.extra_highlight([['MacroDefRefTo', *r[0]] for r in refs_to_macro_defs])
         highlight.extra_highlight([['FuncCallRefFrom', *r[0]] for r in refs_from_func_calls])
@@ -193,3 +217,9 @@ class CrossRefs:
 
         with open(os.path.join(self.new_file_name + '.idx.json'), 'w') as fp:
             klever.core.utils.json_dump(cross_ref, fp, self.conf['keep intermediate files'])
+
+    def __get_clade_refs(self):
+        if self.clade_refs is None:
+            self.clade_refs = self.get_clade_refs(self.clade, [self.file_name])
+
+        return self.clade_refs
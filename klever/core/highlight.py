@@ -199,38 +199,55 @@ class Highlight:
         # Store highlights to be removed and remove them later at once rather than create new list of highlights each
         # time when some highlights should be removed. This should work much faster since we expect that there are very
         # many highlights and just few highlights should be removed
-        highlights_to_be_removed = list()
+        highlights_to_be_removed = set()
         # Sometimes rather than to remove highlights completely we will remain some parts of them. For instance, this
         # is vital for macro definitions each of which corresponds to the only highlights list element and which can
         # include macro expansion reference from in the middle.
         highlights_to_be_added = list()
+        # Huge generated source files have very many highlights, so consider just highlights at the same lines.
+        line_highlights = dict()
+        for highlight in self.highlights:
+            line_highlights.setdefault(highlight[1], []).append(highlight)
+        line_extra_highlights = dict()
         for extra_highlight in extra_highlights:
-            extra_highlight_line_numb, extra_highlight_start_offset, extra_highlight_end_offset = extra_highlight[1:]
+            line_extra_highlights.setdefault(extra_highlight[1], []).append(extra_highlight)
 
-            for highlight in self.highlights:
+        for line_numb, cur_extra_highlights in line_extra_highlights.items():
+            cur_extra_highlights = sorted(cur_extra_highlights, key=lambda extra_highlight: extra_highlight[2])
+
+            for highlight in line_highlights.get(line_numb, ()):
                 highlight_kind, highlight_line_numb, highlight_start_offset, highlight_end_offset = highlight
-                if highlight_line_numb == extra_highlight_line_numb:
-                    if highlight_start_offset <= extra_highlight_end_offset \
-                            and highlight_end_offset >= extra_highlight_start_offset:
-                        highlights_to_be_removed.append(highlight)
-                        if highlight_kind == 'CP':
-                            if highlight_start_offset < extra_highlight_start_offset:
-                                highlights_to_be_added.append([
-                                    'CP',
-                                    highlight_line_numb,
-                                    highlight_start_offset,
-                                    extra_highlight_start_offset
-                                ])
-                            if extra_highlight_end_offset < highlight_end_offset:
-                                highlights_to_be_added.append([
-                                    'CP',
-                                    highlight_line_numb,
-                                    extra_highlight_end_offset,
-                                    highlight_end_offset
-                                ])
+                overlapped_extra_highlights = [
+                    extra_highlight for extra_highlight in cur_extra_highlights
+                    if highlight_start_offset <= extra_highlight[3] and highlight_end_offset >= extra_highlight[2]
+                ]
+                if not overlapped_extra_highlights:
+                    continue
+
+                highlights_to_be_removed.add(tuple(highlight))
+                if highlight_kind == 'CP':
+                    # Remain parts of the highlight between all extra highlights overlapping it.
+                    start_offset = highlight_start_offset
+                    for _, _, extra_highlight_start_offset, extra_highlight_end_offset in overlapped_extra_highlights:
+                        if start_offset < extra_highlight_start_offset:
+                            highlights_to_be_added.append([
+                                'CP',
+                                highlight_line_numb,
+                                start_offset,
+                                extra_highlight_start_offset
+                            ])
+                        start_offset = max(start_offset, extra_highlight_end_offset)
+                    if start_offset < highlight_end_offset:
+                        highlights_to_be_added.append([
+                            'CP',
+                            highlight_line_numb,
+                            start_offset,
+                            highlight_end_offset
+                        ])
 
         if highlights_to_be_removed:
-            self.highlights = [highlight for highlight in self.highlights if highlight not in highlights_to_be_removed]
+            self.highlights = [highlight for highlight in self.highlights
+                               if tuple(highlight) not in highlights_to_be_removed]
 
         # Add extra highlights.
         for extra_highlight in extra_highlights:
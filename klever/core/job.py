@@ -16,6 +16,7 @@
 #
 
 import copy
+import glob
 import importlib
 import json
 import multiprocessing
@@ -44,6 +45,8 @@ NECESSARY_FILES = [
     'verifier profiles.json'
 ]
 DEFAULT_ARCH = 'x86-64'
+# The number of source files which cross references are obtained from Clade at once.
+SOURCE_FILES_BATCH_SIZE = 100
 DEFAULT_ARCH_OPTS = {
   'ARM': {
     'CIF': {
@@ -730,33 +733,60 @@ class Job(klever.core.components.Component):
         )
 
     def __process_source_files(self):
-        for file_name in self.clade.src_info:
-            self.mqs['file names'].put(file_name)
+        file_names = list(self.clade.src_info)
+        for i in range(0, len(file_names), SOURCE_FILES_BATCH_SIZE):
+            self.mqs['file names'].put(file_names[i:i + SOURCE_FILES_BATCH_SIZE])
 
         for i in range(self.workers_num):
             self.mqs['file names'].put(None)
 
     def __process_source_file(self):
-        while True:
-            file_name = self.mqs['file names'].get()
-
-            if not file_name:
-                return
-
-            src_file_name = klever.core.utils.make_relative_path(self.common_components_conf['working source trees'],
-                                                                 file_name)
+        session = klever.core.session.Session(self.logger, self.conf['Klever Bridge'], self.conf['identifier'])
+        # Hash sums of processed source files and names of files to be uploaded for source files that Bridge misses.
+        src_files = []
 
-            if src_file_name != file_name:
-                src_file_name = os.path.join('source files', src_file_name)
+        while True:
+            file_names = self.mqs['file names'].get()
 
-            new_file_name = os.path.join('original sources', src_file_name.lstrip(os.path.sep))
-            os.makedirs(os.path.dirname(new_file_name), exist_ok=True)
-            shutil.copy(self.clade.get_storage_path(file_name), new_file_name)
+            if not file_names:
+                break
 
-            cross_refs = CrossRefs(self.common_components_conf, self.logger, self.clade,
-                                   file_name, new_file_name,
-                                   self.common_components_conf['working source trees'], 'source files')
-            cross_refs.get_cross_refs()
+            clade_refs = CrossRefs.get_clade_refs(self.clade, file_names)
+            cross_refs = []
+            for file_name in file_names:
+                src_file_name = klever.core.utils.make_relative_path(
+                    self.common_components_conf['working source trees'], file_name)
+
+                if src_file_name != file_name:
+                    src_file_name = os.path.join('source files', src_file_name)
+
+                new_file_name = os.path.join('original sources', src_file_name.lstrip(os.path.sep))
+                cross_refs.append(CrossRefs(self.common_components_conf, self.logger, self.clade,
+                                            file_name, new_file_name,
+                                            self.common_components_conf['working source trees'], 'source files',
+                                            clade_refs))
+
+            # Bridge keeps source files and their cross references of other original sources, so process just source
+            # files which it misses.
+            hash_sums = [cross_ref.get_hash_sum(self.clade.get_storage_path(cross_ref.file_name))
+                         for cross_ref in cross_refs]
+            missing = set(session.get_missing_original_source_files(hash_sums))
+            for cross_ref, hash_sum in zip(cross_refs, hash_sums):
+                if hash_sum not in missing:
+                    src_files.append([hash_sum, None])
+                    continue
+
+                os.makedirs(os.path.dirname(cross_ref.new_file_name), exist_ok=True)
+                shutil.copy(self.clade.get_storage_path(cross_ref.file_name), cross_ref.new_file_name)
+                cross_ref.get_cross_refs()
+                src_files.append([hash_sum, [
+                    klever.core.utils.make_relative_path(['original sources'], new_file_name)
+                    for new_file_name in (cross_ref.new_file_name, cross_ref.new_file_name + '.idx.json')
+                    if os.path.isfile(new_file_name)
+                ]])
+
+        with open(os.path.join('original sources hash sums', '{0}.json'.format(os.getpid())), 'w') as fp:
+            json.dump(src_files, fp)
 
     def __get_original_sources_basic_info(self):
         self.logger.info('Get information on original sources for following visualization of uncovered source files')
@@ -810,6 +840,7 @@ class Job(klever.core.components.Component):
         self.logger.info(
             'Cut off working source trees or build directory from original source file names and convert index data')
         os.makedirs('original sources')
+        os.makedirs('original sources hash sums')
         self.mqs['file names'] = multiprocessing.Queue()
         self.workers_num = klever.core.utils.get_parallel_threads_num(self.logger, self.conf)
         subcomponents = [('PSFS', self.__process_source_files)]
@@ -818,12 +849,22 @@ class Job(klever.core.components.Component):
         self.launch_subcomponents(False, *subcomponents)
         self.mqs['file names'].close()
 
-        self.logger.info('Compress original sources')
+        hash_sums = []
+        new_files = {}
+        for src_files_file in glob.glob(os.path.join('original sources hash sums', '*.json')):
+            with open(src_files_file) as fp:
+                for hash_sum, file_names in json.load(fp):
+                    hash_sums.append(hash_sum)
+                    if file_names is not None:
+                        new_files[hash_sum] = file_names
+        self.logger.info('Bridge misses {0} of {1} original source files'.format(len(new_files), len(hash_sums)))
+
+        self.logger.info('Compress new original source files')
         klever.core.utils.ArchiveFiles(['original sources']).make_archive('original sources.zip')
 
         self.logger.info('Upload original sources')
         try:
-            session.upload_original_sources(src_id, 'original sources.zip')
+            session.upload_original_source_files(src_id, hash_sums, new_files, 'original sources.zip')
         # Do not fail if there are already original sources. There may be complex data races because of checking and
         # uploading original sources archive are not atomic.
         except klever.core.session.BridgeError:
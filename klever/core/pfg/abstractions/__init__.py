@@ -16,14 +16,19 @@
 #
 
 import os
-import glob
+import re
+import sys
+import bisect
 
 from klever.core.utils import make_relative_path
 from klever.core.pfg.abstractions.files_repr import File
 from klever.core.pfg.abstractions.fragments_repr import Fragment
+from klever.core.pfg.abstractions.callgraph_repr import CompactCallgraph
 
 
 class Program:
+    # The number of files for which the callgraph is requested from Clade at once.
+    DEPENDENCIES_PORTION = 1000
 
     def __init__(self, logger, clade, source_paths, memory_efficient_mode=False, skip_missing_files=False):
         """
@@ -33,7 +38,7 @@ class Program:
         :param logger: Logger object.
         :param clade: Clade object.
         :param source_paths: Iterable with paths to source code.
-        :param memory_efficient_mode: Can we build a call graph?
+        :param memory_efficient_mode: Skip extraction of dependencies between files from the callgraph.
         :param skip_missing_files: Tolerate errors when a CC input file is missing.
         """
         self.logger = logger
@@ -41,11 +46,14 @@ class Program:
         self.source_paths = source_paths
         self._files = dict()
         self._fragments = dict()
+        # Fragments from the collection that contain files with given names
+        self._file_fragments = dict()
+        # Sorted absolute paths of files with File objects that are used to match expressions
+        self._abs_paths = None
+        self._callgraph = None
         self.__divide(skip_missing_files)
         if not memory_efficient_mode:
             self.logger.info("Extract dependencies between files from the program callgraph")
-            # This is very memory inefficient operation, so for Linux this is an optional step to prevent consuming
-            # gigabytes of memory
             self.__establish_dependencies()
 
     def create_fragment(self, name, files, add=False):
@@ -70,6 +78,7 @@ class Program:
     def add_fragment(self, fragment):
         if fragment.name not in self._fragments:
             self._fragments[fragment.name] = fragment
+            self.__index_files(fragment, fragment.files)
         else:
             if not self._fragments[fragment.name].files.symmetric_difference(fragment.files):
                 self.logger.warning("There are several equal fragments {!r} extracted, keep only one".
@@ -177,7 +186,34 @@ class Program:
         if name not in self._fragments:
             raise ValueError("Cannot remove already missing fragment {!r}".format(fragment.name))
         else:
-            del self._fragments[name]
+            fragment = self._fragments.pop(name)
+            self.__unindex_files(fragment, fragment.files)
+
+    def add_fragment_files(self, fragment, files):
+        """
+        Add files to the fragment. Use this method instead of modifying files of fragments from the collection directly
+        to keep lookups of fragments by files consistent.
+
+        :param fragment: Fragment object.
+        :param files: File objects.
+        """
+        files = set(files).difference(fragment.files)
+        fragment.files.update(files)
+        if self._fragments.get(fragment.name) is fragment:
+            self.__index_files(fragment, files)
+
+    def remove_fragment_files(self, fragment, files):
+        """
+        Remove files from the fragment. Use this method instead of modifying files of fragments from the collection
+        directly to keep lookups of fragments by files consistent.
+
+        :param fragment: Fragment object.
+        :param files: File objects.
+        """
+        files = fragment.files.intersection(files)
+        fragment.files.difference_update(files)
+        if self._fragments.get(fragment.name) is fragment:
+            self.__unindex_files(fragment, files)
 
     @property
     def files(self):
@@ -207,8 +243,8 @@ class Program:
         """
         successors = set()
         for file in fragment.files:
-            successors.update(file.successors)
-        successors = self.get_fragments_with_files(successors)
+            successors.update(file.successor_ids)
+        successors = self.get_fragments_with_files(self._callgraph.files[f] for f in successors)
         return successors.difference({fragment})
 
     def get_fragment_predecessors(self, fragment):
@@ -220,8 +256,8 @@ class Program:
         """
         predecessors = set()
         for file in fragment.files:
-            predecessors.update(file.predecessors)
-        predecessors = self.get_fragments_with_files(predecessors)
+            predecessors.update(file.predecessor_ids)
+        predecessors = self.get_fragments_with_files(self._callgraph.files[f] for f in predecessors)
         return predecessors.difference({fragment})
 
     def get_files_for_expressions(self, expressions):
@@ -257,57 +293,54 @@ class Program:
         matched = set()
         # Found files
         suitable_files = set()
-        # Optimizations: collect in advance absolute file paths
-        convert = self.clade.get_storage_path
-        reversed = {f.abs_path: f for f in self.files}
-        all_abs_files = set(reversed.keys())
-        all_abs_dirs = dict()
-        for file in all_abs_files:
-            dirname = os.path.dirname(file)
-            if dirname not in all_abs_dirs:
-                all_abs_dirs[dirname] = set()
-            all_abs_dirs[dirname].add(file)
         matched_abs_files = set()
 
-        # First try globes
+        # First try globes. Instead of globbing the file system for each expression, match expressions against sorted
+        # absolute paths of program files. Like glob, an expression matches a file itself or a directory containing it.
+        convert = self.clade.get_storage_path
+        abs_paths, abs_files = self.__get_abs_paths()
         for path in self.source_paths + ['']:
             for expr in expressions:
                 suits = False
-                expr_path = os.path.join(path, expr)
-                abs_expr_path = convert(expr_path)
-                files = set(glob.glob(abs_expr_path, recursive=True))
-                dirs = {f for f in files if os.path.isdir(f)}
-                files = {f for f in files if os.path.isfile(f)}
-
-                for file in files:
+                abs_expr_path = os.path.normpath(convert(os.path.join(path, expr)))
+                magic = re.search(r'[*?[]', abs_expr_path)
+                if magic:
+                    prefix = abs_expr_path[:abs_expr_path.rfind('/', 0, magic.start()) + 1]
+                    regex = _glob_to_regex(abs_expr_path)
+                else:
+                    prefix = abs_expr_path
+                    regex = None
+
+                for i in range(bisect.bisect_left(abs_paths, prefix), len(abs_paths)):
+                    file = abs_paths[i]
+                    if not file.startswith(prefix):
+                        break
                     if file in matched_abs_files:
                         continue
 
-                    if file in all_abs_files:
+                    if regex:
+                        suits_file = regex.match(file) or regex.match(os.path.dirname(file))
+                    else:
+                        suits_file = file == abs_expr_path or os.path.dirname(file) == abs_expr_path
+                    if suits_file:
                         matched_abs_files.add(file)
-                        suitable_files.add(reversed[file])
+                        suitable_files.add(abs_files[file])
                         if not suits:
                             matched.add(expr)
                             suits = True
-                for directory in dirs:
-                    if directory in all_abs_dirs:
-                        for file in all_abs_dirs[directory]:
-                            if file in matched_abs_files:
-                                continue
-                            matched_abs_files.add(file)
-                            suitable_files.add(reversed[file])
-                            if not suits:
-                                matched.add(expr)
-                                suits = True
 
         # Check function names
         rest = expressions.difference(matched)
-        if rest:
-            for file in (f for f in self.files if f not in suitable_files):
-                matched_funcs = set(file.export_functions.keys()).intersection(rest)
-                if matched_funcs:
-                    suitable_files.add(file)
-                    matched.update(matched_funcs)
+        if rest and self._callgraph:
+            for func in rest:
+                func_id = self._callgraph.find_function_id(func)
+                if func_id is None:
+                    continue
+
+                files = {self._callgraph.files[f] for f in self._callgraph.exporters(func_id)}
+                if files.difference(suitable_files):
+                    suitable_files.update(files)
+                    matched.add(func)
 
         return suitable_files, matched
 
@@ -344,11 +377,8 @@ class Program:
         :return: Set of Fragment objects.
         """
         frags = set()
-        files = {f if isinstance(f, str) else f.name for f in files}
-        if files:
-            for frag in self.fragments:
-                if {f.name for f in frag.files}.intersection(files):
-                    frags.add(frag)
+        for file in files:
+            frags.update(self._file_fragments.get(file if isinstance(file, str) else file.name, ()))
         return frags
 
     def get_files_calling_functions(self, functions):
@@ -359,10 +389,11 @@ class Program:
         :return: File objects.
         """
         files = set()
-        if functions:
-            for file in self.files:
-                if set(file.import_functions.keys()).intersection(functions):
-                    files.add(file)
+        if functions and self._callgraph:
+            for func in functions:
+                func_id = self._callgraph.find_function_id(func)
+                if func_id is not None:
+                    files.update(self._callgraph.files[f] for f in self._callgraph.importers(func_id))
         return files
 
     def collect_dependencies(self, files, filter_func=lambda x: True, depth=None, max=None):
@@ -424,12 +455,30 @@ class Program:
                             raise RuntimeError(msg)
 
                     file.cmd_id = identifier
-                    file.cmd_type = desc['type']
+                    file.cmd_type = sys.intern(desc['type'])
                     try:
                         file.size = self.clade.get_file_size(name)
                     except (KeyError, IndexError):
                         file.size = 0
-                    self._files[name] = file
+                    self._files[file.name] = file
+
+    def __index_files(self, fragment, files):
+        for file in files:
+            self._file_fragments.setdefault(file.name, set()).add(fragment)
+
+    def __unindex_files(self, fragment, files):
+        for file in files:
+            fragments = self._file_fragments.get(file.name)
+            if fragments:
+                fragments.discard(fragment)
+                if not fragments:
+                    del self._file_fragments[file.name]
+
+    def __get_abs_paths(self):
+        if self._abs_paths is None:
+            abs_files = {f.abs_path: f for f in self.files}
+            self._abs_paths = (sorted(abs_files), abs_files)
+        return self._abs_paths
 
     def __check_cc(self, desc):
         """
@@ -442,37 +491,109 @@ class Program:
 
     def __establish_dependencies(self):
         """
-        Analyze the callgraph of the program and add to each File object function names that are exported and function
-        names that are imported with links to File objects that export these functions. This function requires an
-        extremely huge amount of memory if the program is very big. This is because the callgraph itself can be quite
-        large.
-        """
-        cg = self.clade.callgraph
-        fs = self.clade.functions_by_file
+        Analyze the callgraph of the program and get for each file function names that are exported and function
+        names that are imported with links to files that export these functions. The callgraph is requested from
+        Clade by small portions of files and dependencies are stored in the compact representation, so the whole
+        callgraph is never kept in memory.
+        """
+        files = list(self._files.values())
+        callgraph = self._callgraph = CompactCallgraph(len(files))
+        callgraph.files = files
+        for file_id, file in enumerate(files):
+            file.id = file_id
+            file.callgraph = callgraph
+
+        def portions():
+            for i in range(0, len(files), self.DEPENDENCIES_PORTION):
+                yield files[i:i + self.DEPENDENCIES_PORTION]
+
+        # Get global functions defined in files first since just they can be imported by other files
+        for portion in portions():
+            fs = self.clade.get_functions_by_file({file.name for file in portion})
+            for file in portion:
+                callgraph.append_exports(
+                    file.id, (callgraph.get_function_id(func) for func, func_desc in fs.get(file.name, dict()).items()
+                              if func_desc.get('type', 'static') != 'static'))
 
         # Fulfil callgraph dependencies
-        for path, functions in ((p, f) for p, f in cg.items() if p in self._files):
-            file_repr = self._files[path]
-            for func, func_desc in functions.items():
-                tp = func_desc.get('type', 'static')
-                if tp != 'static':
-                    file_repr.add_export_function(func)
-
-                for called_definition_scope, called_functions in \
-                        ((s, d) for s, d in func_desc.get('calls', dict()).items()
-                         if s != path and s != 'unknown' and s in self._files):
-                    called_definition_file = self._files[called_definition_scope]
-                    # Beware of such bugs in callgraph
-                    for called_function in (c for c in called_functions
-                                            if fs.get(called_definition_scope, dict()).get(c, dict()).
-                                            get('type', 'static') != 'static'):
-                        match_score = list(called_functions[called_function].values())[0]["match_type"]
-                        file_repr.add_import_function(called_function, called_definition_file, match_score)
-
-        # Add rest global functions
-        for path, functions in ((p, f) for p, f in fs.items() if p in self._files):
-            file_repr = self._files[path]
-            for func, func_desc in functions.items():
-                tp = func_desc.get('type', 'static')
-                if tp != 'static':
-                    file_repr.add_export_function(func)
+        extra_exports = dict()
+        for portion in portions():
+            cg = self.clade.get_callgraph({file.name for file in portion})
+            for file in portion:
+                imports = dict()
+                successors = set()
+                for func, func_desc in cg.get(file.name, dict()).items():
+                    tp = func_desc.get('type', 'static')
+                    if tp != 'static':
+                        func_id = callgraph.get_function_id(func)
+                        if not callgraph.exports_function(file.id, func_id):
+                            extra_exports.setdefault(file.id, set()).add(func_id)
+
+                    for called_definition_scope, called_functions in \
+                            ((s, d) for s, d in func_desc.get('calls', dict()).items()
+                             if s != file.name and s != 'unknown' and s in self._files):
+                        called_definition_file = self._files[called_definition_scope]
+                        for called_function, called_function_desc in called_functions.items():
+                            called_function_id = callgraph.find_function_id(called_function)
+                            # Beware of such bugs in callgraph
+                            if called_function_id is None or \
+                                    not callgraph.exports_function(called_definition_file.id, called_function_id):
+                                continue
+
+                            match_score = list(called_function_desc.values())[0]["match_type"]
+                            if called_function_id not in imports or imports[called_function_id][1] < match_score:
+                                imports[called_function_id] = (called_definition_file.id, match_score)
+                                successors.add(called_definition_file.id)
+
+                callgraph.append_imports(file.id, {f: d[0] for f, d in imports.items()}, successors)
+
+        callgraph.finalize(extra_exports)
+
+
+def _glob_to_regex(pattern):
+    """
+    Translate a glob pattern with recursive "**" to a regular expression. Like glob, wildcards do not match "/" and
+    hidden names.
+
+    :param pattern: Glob pattern.
+    :return: Compiled regular expression.
+    """
+    regex = ''
+    parts = pattern.split('/')
+    for i, part in enumerate(parts):
+        last = i == len(parts) - 1
+        if part == '**':
+            regex += r'(?:(?!\.)[^/]*(?:/(?!\.)[^/]*)*)?' if last else r'(?:(?!\.)[^/]*/)*'
+            continue
+
+        if part and part[0] in '*?[':
+            regex += r'(?!\.)'
+        j = 0
+        while j < len(part):
+            c = part[j]
+            j += 1
+            if c == '*':
+                regex += '[^/]*'
+            elif c == '?':
+                regex += '[^/]'
+            elif c == '[':
+                # Like fnmatch, "]" right after "[" or "[!" belongs to the set rather than closes it.
+                end = j + 1 if part[j:j + 1] == '!' else j
+                end = part.find(']', end + 1 if part[end:end + 1] == ']' else end)
+                if end < 0:
+                    regex += re.escape(c)
+                else:
+                    # Escape characters that are special within sets of regular expressions but not within globs.
+                    chars = re.sub(r'([\\&~|[])', r'\\\1', part[j:end])
+                    if chars.startswith('!'):
+                        chars = '^' + chars[1:]
+                    elif chars.startswith('^'):
+                        chars = '\\' + chars
+                    regex += '[' + chars + ']'
+                    j = end + 1
+            else:
+                regex += re.escape(c)
+        if not last:
+            regex += '/'
+
+    return re.compile(regex + r'\Z')
@@ -0,0 +1,213 @@
+#
+# Copyright (c) 2019 ISP RAS (http://www.ispras.ru)
+# Ivannikov Institute for System Programming of the Russian Academy of Sciences
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import sys
+import array
+import bisect
+
+
+class CompactCallgraph:
+
+    def __init__(self, files_num):
+        """
+        Represents dependencies between files of the program extracted from its callgraph. Files and functions are
+        referred by integer identifiers. For each file exported functions, imported functions with files that provide
+        them, successors and predecessors are stored in CSR-like arrays: a row of file i is given by items from
+        offsets[i] to offsets[i + 1].
+
+        Rows should be appended for files in the order of their identifiers.
+
+        :param files_num: The number of files.
+        """
+        self.files_num = files_num
+        # Objects referred by file identifiers.
+        self.files = None
+        self.function_names = []
+        self._function_ids = dict()
+
+        # Function identifiers sorted within each row.
+        self._export_offsets = array.array('q', [0])
+        self._exports = array.array('i')
+        # Function identifiers with corresponding identifiers of files that provide these functions.
+        self._import_offsets = array.array('q', [0])
+        self._imports = array.array('i')
+        self._import_files = array.array('i')
+        # Identifiers of files sorted within each row.
+        self._successor_offsets = array.array('q', [0])
+        self._successors = array.array('i')
+        self._predecessor_offsets = None
+        self._predecessors = None
+        # Imported function identifiers with identifiers of files that import them for files that provide them.
+        self._user_offsets = None
+        self._user_functions = None
+        self._users = None
+        # Identifiers of files that export and import each function. They are built on the first request.
+        self._exporter_offsets = None
+        self._exporters = None
+        self._importer_offsets = None
+        self._importers = None
+
+    def get_function_id(self, name):
+        """
+        Get the identifier of the function with the given name. A new identifier is created if necessary.
+
+        :param name: Function name.
+        :return: Int.
+        """
+        func_id = self._function_ids.get(name)
+        if func_id is None:
+            func_id = len(self.function_names)
+            name = sys.intern(name)
+            self.function_names.append(name)
+            self._function_ids[name] = func_id
+        return func_id
+
+    def find_function_id(self, name):
+        """
+        Get the identifier of the function with the given name if it is known.
+
+        :param name: Function name.
+        :return: Int or None.
+        """
+        return self._function_ids.get(name)
+
+    def append_exports(self, file_id, function_ids):
+        """
+        Set functions exported by the next file.
+
+        :param file_id: File identifier.
+        :param function_ids: Iterable with function identifiers.
+        """
+        self.__append_row(file_id, self._export_offsets, ((self._exports, sorted(set(function_ids))),))
+
+    def append_imports(self, file_id, imports, successors):
+        """
+        Set functions imported by the next file.
+
+        :param file_id: File identifier.
+        :param imports: Dictionary with function identifiers as keys and identifiers of files that provide these
+                        functions as values.
+        :param successors: Iterable with identifiers of files that provide functions to the file.
+        """
+        func_ids = sorted(imports)
+        self.__append_row(file_id, self._import_offsets,
+                          ((self._imports, func_ids), (self._import_files, [imports[f] for f in func_ids])))
+        self.__append_row(file_id, self._successor_offsets, ((self._successors, sorted(set(successors))),))
+
+    def finalize(self, extra_exports=None):
+        """
+        Complete rows for remaining files, add extra exported functions and build predecessors from successors.
+
+        :param extra_exports: Dictionary with file identifiers as keys and sets of function identifiers as values.
+        """
+        for offsets in (self._export_offsets, self._import_offsets, self._successor_offsets):
+            self.__fill_rows(offsets, self.files_num)
+
+        if extra_exports:
+            offsets = array.array('q', [0])
+            exports = array.array('i')
+            for file_id in range(self.files_num):
+                row = self._exports[self._export_offsets[file_id]:self._export_offsets[file_id + 1]]
+                if file_id in extra_exports:
+                    row = sorted(set(row).union(extra_exports[file_id]))
+                exports.extend(row)
+                offsets.append(len(exports))
+            self._export_offsets, self._exports = offsets, exports
+
+        # Build reverse edges by means of counting sort by their targets.
+        self._predecessor_offsets, (self._predecessors,) = self.__reverse(
+            self._successor_offsets, self._successors, self.files_num, (lambda i, file_id: file_id,))
+        self._user_offsets, (self._user_functions, self._users) = self.__reverse(
+            self._import_offsets, self._import_files, self.files_num,
+            (lambda i, file_id: self._imports[i], lambda i, file_id: file_id))
+
+    def exports(self, file_id):
+        """Names of functions exported by the file."""
+        return [self.function_names[f]
+                for f in self._exports[self._export_offsets[file_id]:self._export_offsets[file_id + 1]]]
+
+    def exports_function(self, file_id, func_id):
+        """Check that the file exports the function."""
+        start, end = self._export_offsets[file_id], self._export_offsets[file_id + 1]
+        index = bisect.bisect_left(self._exports, func_id, start, end)
+        return index < end and self._exports[index] == func_id
+
+    def imports(self, file_id):
+        """Names of functions imported by the file with identifiers of files that provide them."""
+        start, end = self._import_offsets[file_id], self._import_offsets[file_id + 1]
+        return {self.function_names[f]: d for f, d in zip(self._imports[start:end], self._import_files[start:end])}
+
+    def users(self, file_id):
+        """Names of functions provided by the file with identifiers of files that import them."""
+        start, end = self._user_offsets[file_id], self._user_offsets[file_id + 1]
+        return ((self.function_names[f], u) for f, u in zip(self._user_functions[start:end], self._users[start:end]))
+
+    def successors(self, file_id):
+        """Identifiers of files that provide functions to the file."""
+        return self._successors[self._successor_offsets[file_id]:self._successor_offsets[file_id + 1]]
+
+    def predecessors(self, file_id):
+        """Identifiers of files that use functions provided by the file."""
+        return self._predecessors[self._predecessor_offsets[file_id]:self._predecessor_offsets[file_id + 1]]
+
+    def exporters(self, func_id):
+        """Identifiers of files that export the function."""
+        if self._exporter_offsets is None:
+            self._exporter_offsets, (self._exporters,) = self.__reverse(
+                self._export_offsets, self._exports, len(self.function_names), (lambda i, file_id: file_id,))
+        return self._exporters[self._exporter_offsets[func_id]:self._exporter_offsets[func_id + 1]]
+
+    def importers(self, func_id):
+        """Identifiers of files that import the function."""
+        if self._importer_offsets is None:
+            self._importer_offsets, (self._importers,) = self.__reverse(
+                self._import_offsets, self._imports, len(self.function_names), (lambda i, file_id: file_id,))
+        return self._importers[self._importer_offsets[func_id]:self._importer_offsets[func_id + 1]]
+
+    def __reverse(self, offsets, targets, targets_num, getters):
+        # Edges from row i to targets (files or functions) are put to rows of these targets. Getters return items to be
+        # stored for an edge by its index and the source file identifier.
+        counts = array.array('q', [0]) * (targets_num + 1)
+        for target in targets:
+            counts[target + 1] += 1
+        for target in range(targets_num):
+            counts[target + 1] += counts[target]
+        new_offsets = array.array('q', counts)
+        new_rows = [array.array('i', [0]) * len(targets) for _ in getters]
+
+        for file_id in range(self.files_num):
+            for i in range(offsets[file_id], offsets[file_id + 1]):
+                target = targets[i]
+                for new_row, get_item in zip(new_rows, getters):
+                    new_row[counts[target]] = get_item(i, file_id)
+                counts[target] += 1
+
+        return new_offsets, new_rows
+
+    @staticmethod
+    def __fill_rows(offsets, rows_num):
+        # Files without functions do not have rows, so fill gaps with empty ones.
+        while len(offsets) - 1 < rows_num:
+            offsets.append(offsets[-1])
+
+    def __append_row(self, file_id, offsets, rows):
+        if len(offsets) - 1 > file_id:
+            raise ValueError('Rows should be appended in the order of file identifiers')
+        self.__fill_rows(offsets, file_id)
+        for row, items in rows:
+            row.extend(items)
+        offsets.append(len(rows[0][0]))
@@ -15,8 +15,12 @@
 # limitations under the License.
 #
 
+import sys
+
 
 class File:
+    # There are hundreds of thousands of files in large programs, so avoid keeping dictionaries of attributes
+    __slots__ = ('name', 'id', 'callgraph', 'abs_path', 'cmd_id', 'cmd_type', 'size', 'target', 'unique')
 
     def __init__(self, name):
         """
@@ -25,13 +29,11 @@ class File:
         :param name: Path to the file relatively to source directory.
         """
         # Identifier
-        self.name = name
+        self.name = sys.intern(name)
 
         # Here we will store links to callgraph and definition scopes data
-        self._export_functions = dict()
-        self._import_functions = dict()
-        self._predecessors = set()
-        self._successors = set()
+        self.id = None
+        self.callgraph = None
         self.abs_path = None
         self.cmd_id = None,
         self.cmd_type = None,
@@ -39,21 +41,45 @@ class File:
         self.target = False
         self.unique = True
 
+    @property
+    def successor_ids(self):
+        """Identifiers of files that provide functions to the file."""
+        if not self.callgraph:
+            return ()
+        return self.callgraph.successors(self.id)
+
+    @property
+    def predecessor_ids(self):
+        """Identifiers of files that use functions provided by the file."""
+        if not self.callgraph:
+            return ()
+        return self.callgraph.predecessors(self.id)
+
     @property
     def successors(self):
-        return set(self._successors)
+        return {self.callgraph.files[f] for f in self.successor_ids}
 
     @property
     def predecessors(self):
-        return set(self._predecessors)
+        return {self.callgraph.files[f] for f in self.predecessor_ids}
 
     @property
     def export_functions(self):
-        return dict(self._export_functions)
+        """Dictionary with exported function names as keys and sets of File objects that import them as values."""
+        if not self.callgraph:
+            return dict()
+
+        export_functions = {func: set() for func in self.callgraph.exports(self.id)}
+        for func, user in self.callgraph.users(self.id):
+            export_functions[func].add(self.callgraph.files[user])
+        return export_functions
 
     @property
     def import_functions(self):
-        return {f: desc[0] for f, desc in self._import_functions.items()}
+        """Dictionary with imported function names as keys and File objects that export them as values."""
+        if not self.callgraph:
+            return dict()
+        return {func: self.callgraph.files[f] for func, f in self.callgraph.imports(self.id).items()}
 
     def __lt__(self, other):
         return self.name < other.name
@@ -72,56 +98,3 @@ class File:
 
     def __cmp__(self, rhs):
         return self.name.__cmp__(rhs.name)
-
-    def add_predecessor(self, predecessor):
-        """
-        Add a predecessor - the file that calls functions from this one.
-
-        :param predecessor: File object.
-        """
-        # Just ignore linking to self
-        if predecessor.name != self.name:
-            self._predecessors.add(predecessor)
-            predecessor._successors.add(self)
-
-    def add_successor(self, successor):
-        """
-        Add a successor - the file that exports functions to this one.
-
-        :param successor: File object.
-        """
-        # Just ignore linking to self
-        if successor.name != self.name:
-            self._successors.add(successor)
-            successor._predecessors.add(self)
-
-    def add_export_function(self, function_name, user_files=None):
-        """
-        Add an exported function.
-
-        :param function_name: Function name
-        :param user_files: None or a set of File objects that import this function.
-        """
-        # Just ignore linking to self
-        if function_name not in self._export_functions:
-            self._export_functions[function_name] = set()
-        if user_files:
-            self._export_functions[function_name].update(user_files)
-
-    def add_import_function(self, function_name, definition_scope, match_score):
-        if definition_scope.name == self.name:
-            raise ValueError("Cannot import function {!r} from itself: {!r}".format(function_name, self.name))
-
-        if function_name not in self._import_functions:
-            self._import_functions[function_name] = [definition_scope, match_score]
-            definition_scope.add_export_function(function_name, {self})
-            self.add_successor(definition_scope)
-        else:
-            # todo: maybe add logger there? But this is not a good place to debug the callgraph
-            # self.logger.warning('Cannot import function {!r} from two places: {!r} and {!r}'.
-            #                     format(function_name, self._import_functions[function_name][0],
-            #                            definition_scope.name))
-            if self._import_functions[function_name][1] < match_score:
-                self._import_functions[function_name] = [definition_scope, match_score]
-                definition_scope.add_export_function(function_name, {self})
-                self.add_successor(definition_scope)
@@ -16,8 +16,12 @@
 #
 
 
+import sys
+
+
 class Fragment:
     """Represent a program fragment - a set of files."""
+    __slots__ = ('name', 'files')
 
     def __init__(self, identifier):
         """
@@ -26,7 +30,7 @@ class Fragment:
         :param identifier: Unique among other fragments identifier.
         """
         # Identifier
-        self.name = identifier
+        self.name = sys.intern(identifier)
 
         # Description of the module content
         self.files = set()
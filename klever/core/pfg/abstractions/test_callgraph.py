@@ -0,0 +1,80 @@
+#
+# Copyright (c) 2021 ISP RAS (http://www.ispras.ru)
+# Ivannikov Institute for System Programming of the Russian Academy of Sciences
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import sys
+
+import pytest
+
+from klever.core.pfg.abstractions.callgraph_repr import CompactCallgraph
+
+
+@pytest.fixture
+def callgraph():
+    """
+    File 0 exports "a" and "b" and calls "c" from file 1. File 1 exports "c". File 2 calls "a" and "c". File 3 exports
+    "d" that is known just from its definitions in the callgraph.
+    """
+    callgraph = CompactCallgraph(4)
+    a, b, c, d = (callgraph.get_function_id(name) for name in 'abcd')
+    callgraph.append_exports(0, [b, a, a])
+    callgraph.append_exports(1, [c])
+    # Rows of files without imports are skipped.
+    callgraph.append_imports(0, {c: 1}, [1])
+    callgraph.append_imports(2, {c: 1, a: 0}, [1, 0, 1])
+    callgraph.finalize({3: {d}})
+    return callgraph
+
+
+def test_functions(callgraph):
+    assert callgraph.get_function_id('b') == 1
+    assert callgraph.find_function_id('d') == 3
+    assert callgraph.find_function_id('e') is None
+    assert len(callgraph.function_names) == 4
+
+    name = ''.join(['new', 'function'])
+    callgraph.get_function_id(name)
+    assert callgraph.function_names[-1] is sys.intern('newfunction')
+
+
+def test_exports(callgraph):
+    assert [callgraph.exports(f) for f in range(4)] == [['a', 'b'], ['c'], [], ['d']]
+    assert callgraph.exports_function(0, callgraph.find_function_id('b'))
+    assert not callgraph.exports_function(1, callgraph.find_function_id('b'))
+    assert not callgraph.exports_function(2, callgraph.find_function_id('a'))
+    assert list(callgraph.exporters(callgraph.find_function_id('c'))) == [1]
+    assert list(callgraph.exporters(callgraph.find_function_id('d'))) == [3]
+
+
+def test_imports(callgraph):
+    assert [callgraph.imports(f) for f in range(4)] == [{'c': 1}, {}, {'a': 0, 'c': 1}, {}]
+    assert list(callgraph.importers(callgraph.find_function_id('c'))) == [0, 2]
+    assert list(callgraph.importers(callgraph.find_function_id('b'))) == []
+    assert sorted(callgraph.users(1)) == [('c', 0), ('c', 2)]
+    assert list(callgraph.users(0)) == [('a', 2)]
+    assert list(callgraph.users(3)) == []
+
+
+def test_dependencies(callgraph):
+    assert [list(callgraph.successors(f)) for f in range(4)] == [[1], [], [0, 1], []]
+    assert [list(callgraph.predecessors(f)) for f in range(4)] == [[2], [0, 2], [], []]
+
+
+def test_rows_order():
+    callgraph = CompactCallgraph(2)
+    callgraph.append_exports(1, [callgraph.get_function_id('a')])
+    with pytest.raises(ValueError):
+        callgraph.append_exports(0, [callgraph.get_function_id('b')])
@@ -0,0 +1,174 @@
+#
+# Copyright (c) 2021 ISP RAS (http://www.ispras.ru)
+# Ivannikov Institute for System Programming of the Russian Academy of Sciences
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import os
+import glob
+import fnmatch
+import logging
+
+import pytest
+
+from klever.core.pfg.abstractions import Program, _glob_to_regex
+
+FILES = [
+    'main.c',
+    'drivers/usb/core.c',
+    'drivers/usb/host/ehci.c',
+    'drivers/usb/.hidden/x.c',
+    'drivers/net/a1.c',
+    'drivers/net/b2.c',
+    'drivers/net/.c',
+    'drivers/.build/y.c',
+    'lib/c++/vector.c',
+    'lib/a.b/x.c',
+    'lib/a_b/x.c',
+    'lib/(x)|{y}$^/z.c',
+    'lib/[a]/w.c',
+    'lib/a/w.c',
+    'fs/!/e.c',
+    'fs/]/f.c'
+]
+
+EXPRESSIONS = [
+    # Files and directories without wildcards
+    'main.c',
+    'drivers/usb',
+    'drivers/usb/',
+    'drivers/usb/host/ehci.c',
+    'drivers/nothing',
+    # "*" does not match "/" and hidden names
+    '*.c',
+    'drivers/*',
+    'drivers/*/*.c',
+    'drivers/net/*.c',
+    'drivers/*/.*',
+    # "?"
+    'drivers/net/??.c',
+    'drivers/net/?.c',
+    'drivers/???',
+    # Character classes
+    'drivers/net/[ab]1.c',
+    'drivers/net/[a-b][0-9].c',
+    'drivers/net/[!a]*.c',
+    'drivers/net/[^a]*.c',
+    'fs/[!]/*.c',
+    'fs/[]]/*.c',
+    'fs/[!!]/*.c',
+    'lib/[[]a]/*.c',
+    'lib/[a',
+    # Recursive "**" matches zero or more directories
+    '**',
+    '**/*.c',
+    'drivers/**',
+    'drivers/**/*.c',
+    'drivers/**/host',
+    'drivers/**/ehci.c',
+    '**/x.c',
+    # Regular expression metacharacters are literals
+    'lib/c++',
+    'lib/c++/*.c',
+    'lib/a.b/*',
+    'lib/a?b',
+    'lib/(x)|{y}$^',
+    'lib/(x)|{y}$^/*.c',
+    'lib/*$^/*.c',
+    'lib/a.*'
+]
+
+
+class FakeClade:
+    """Build base with given source files placed in the storage."""
+
+    def __init__(self, storage, files):
+        self.storage = storage
+        self.compilation_cmds = [{'id': i, 'type': 'CC', 'in': [file], 'out': [file + '.o']}
+                                 for i, file in enumerate(files)]
+
+    def get_storage_path(self, path):
+        return os.path.join(self.storage, path)
+
+    @staticmethod
+    def get_file_size(path):
+        return 100
+
+
+@pytest.fixture
+def program(tmp_path):
+    storage = str(tmp_path)
+    for file in FILES:
+        os.makedirs(os.path.dirname(os.path.join(storage, file)), exist_ok=True)
+        with open(os.path.join(storage, file), 'w', encoding='utf-8'):
+            pass
+
+    return Program(logging.getLogger(), FakeClade(storage, FILES), [''], memory_efficient_mode=True)
+
+
+def get_files_by_glob(storage, expression):
+    """Match files like get_files_by_expressions() did with glob: files themselves or files from found directories."""
+    found = {os.path.relpath(path, storage) for path in glob.glob(os.path.join(storage, expression), recursive=True)}
+    return {file for file in FILES if file in found or os.path.dirname(file) in found}
+
+
+@pytest.mark.parametrize('expression', EXPRESSIONS)
+def test_get_files_by_expressions(program, expression):
+    files, matched = program.get_files_by_expressions({expression})
+    expected = get_files_by_glob(program.clade.storage, expression)
+    assert {file.name for file in files} == expected
+    assert matched == ({expression} if expected else set())
+
+
+def test_get_files_by_several_expressions(program):
+    files, matched = program.get_files_by_expressions({'drivers/net', 'drivers/*/a1.c', 'fs/*', 'nothing/*'})
+    assert {file.name for file in files} == {'drivers/net/a1.c', 'drivers/net/b2.c', 'drivers/net/.c', 'fs/!/e.c',
+                                             'fs/]/f.c'}
+    # Files are matched by the first suitable expression only, but each expression matching files is reported.
+    assert 'drivers/net' in matched and 'fs/*' in matched
+    assert 'nothing/*' not in matched
+
+
+@pytest.mark.parametrize('pattern', [
+    '*', '*.c', 'a*', '.*', '?', '??.c', '.?', '[ab].c', '[a-c]*', '[!a]*', '[^a]*', '[]]', '[!]]', '[]', '[!]',
+    '[', 'a[', '[a', '[[]', '[\\]', '[a|b]', '[&~]', '[a-]', 'a+b', 'a.c', '(a)|{b}$', 'a\\b'
+])
+@pytest.mark.parametrize('name', [
+    'a', 'b', '|', '&', '~', '-', 'a.c', 'b.c', 'ab.c', 'ac', '.c', '.a', '.hidden', '^', '!', ']', '[', '[]', 'a[',
+    '[a', '\\', 'a+b', 'aab', 'abc', '(a)|{b}$', 'a\\b'
+])
+def test_glob_to_regex(pattern, name):
+    # Within a single path component glob matches like fnmatch but wildcards do not match hidden names.
+    expected = fnmatch.fnmatchcase(name, pattern) and not (name.startswith('.') and not pattern.startswith('.'))
+    assert bool(_glob_to_regex(pattern).match(name)) == expected
+
+
+@pytest.mark.parametrize('pattern, path, expected', [
+    ('*/b', 'a/b', True),
+    ('*', 'a/b', False),
+    ('a?b', 'a/b', False),
+    ('a[/]b', 'a/b', False),
+    ('**', 'a/b/c', True),
+    ('**', '.a/b', False),
+    ('a/**', 'a', False),
+    ('a/**', 'a/', True),
+    ('a/**/b', 'a/b', True),
+    ('a/**/b', 'a/x/y/b', True),
+    ('a/**/b', 'a/.x/b', False),
+    ('a/**/b', 'a/x/yb', False),
+    ('**/b', 'b', True),
+    ('a/b', 'a/bc', False)
+])
+def test_glob_to_regex_paths(pattern, path, expected):
+    assert bool(_glob_to_regex(pattern).match(path)) == expected
@@ -0,0 +1,130 @@
+#
+# Copyright (c) 2021 ISP RAS (http://www.ispras.ru)
+# Ivannikov Institute for System Programming of the Russian Academy of Sciences
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import os
+import sys
+import random
+import logging
+import resource
+import multiprocessing
+
+import pytest
+
+from klever.core.pfg.abstractions import Program
+
+FILES_NUM = 200000
+# Memory per file of the program including the compact callgraph representation
+MAX_BYTES_PER_FILE = 1024
+
+
+class SyntheticClade:
+    """Build base with files each of which defines a couple of global functions that call functions of other files."""
+
+    def __init__(self, files_num, seed=0):
+        rnd = random.Random(seed)
+        self.__files = ['drivers/dir{}/file{}.c'.format(i // 100, i) for i in range(files_num)]
+        self.__functions = {file: ('file{}_func0'.format(i), 'file{}_func1'.format(i))
+                            for i, file in enumerate(self.__files)}
+        self.__calls = {file: [rnd.randrange(files_num) for _ in range(4)] for file in self.__files}
+        self.compilation_cmds = [{'id': i, 'type': 'CC', 'in': [file], 'out': [file + '.o']}
+                                 for i, file in enumerate(self.__files)]
+
+    @staticmethod
+    def get_storage_path(path):
+        return os.path.join('/storage', path)
+
+    @staticmethod
+    def get_file_size(path):
+        return 100
+
+    def get_functions_by_file(self, files):
+        return {file: {func: {'type': 'global'} for func in self.__functions[file]} for file in files}
+
+    def get_callgraph(self, files):
+        callgraph = dict()
+        for file in files:
+            callees = iter(self.__calls[file])
+            callgraph[file] = dict()
+            for func in self.__functions[file]:
+                calls = dict()
+                for callee in (next(callees), next(callees)):
+                    calls.setdefault(self.__files[callee], dict())[self.__functions[self.__files[callee]][0]] = \
+                        {'1': {'match_type': 1}}
+                callgraph[file][func] = {'type': 'global', 'calls': calls}
+        return callgraph
+
+
+def measure_program_memory(files_num):
+    """Get the growth of the peak resident set size at building the program. This should be run in a fresh process."""
+    os.path.isfile = lambda path: True
+    clade = SyntheticClade(files_num)
+    # Tracing of allocations slows building of the program down by an order of magnitude, so measure the growth of the
+    # peak resident set size. Memory for the synthetic build base is allocated in advance.
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    program = Program(logging.getLogger(), clade, [''])
+    assert len(program.files) == files_num
+    return (resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - rss) * 1024
+
+
+@pytest.fixture
+def clade(monkeypatch):
+    monkeypatch.setattr(os.path, 'isfile', lambda path: True)
+    return SyntheticClade(100)
+
+
+def test_program(clade):
+    program = Program(logging.getLogger(), clade, [''])
+    assert len(program.files) == 100
+
+    for file in program.files:
+        # Files do not have dictionaries of attributes and share names with the build base.
+        assert not hasattr(file, '__dict__')
+        assert file.name is sys.intern(file.name)
+        assert program._files[file.name] is file
+
+        expected = set()
+        for desc in clade.get_callgraph({file.name})[file.name].values():
+            expected.update(program._files[callee] for callee in desc['calls'] if callee != file.name)
+        assert file.successors == expected
+        assert set(file.import_functions.values()) == expected
+        assert all(file in successor.predecessors for successor in file.successors)
+        assert all(file in predecessor.successors for predecessor in file.predecessors)
+        assert set(file.export_functions) == {func for func in clade.get_functions_by_file({file.name})[file.name]}
+
+
+def test_fragment_dependencies(clade):
+    program = Program(logging.getLogger(), clade, [''])
+    files = sorted(program.files)
+    fragment = program.create_fragment('first', files[:10], add=True)
+    assert not hasattr(fragment, '__dict__')
+    assert fragment.name is sys.intern('first')
+    for i in range(10, len(files), 10):
+        program.create_fragment('fragment{}'.format(i), files[i:i + 10], add=True)
+
+    successors = {program.get_fragments_with_files({s}).pop() for file in fragment.files for s in file.successors}
+    assert program.get_fragment_successors(fragment) == successors.difference({fragment})
+    predecessors = {program.get_fragments_with_files({p}).pop() for file in fragment.files
+                    for p in file.predecessors}
+    assert program.get_fragment_predecessors(fragment) == predecessors.difference({fragment})
+
+
+@pytest.mark.skipif(not os.environ.get('KLEVER_BENCHMARKS'), reason='set KLEVER_BENCHMARKS to run benchmarks')
+def test_program_memory():
+    # Peak resident set size of the test process was likely reached before, so measure it in a fresh process.
+    with multiprocessing.get_context('spawn').Pool(1) as pool:
+        used = pool.apply(measure_program_memory, (FILES_NUM,))
+    assert 0 < used / FILES_NUM < MAX_BYTES_PER_FILE
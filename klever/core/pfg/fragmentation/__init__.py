@@ -107,7 +107,7 @@ class FragmentationAlgorythm:
                 allfiles = set()
                 for item in defined_groups[manual]:
                     allfiles.update(item.files)
-                fragment.files.difference_update(allfiles)
+                deps.remove_fragment_files(fragment, allfiles)
 
         # Before describing files add manually defined files
         for group in grps:
@@ -267,8 +267,8 @@ class FragmentationAlgorythm:
         # Do modification
         empty = set()
         for fragment in program.fragments:
-            fragment.files.update(addiction)
-            fragment.files.difference_update(removal)
+            program.add_fragment_files(fragment, addiction)
+            program.remove_fragment_files(fragment, removal)
             if not fragment.files:
                 empty.add(fragment)
 
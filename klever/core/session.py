@@ -15,12 +15,37 @@
 # limitations under the License.
 #
 
+import base64
+import binascii
+import gzip
+import hashlib
+import io
 import json
 import os
+import random
 import requests
+import requests.adapters
+import threading
 import time
 import zipfile
 
+# Parameters of capped exponential backoff used when Bridge is not available.
+RETRY_BASE_DELAY = 0.2
+RETRY_MAX_DELAY = 30
+# The number of keep-alive connections that are kept open to Bridge by each process.
+POOL_MAXSIZE = 10
+# Size of chunks in which files are read when uploading them.
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+# Size of chunks in which downloaded archives are written.
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+
+# Tokens are obtained just once and they are inherited by all forked Core processes.
+_tokens = {}
+# Each process and each thread has its own HTTP sessions since connection pools can not be shared between processes
+# safely and requests does not guarantee thread safety of HTTP sessions.
+_http_sessions = {}
+_lock = threading.Lock()
+
 
 class UnexpectedStatusCode(IOError):
     pass
@@ -30,6 +55,78 @@ class BridgeError(IOError):
     pass
 
 
+def _get_http_session(name):
+    key = (os.getpid(), threading.get_ident(), name)
+
+    with _lock:
+        if key not in _http_sessions:
+            # Forget sessions of parent processes. They refer to connections that belong to parents.
+            for other_key in [k for k in _http_sessions if k[0] != key[0]]:
+                del _http_sessions[other_key]
+
+            http_session = requests.Session()
+            adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=POOL_MAXSIZE)
+            http_session.mount('http://', adapter)
+            _http_sessions[key] = http_session
+
+        return _http_sessions[key]
+
+
+def _get_retry_delay(attempt):
+    # Use "full jitter" so that many processes that lost connection simultaneously will not retry all together.
+    return random.uniform(0, min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2 ** min(attempt, 16)))
+
+
+class MultipartStream:
+    """
+    Body of multipart/form-data request that reads attached files by chunks rather than loads them into memory. Its
+    length is known in advance, so it is not sent with chunked transfer encoding that is not supported by Bridge.
+    """
+
+    def __init__(self, data, files):
+        self.boundary = os.urandom(16).hex()
+        self.content_type = 'multipart/form-data; boundary={0}'.format(self.boundary)
+        self.__parts = []
+
+        for name, value in data.items():
+            self.__parts.append((self.__get_part_header(name), value.encode('utf-8')))
+
+        for name, content in files.items():
+            file_name = name if isinstance(content, bytes) else os.path.basename(content)
+            self.__parts.append((self.__get_part_header(name, file_name), content))
+
+        self.__trailer = '--{0}--\r\n'.format(self.boundary).encode('utf-8')
+
+    def __get_part_header(self, name, file_name=None):
+        header = '--{0}\r\nContent-Disposition: form-data; name="{1}"'.format(self.boundary, name)
+        if file_name:
+            header += '; filename="{0}"\r\nContent-Type: application/octet-stream'.format(file_name)
+        return (header + '\r\n\r\n').encode('utf-8')
+
+    def __len__(self):
+        length = len(self.__trailer)
+        for header, content in self.__parts:
+            # Contents are either bytes or paths to files.
+            length += len(header) + (len(content) if isinstance(content, bytes) else os.path.getsize(content)) + 2
+        return length
+
+    def __iter__(self):
+        # Body can be iterated several times since requests are repeated on connection errors.
+        for header, content in self.__parts:
+            yield header
+
+            if isinstance(content, bytes):
+                yield content
+            else:
+                with open(content, 'rb') as fp:
+                    for chunk in iter(lambda: fp.read(UPLOAD_CHUNK_SIZE), b''):
+                        yield chunk
+
+            yield b'\r\n'
+
+        yield self.__trailer
+
+
 # TODO: it would be better to name it BridgeRequests. This is the case for Scheduler and CLI.
 class Session:
     def __init__(self, logger, bridge, job_id):
@@ -41,6 +138,7 @@ class Session:
 
         self.error = None
 
+        self.__token = None
         self.__parameters = {
             'username': bridge['user'],
             'password': bridge['password']
@@ -49,24 +147,52 @@ class Session:
         # Sign in.
         self.__signin()
 
+    @property
+    def session(self):
+        # Get HTTP session just before sending requests since Session objects can be created in parent processes.
+        return _get_http_session(self.name)
+
     # TODO: It is not signing in anymore. It is getting token. This is the case for Scheduler and CLI.
-    def __signin(self):
-        self.session = requests.Session()
-        resp = self.__request('service/get_token/', 'POST', data=self.__parameters)
-        self.session.headers.update({'Authorization': 'Token {}'.format(resp.json()['token'])})
-        self.logger.debug('Session was created')
+    def __signin(self, force=False):
+        key = (self.name, self.__parameters['username'])
 
-    def __request(self, path_url, method, **kwargs):
+        if force or key not in _tokens:
+            resp = self.__request('service/get_token/', 'POST', authorize=False, data=self.__parameters)
+            _tokens[key] = resp.json()['token']
+            self.logger.debug('Session was created')
+        else:
+            self.logger.debug('Reuse existing session token')
+
+        self.__token = _tokens[key]
+
+    def __request(self, path_url, method, authorize=True, **kwargs):
         url = 'http://' + self.name + '/' + path_url
 
         kwargs.setdefault('allow_redirects', True)
 
         self.logger.debug('Send "{0}" request to "{1}"'.format(method, url))
 
+        attempt = 0
+        is_signed_in = False
         while True:
             try:
+                if authorize:
+                    kwargs.setdefault('headers', {})['Authorization'] = 'Token {}'.format(self.__token)
+
                 resp = self.session.request(method, url, **kwargs)
 
+                # Token could be revoked, e.g. when Bridge was redeployed. Get the new one and repeat request. Do not
+                # try this again if Bridge rejects the new token as well.
+                if resp.status_code == 401 and authorize:
+                    resp.close()
+                    if is_signed_in:
+                        raise BridgeError('Klever Bridge rejected the new token when send "{0}" request to "{1}"'
+                                          .format(method, url))
+                    self.logger.warning('Token was rejected by Klever Bridge, get the new one')
+                    self.__signin(force=True)
+                    is_signed_in = True
+                    continue
+
                 if resp.status_code not in (200, 201, 204):
                     if resp.headers['content-type'] == 'application/json':
                         self.error = resp.json()
@@ -83,7 +209,8 @@ class Session:
                 return resp
             except requests.ConnectionError:
                 self.logger.warning('Could not send "{0}" request to "{1}"'.format(method, url))
-                time.sleep(0.2)
+                time.sleep(_get_retry_delay(attempt))
+                attempt += 1
 
     def start_job_decision(self, job_format, archive):
         self.__download_archive('job', 'jobs/api/download-files/' + self.job_id,
@@ -107,50 +234,76 @@ class Session:
         resp = self.__request('reports/api/has-sources/?identifier={0}'.format(src_id), method='GET')
         return resp.json()['exists']
 
-    def get_tasks_statuses(self):
-        resp = self.__request('service/tasks/?job={}&fields=status&fields=id'.format(self.job_id), method='GET')
+    def get_finished_tasks_statuses(self, finished_after):
+        resp = self.__request('service/tasks/?job={}&finished_after={}&fields=status&fields=id&fields=finish_index'
+                              .format(self.job_id, finished_after), method='GET')
         return resp.json()
 
     def get_task_error(self, task_id):
         resp = self.__request('service/tasks/{}/?fields=error'.format(task_id), method='GET')
         return resp.json()['error']
 
-    def download_decision(self, task_id):
-        self.__download_archive('decision', 'service/solution/{}/download/'.format(task_id),
-                                archive='decision result files.zip')
+    def download_decision(self, task_id, archive='decision result files.zip'):
+        self.__download_archive('decision', 'service/solution/{}/download/'.format(task_id), archive=archive)
 
     def remove_task(self, task_id):
         self.__request('service/tasks/{}/'.format(task_id), method='DELETE')
 
-    def upload_original_sources(self, src_id, src_archive):
-        self.__upload_archives('reports/api/upload-sources/',
+    def remove_tasks(self, task_ids):
+        self.__request('service/remove-tasks/', method='POST', data={'ids': json.dumps(task_ids)})
+
+    def get_missing_original_source_files(self, hash_sums):
+        resp = self.__upload_archives('reports/api/missing-source-files/', {},
+                                      {'hash_sums': self.__compress_json(hash_sums)})
+        return resp['missing']
+
+    def upload_original_source_files(self, src_id, hash_sums, new_files, src_archive):
+        # There may be too many source files to pass their hash sums and names as form fields.
+        self.__upload_archives('reports/api/upload-source-files/',
                                {'identifier': src_id},
-                               {'archive': src_archive})
+                               {
+                                   'hash_sums': self.__compress_json(hash_sums),
+                                   'new_files': self.__compress_json(new_files),
+                                   'archive': src_archive
+                               })
 
     def upload_reports_and_report_file_archives(self, reports_and_report_file_archives):
-        batch_reports = []
+        task_ids = []
         batch_report_file_archives = []
-        for report_and_report_file_archives in reports_and_report_file_archives:
-            with open(report_and_report_file_archives['report file'], encoding='utf-8') as fp:
-                batch_reports.append(json.load(fp))
 
-            report_file_archives = report_and_report_file_archives.get('report file archives')
-            if report_file_archives:
-                batch_report_file_archives.extend(report_file_archives)
-
-        # TODO: report is likely should be compressed.
+        # Reports are already serialized, so just put them one by one to compressed JSON array.
+        reports = io.BytesIO()
+        with gzip.GzipFile(fileobj=reports, mode='wb') as gzfp:
+            gzfp.write(b'[')
+            for i, report_and_report_file_archives in enumerate(reports_and_report_file_archives):
+                with open(report_and_report_file_archives['report file'], 'rb') as fp:
+                    report = fp.read()
+
+                if i:
+                    gzfp.write(b',')
+                gzfp.write(report)
+
+                task_id = json.loads(report.decode('utf-8')).get('task identifier')
+                if task_id:
+                    task_ids.append(task_id)
+
+                report_file_archives = report_and_report_file_archives.get('report file archives')
+                if report_file_archives:
+                    batch_report_file_archives.extend(report_file_archives)
+            gzfp.write(b']')
+
+        files = {os.path.basename(archive): archive for archive in batch_report_file_archives}
+        files['reports'] = reports.getvalue()
         self.__upload_archives('reports/api/upload/{0}/'.format(self.job_id),
                                {
-                                   'reports': json.dumps(batch_reports),
                                    'archives': json.dumps([os.path.basename(archive)
                                                            for archive in batch_report_file_archives])
                                },
-                               {os.path.basename(archive): archive for archive in batch_report_file_archives})
+                               files)
 
-        # We can safely remove task and its files after uploading report referencing task files.
-        for report in batch_reports:
-            if 'task identifier' in report:
-                self.remove_task(report['task identifier'])
+        # We can safely remove tasks and their files after uploading reports referencing task files.
+        if task_ids:
+            self.remove_tasks(task_ids)
 
     def submit_progress(self, progress):
         self.logger.info('Submit solution progress')
@@ -163,11 +316,21 @@ class Session:
                 resp = self.__request(path_url, 'GET', data=data, stream=True)
 
                 self.logger.debug('Write {0} archive to "{1}"'.format(kind, archive))
+                md5 = hashlib.md5()
                 with open(archive, 'wb') as fp:
-                    for chunk in resp.iter_content(1024):
+                    for chunk in resp.iter_content(DOWNLOAD_CHUNK_SIZE):
+                        md5.update(chunk)
                         fp.write(chunk)
 
-                if not zipfile.is_zipfile(archive) or zipfile.ZipFile(archive).testzip():
+                # Bridge provides digests for some archives, e.g. for decisions. This is much cheaper than reading the
+                # whole archive again to test it.
+                digest = self.__get_md5_digest(resp)
+                if digest:
+                    if digest != md5.digest():
+                        self.logger.warning('Checksum of downloaded ZIP archive does not match')
+                    else:
+                        break
+                elif not zipfile.is_zipfile(archive) or zipfile.ZipFile(archive).testzip():
                     self.logger.warning('Could not download ZIP archive')
                 else:
                     break
@@ -175,9 +338,25 @@ class Session:
                 if resp:
                     resp.close()
 
+    @staticmethod
+    def __get_md5_digest(resp):
+        # See RFC 3230.
+        for digest in resp.headers.get('Digest', '').split(','):
+            algorithm, _, value = digest.strip().partition('=')
+            if algorithm.lower() == 'md5':
+                try:
+                    return base64.b64decode(value, validate=True)
+                # Malformed digests are ignored, so archives are tested as if there are no digests at all.
+                except binascii.Error:
+                    return None
+
+        return None
+
+    @staticmethod
+    def __compress_json(data):
+        return gzip.compress(json.dumps(data).encode('utf-8'))
+
     def __upload_archives(self, path_url, data, archives):
-        resp = self.__request(path_url, 'POST', data=data,
-                              files={archive_name: open(archive_path, 'rb')
-                                     for archive_name, archive_path in archives.items()},
-                              stream=True)
+        body = MultipartStream(data, archives)
+        resp = self.__request(path_url, 'POST', data=body, headers={'Content-Type': body.content_type}, stream=True)
         return resp.json()
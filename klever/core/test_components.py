@@ -0,0 +1,108 @@
+#
+# Copyright (c) 2021 ISP RAS (http://www.ispras.ru)
+# Ivannikov Institute for System Programming of the Russian Academy of Sciences
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import os
+import time
+import logging
+import threading
+import multiprocessing
+
+import pytest
+
+from klever.core.components import Component, launch_queue_workers, launch_workers
+
+TASKS_NUM = 1000
+WORKERS_NUM = 8
+# Elements put one by one to measure the latency of starting workers for them
+LATENCY_TASKS_NUM = 20
+# Supervisors should not poll workers and queues with periods comparable with the time of starting workers
+MAX_LATENCY = 0.1
+CONF = {
+    'logging': {'loggers': [{'name': 'default', 'handlers': [{'name': 'console', 'level': 'NONE'}]}]},
+    'keep intermediate files': False
+}
+
+
+class TrivialComponent(Component):
+    def __init__(self, element, started=None):
+        super().__init__(CONF, logging.getLogger(), '/', {}, {}, {}, id='trivial{}'.format(element))
+        self.started = started
+
+    def main(self):
+        if self.started:
+            self.started.put(time.time())
+
+
+@pytest.fixture
+def work_dir(tmp_path):
+    cwd = os.getcwd()
+    os.chdir(str(tmp_path))
+    # Components that are not separated from parents put consumed resources there.
+    os.makedirs('child resources')
+    yield
+    os.chdir(cwd)
+
+
+@pytest.mark.skipif(not os.environ.get('KLEVER_BENCHMARKS'), reason='set KLEVER_BENCHMARKS to run benchmarks')
+def test_launch_workers_dispatch(work_dir):
+    started = multiprocessing.Queue()
+    start = time.time()
+    for i in range(0, TASKS_NUM, WORKERS_NUM):
+        launch_workers(logging.getLogger(), [TrivialComponent(j, started)
+                                             for j in range(i, min(i + WORKERS_NUM, TASKS_NUM))])
+    assert len([started.get() for _ in range(TASKS_NUM)]) == TASKS_NUM
+    # Workers are created, started and joined by batches, so there should not be any delays besides forks.
+    assert (time.time() - start) / TASKS_NUM < MAX_LATENCY
+
+
+@pytest.mark.skipif(not os.environ.get('KLEVER_BENCHMARKS'), reason='set KLEVER_BENCHMARKS to run benchmarks')
+def test_launch_queue_workers_dispatch(work_dir):
+    queue = multiprocessing.Queue()
+    started = multiprocessing.Queue()
+    for i in range(TASKS_NUM):
+        queue.put(i)
+    queue.put(None)
+
+    start = time.time()
+    assert launch_queue_workers(logging.getLogger(), queue, lambda element: TrivialComponent(element, started),
+                                WORKERS_NUM, False) == 0
+    assert len([started.get() for _ in range(TASKS_NUM)]) == TASKS_NUM
+    assert (time.time() - start) / TASKS_NUM < MAX_LATENCY
+
+
+@pytest.mark.skipif(not os.environ.get('KLEVER_BENCHMARKS'), reason='set KLEVER_BENCHMARKS to run benchmarks')
+def test_launch_queue_workers_latency(work_dir):
+    queue = multiprocessing.Queue()
+    started = multiprocessing.Queue()
+    latencies = []
+
+    def put_elements():
+        # Put next element just after the worker for the previous one started, so supervisor waits for it.
+        for i in range(LATENCY_TASKS_NUM):
+            put_time = time.time()
+            queue.put(i)
+            latencies.append(started.get() - put_time)
+        queue.put(None)
+
+    thread = threading.Thread(target=put_elements)
+    thread.start()
+    assert launch_queue_workers(logging.getLogger(), queue, lambda element: TrivialComponent(element, started),
+                                WORKERS_NUM, False) == 0
+    thread.join()
+
+    assert len(latencies) == LATENCY_TASKS_NUM
+    assert sum(latencies) / LATENCY_TASKS_NUM < MAX_LATENCY
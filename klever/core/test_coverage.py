@@ -0,0 +1,254 @@
+#
+# Copyright (c) 2021 ISP RAS (http://www.ispras.ru)
+# Ivannikov Institute for System Programming of the Russian Academy of Sciences
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import os
+import glob
+import json
+import pickle
+import logging
+import resource
+import multiprocessing
+
+import pytest
+
+from klever.core.coverage import CoverageAccumulator, LCOV
+
+# Lines of the generated CIL source file and coverage records for them that take about 100 MB each
+LINES_NUM = 7000000
+FILES_NUM = 1000
+FUNCTION_LINES_NUM = 10
+# Memory per line of the CIL source file
+MAX_BYTES_PER_LINE = 160
+
+CIL_SOURCE = '''int ldv_x;
+#line 3 "/storage/src/main.c"
+int f(void)
+{
+  return ldv_x;
+}
+#line 10 "/storage/src/include/x.h"
+static int g(void) { return 0; }
+#line 7 "/storage/src/main.c"
+int main(void)
+{
+  return f();
+}
+'''
+
+COVERAGE = '''TN:
+SF:/tmp/cil.i
+FN:3,f
+FN:8,g
+FN:10,main
+FNDA:2,f
+FNDA:0,g
+FNDA:1,main
+DA:2,5
+DA:3,2
+DA:4,2,checksum
+ADD:assumption
+DA:5,2
+DA:8,0
+TIMERS:timers
+ADD:assumption
+DA:10,1
+TIMERS:timers
+DA:11,1
+DA:100,1
+end_of_record
+'''
+
+
+@pytest.fixture
+def task_coverage():
+    return {
+        'main.c': {
+            'total functions': 2,
+            'original source file name': '/src/main.c',
+            'covered lines': {'3': 2, '5': 0},
+            'covered functions': {'3': 2},
+            'covered function names': ['f'],
+            'notes': {'5': {'kind': 'Verifier assumption', 'text': 'a'}}
+        }
+    }
+
+
+def test_accumulator(task_coverage):
+    accumulator = CoverageAccumulator()
+    assert list(accumulator.items()) == []
+
+    accumulator.add(task_coverage)
+    accumulator.add({
+        'main.c': {
+            'total functions': 2,
+            'covered lines': {3: 1, 7: 1},
+            'covered functions': {'3': 1, '7': 1},
+            'covered function names': ['main', 'f'],
+            'notes': {'7': {'kind': 'Verifier assumption', 'text': 'b'}}
+        },
+        'x.h': {
+            'total functions': 1,
+            'original source file name': '/src/x.h',
+            'covered lines': {'10': 0},
+            'covered functions': {'10': 0},
+            'covered function names': [],
+            'notes': {}
+        }
+    })
+
+    assert dict(accumulator.items()) == {
+        'main.c': {
+            'total functions': 2,
+            'original source file name': '/src/main.c',
+            # Lines that are not covered are kept unlike lines that are not considered at all.
+            'covered lines': {3: 3, 5: 0, 7: 1},
+            'covered functions': {3: 3, 7: 1},
+            'covered function names': ['f', 'main'],
+            'notes': {5: {'kind': 'Verifier assumption', 'text': 'a'},
+                      7: {'kind': 'Verifier assumption', 'text': 'b'}}
+        },
+        'x.h': {
+            'total functions': 1,
+            'original source file name': '/src/x.h',
+            'covered lines': {10: 0},
+            'covered functions': {10: 0},
+            'covered function names': [],
+            'notes': {}
+        }
+    }
+
+
+def test_accumulator_does_not_change_added_coverage(task_coverage):
+    accumulator = CoverageAccumulator()
+    accumulator.add(task_coverage)
+    accumulator.add(task_coverage)
+    assert task_coverage['main.c']['covered lines'] == {'3': 2, '5': 0}
+    assert dict(accumulator.items())['main.c']['covered lines'] == {3: 4, 5: 0}
+
+
+class FakeClade:
+    storage_dir = '/storage'
+
+
+def get_coverage(tmp_path, conf):
+    with open(os.path.join(str(tmp_path), 'cil.i'), 'w', encoding='utf-8') as fp:
+        fp.write(CIL_SOURCE)
+    with open(os.path.join(str(tmp_path), 'coverage.info'), 'w', encoding='utf-8') as fp:
+        fp.write(COVERAGE)
+
+    lcov = LCOV(dict(conf, **{'keep intermediate files': False}), logging.getLogger(), 'coverage.info', FakeClade(),
+                ['/src'], [], str(tmp_path), 'All source files', 'coverage.json', 'coverage', {'cil.i': 'cil.i'})
+    with open('coverage.json', encoding='utf-8') as fp:
+        assert json.load(fp) == json.loads(json.dumps(lcov.coverage_info))
+    return lcov.coverage_info
+
+
+@pytest.fixture
+def expected_coverage():
+    return {
+        'source files/main.c': {
+            'covered lines': {3: 2, 4: 2, 5: 2, 7: 1, 8: 1},
+            'covered functions': {3: 2, 7: 1},
+            'covered function names': ['f', 'main'],
+            'total functions': 2,
+            'notes': {5: {'kind': 'Verifier assumption', 'text': 'assumption'},
+                      7: {'kind': 'Multiple notes', 'text': 'timers. assumption'},
+                      8: {'kind': 'Verifier operation statistics', 'text': 'timers'}},
+            'original source file name': '/storage/src/main.c'
+        },
+        'source files/include/x.h': {
+            'covered lines': {10: 0},
+            'covered functions': {10: 0},
+            'covered function names': ['g'],
+            'total functions': 1,
+            'notes': {},
+            'original source file name': '/storage/src/include/x.h'
+        }
+    }
+
+
+def test_lcov(tmp_path, monkeypatch, expected_coverage):
+    monkeypatch.chdir(tmp_path)
+    # Line 2 is a line directive that does not correspond to original source lines and line 100 is out of the CIL
+    # source file.
+    assert get_coverage(tmp_path, {}) == expected_coverage
+
+
+def test_lcov_cil_line_map_cache(tmp_path, monkeypatch, expected_coverage):
+    monkeypatch.chdir(tmp_path)
+    cache_dir = str(tmp_path / 'cache')
+    assert get_coverage(tmp_path, {'cache directory': cache_dir}) == expected_coverage
+    cache_files = glob.glob(os.path.join(cache_dir, 'CIL', '*.line map'))
+    assert len(cache_files) == 1
+
+    # The line map is taken from the cache for the CIL source file with the same content, so change it there.
+    with open(cache_files[0], 'rb') as fp:
+        orig_files, orig_file_ids, orig_lines = pickle.load(fp)
+    orig_files = [orig_file.replace('main.c', 'other.c') if orig_file else None for orig_file in orig_files]
+    with open(cache_files[0], 'wb') as fp:
+        pickle.dump((orig_files, orig_file_ids, orig_lines), fp)
+
+    os.remove('coverage.json')
+    os.rename('coverage', 'first coverage')
+    coverage = get_coverage(tmp_path, {'cache directory': cache_dir})
+    assert coverage['source files/other.c']['covered lines'] == \
+        expected_coverage['source files/main.c']['covered lines']
+    assert 'source files/main.c' not in coverage
+
+
+def generate_coverage(path, lines_num):
+    """Generate CIL source file with the given number of lines referring to several original source files and coverage
+    for all its lines."""
+    file_lines_num = lines_num // FILES_NUM
+    with open(os.path.join(path, 'cil.i'), 'w', encoding='utf-8') as cil_fp, \
+            open(os.path.join(path, 'coverage.info'), 'w', encoding='utf-8') as cov_fp:
+        cov_fp.write('TN:\nSF:/tmp/cil.i\n')
+        line = 1
+        for file_id in range(FILES_NUM):
+            cil_fp.write('#line 1 "/storage/src/file{0}.c"\n'.format(file_id))
+            line += 1
+            for file_line in range(file_lines_num - 1):
+                if file_line % FUNCTION_LINES_NUM == 0:
+                    cil_fp.write('int f{0}(void) {{\n'.format(line))
+                    cov_fp.write('FN:{0},f{0}\nFNDA:1,f{0}\n'.format(line))
+                else:
+                    cil_fp.write('  ldv_x = {0};\n'.format(line))
+                cov_fp.write('DA:{0},{1}\n'.format(line, line % 3))
+                line += 1
+        cov_fp.write('end_of_record\n')
+
+
+def measure_lcov_memory(lines_num, path):
+    """Get the growth of the peak resident set size at parsing coverage. This should be run in a fresh process."""
+    os.chdir(path)
+    generate_coverage(path, lines_num)
+    # Tracing of allocations slows parsing down by an order of magnitude, so measure the growth of the peak resident
+    # set size.
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    lcov = LCOV({'keep intermediate files': False}, logging.getLogger(), 'coverage.info', FakeClade(), ['/src'], [],
+                path, 'All source files', 'coverage.json', 'coverage', {'cil.i': 'cil.i'})
+    used = (resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - rss) * 1024
+    assert len(lcov.coverage_info) == FILES_NUM
+    return used
+
+
+@pytest.mark.skipif(not os.environ.get('KLEVER_BENCHMARKS'), reason='set KLEVER_BENCHMARKS to run benchmarks')
+def test_lcov_memory(tmp_path):
+    # Peak resident set size of the test process was likely reached before, so measure it in a fresh process.
+    with multiprocessing.get_context('spawn').Pool(1) as pool:
+        used = pool.apply(measure_lcov_memory, (LINES_NUM, str(tmp_path)))
+    assert 0 < used / LINES_NUM < MAX_BYTES_PER_LINE
@@ -0,0 +1,56 @@
+#
+# Copyright (c) 2021 ISP RAS (http://www.ispras.ru)
+# Ivannikov Institute for System Programming of the Russian Academy of Sciences
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import logging
+
+from klever.core.highlight import Highlight
+
+
+def get_highlight(highlights):
+    highlight = Highlight(logging.getLogger(), '')
+    highlight.highlights = highlights
+    return highlight
+
+
+def test_extra_highlight_same_line():
+    # Just overlapping highlights at the same line are removed while the same offsets at other lines are kept.
+    highlight = get_highlight([['N', 1, 4, 5], ['N', 2, 4, 5], ['O', 2, 6, 7], ['N', 3, 4, 5]])
+    highlight.extra_highlight([['FuncDefRefTo', 2, 4, 5]])
+    assert highlight.highlights == [['N', 1, 4, 5], ['O', 2, 6, 7], ['N', 3, 4, 5], ['FuncDefRefTo', 2, 4, 5]]
+
+
+def test_extra_highlight_macro_definition():
+    # Macro definitions are split around extra highlights.
+    highlight = get_highlight([['CP', 1, 0, 20], ['CP', 2, 0, 20]])
+    highlight.extra_highlight([['MacroExpansionRefFrom', 1, 8, 11], ['MacroExpansionRefFrom', 2, 0, 3]])
+    assert highlight.highlights == [['MacroExpansionRefFrom', 1, 8, 11], ['MacroExpansionRefFrom', 2, 0, 3],
+                                    ['CP', 1, 0, 8], ['CP', 1, 11, 20], ['CP', 2, 3, 20]]
+
+
+def test_extra_highlight_several_per_line():
+    # Several extra highlights can remove highlights at the same line.
+    highlight = get_highlight([['KT', 1, 0, 3], ['N', 1, 4, 5], ['N', 1, 8, 9], ['N', 1, 12, 13]])
+    highlight.extra_highlight([['VarRefTo', 1, 4, 5], ['VarRefTo', 1, 12, 13]])
+    assert highlight.highlights == [['KT', 1, 0, 3], ['N', 1, 8, 9], ['VarRefTo', 1, 4, 5], ['VarRefTo', 1, 12, 13]]
+
+
+def test_extra_highlight_macro_definition_several_per_line():
+    # Macro definitions are split around all extra highlights at the same line at once.
+    highlight = get_highlight([['CP', 1, 0, 20]])
+    highlight.extra_highlight([['FuncDeclRefTo', 1, 10, 12], ['FuncDeclRefTo', 1, 3, 5]])
+    assert highlight.highlights == [['FuncDeclRefTo', 1, 10, 12], ['FuncDeclRefTo', 1, 3, 5],
+                                    ['CP', 1, 0, 3], ['CP', 1, 5, 10], ['CP', 1, 12, 20]]
@@ -0,0 +1,166 @@
+#
+# Copyright (c) 2021 ISP RAS (http://www.ispras.ru)
+# Ivannikov Institute for System Programming of the Russian Academy of Sciences
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import gzip
+import json
+import hashlib
+import logging
+import threading
+import email.parser
+
+import pytest
+
+import klever.core.session
+from klever.core.session import Session, BridgeError, MultipartStream
+
+HELLO_WORLD_MD5 = hashlib.md5(b'hello world').digest()
+
+
+class FakeResponse:
+    def __init__(self, status_code, data=None):
+        self.status_code = status_code
+        self.headers = {'content-type': 'application/json'}
+        self.__data = data or {}
+
+    def json(self):
+        return self.__data
+
+    def close(self):
+        pass
+
+
+class FakeBridge:
+    """Bridge that issues new tokens and accepts just tokens from the given set."""
+
+    def __init__(self, valid_tokens):
+        self.valid_tokens = valid_tokens
+        self.issued_tokens = 0
+        self.requests = []
+        self.bodies = []
+
+    def request(self, method, url, **kwargs):
+        self.requests.append(url)
+        if isinstance(kwargs.get('data'), MultipartStream):
+            self.bodies.append((b''.join(kwargs['data']), kwargs['headers']['Content-Type']))
+
+        if url.endswith('service/get_token/'):
+            self.issued_tokens += 1
+            return FakeResponse(200, {'token': 'token{}'.format(self.issued_tokens)})
+
+        if kwargs['headers']['Authorization'] not in {'Token ' + token for token in self.valid_tokens}:
+            return FakeResponse(401)
+
+        if url.endswith('reports/api/missing-source-files/'):
+            return FakeResponse(200, {'missing': ['hash2']})
+
+        return FakeResponse(200, {'exists': True})
+
+
+@pytest.fixture
+def bridge(monkeypatch):
+    monkeypatch.setattr(klever.core.session, '_tokens', {})
+    fake_bridge = FakeBridge(set())
+    monkeypatch.setattr(klever.core.session, '_get_http_session', lambda name: fake_bridge)
+    return fake_bridge
+
+
+def get_session():
+    return Session(logging.getLogger(), {'name': 'bridge', 'user': 'user', 'password': 'password'}, '1')
+
+
+def parse_multipart(body, content_type):
+    """Get form fields and contents of files from the multipart/form-data request body."""
+    message = email.parser.BytesParser().parsebytes(
+        'Content-Type: {0}\r\n\r\n'.format(content_type).encode('utf-8') + body)
+    assert message.is_multipart() and not message.defects
+    fields = {}
+    files = {}
+    for part in message.get_payload():
+        name = part.get_param('name', header='content-disposition')
+        if part.get_filename():
+            files[name] = part.get_payload(decode=True)
+        else:
+            fields[name] = part.get_payload()
+    return fields, files
+
+
+def test_token_is_shared(bridge):
+    bridge.valid_tokens.add('token1')
+    get_session()
+    assert get_session().check_original_sources('sources')
+    assert bridge.issued_tokens == 1
+
+
+def test_revoked_token(bridge):
+    session = get_session()
+    bridge.valid_tokens.add('token2')
+    assert session.check_original_sources('sources')
+    assert bridge.issued_tokens == 2
+
+
+def test_rejected_new_token(bridge):
+    session = get_session()
+    with pytest.raises(BridgeError):
+        session.check_original_sources('sources')
+    assert bridge.issued_tokens == 2
+    assert len(bridge.requests) == 4
+
+
+def test_http_session_per_thread():
+    http_sessions = [klever.core.session._get_http_session('bridge')]
+    thread = threading.Thread(target=lambda: http_sessions.append(klever.core.session._get_http_session('bridge')))
+    thread.start()
+    thread.join()
+    assert http_sessions[0] is klever.core.session._get_http_session('bridge')
+    assert http_sessions[0] is not http_sessions[1]
+
+
+@pytest.mark.parametrize('header,digest', [
+    # Digest of "hello world".
+    ('MD5=XrY7u+Ae7tCTyyK7j1rNww==', HELLO_WORLD_MD5),
+    ('SHA=thvDyvhfIqlvFe+A9MYgxAfm1q5=, md5=XrY7u+Ae7tCTyyK7j1rNww==', HELLO_WORLD_MD5),
+    ('SHA=thvDyvhfIqlvFe+A9MYgxAfm1q5=', None),
+    ('MD5=XrY7u+Ae7tCTyyK7j1rNww', None),
+    ('MD5=not base64!', None),
+    (None, None)
+])
+def test_md5_digest(header, digest):
+    resp = FakeResponse(200)
+    if header:
+        resp.headers['Digest'] = header
+    assert Session._Session__get_md5_digest(resp) == digest
+
+
+def test_original_source_files(bridge, tmp_path):
+    bridge.valid_tokens.add('token1')
+    session = get_session()
+    # Form fields are limited in size by Bridge while there may be very many source files.
+    hash_sums = ['hash{}'.format(i) for i in range(100000)]
+    assert session.get_missing_original_source_files(hash_sums) == ['hash2']
+    fields, files = parse_multipart(*bridge.bodies[-1])
+    assert fields == {}
+    assert json.loads(gzip.decompress(files['hash_sums']).decode('utf-8')) == hash_sums
+
+    archive = tmp_path / 'original sources.zip'
+    archive.write_bytes(b'archive')
+    new_files = {'hash2': ['b.c', 'b.c.idx.json']}
+    session.upload_original_source_files('sources', hash_sums, new_files, str(archive))
+    fields, files = parse_multipart(*bridge.bodies[-1])
+    assert fields == {'identifier': 'sources'}
+    assert json.loads(gzip.decompress(files['hash_sums']).decode('utf-8')) == hash_sums
+    assert json.loads(gzip.decompress(files['new_files']).decode('utf-8')) == new_files
+    assert files['archive'] == b'archive'
@@ -570,7 +570,8 @@ def report(logger, kind, report_data, mq, report_id, main_work_dir, report_dir='
 
     # Put report file and report file archives to message queue if it is specified.
     if mq:
-        mq.put({'report file': report_file, 'report file archives': archives})
+        mq.put({'report file': report_file, 'report file archives': archives,
+                'identifier': report_data.get('identifier')})
 
     return report_file
 
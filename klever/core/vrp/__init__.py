@@ -15,10 +15,12 @@
 # limitations under the License.
 #
 
+import concurrent.futures
 import glob
 import json
 import os
 import re
+import shutil
 import time
 import traceback
 import xml.etree.ElementTree as ElementTree
@@ -47,12 +49,16 @@ def __submit_common_attrs(context):
 
 
 class VRP(klever.core.components.Component):
+    # Decision archives are downloaded in advance by a bounded pool of threads while workers process results of other
+    # tasks. Processing of results is CPU bound while downloading is I/O bound, so they are configured separately.
+    DOWNLOAD_WORKERS = 4
 
     def __init__(self, conf, logger, parent_id, callbacks, mqs, vals, id=None, work_dir=None, attrs=None,
                  separate_from_parent=False, include_child_resources=False):
         # Requirement specification descriptions were already extracted when getting VTG callbacks.
         self.__downloaded = dict()
         self.__workers = None
+        self.__download_workers = None
 
         # Read this in a callback
         self.verdict = None
@@ -65,7 +71,12 @@ class VRP(klever.core.components.Component):
 
     def process_results(self):
         self.__workers = klever.core.utils.get_parallel_threads_num(self.logger, self.conf, 'Results processing')
-        self.logger.info("Going to start {} workers to process results".format(self.__workers))
+        conf = self.conf.get('results processing', {})
+        self.__download_workers = conf.get('download workers', self.DOWNLOAD_WORKERS)
+        # Do not download too many archives in advance since they occupy disk space until their processing.
+        self.mqs['prefetched tasks'] = multiprocessing.Queue(conf.get('prefetched decisions', self.__workers))
+        self.logger.info("Going to start {} workers to process results and {} workers to download decisions"
+                         .format(self.__workers, self.__download_workers))
 
         # Do result processing
         klever.core.utils.report(self.logger,
@@ -78,7 +89,7 @@ class VRP(klever.core.components.Component):
                                  self.vals['report id'],
                                  self.conf['main working directory'])
 
-        subcomponents = [('RPL', self.__result_processing)]
+        subcomponents = [('RPL', self.__result_processing), ('RPDL', self.__download_loop)]
         for i in range(self.__workers):
             subcomponents.append(('RPWL', self.__loop_worker))
         self.launch_subcomponents(False, *subcomponents)
@@ -110,6 +121,11 @@ class VRP(klever.core.components.Component):
 
         receiving = True
         session = klever.core.session.Session(self.logger, self.conf['Klever Bridge'], self.conf['identifier'])
+        # Bridge enumerates finished tasks of the job, so it is enough to request just tasks finished after the last
+        # one that was already obtained.
+        finish_index = 0
+        # Tasks of other sub-jobs or tasks that were finished before receiving them from VTG.
+        finished = dict()
         while True:
             # Get new tasks
             if receiving:
@@ -131,24 +147,22 @@ class VRP(klever.core.components.Component):
 
             # Plan for processing new tasks
             if len(pending) > 0:
-                tasks_statuses = session.get_tasks_statuses()
-                for item in tasks_statuses:
-                    task = str(item['id'])
-                    if task in pending.keys():
-                        if item['status'] == 'FINISHED':
-                            submit_processing_task('FINISHED', task)
-                            del pending[task]
-                        elif item['status'] == 'ERROR':
-                            submit_processing_task('error', task)
-                            del pending[task]
-                        elif item['status'] in ('PENDING', 'PROCESSING'):
-                            pass
-                        else:
-                            raise NotImplementedError('Unknown task status {!r}'.format(item['status']))
+                for item in session.get_finished_tasks_statuses(finish_index):
+                    finish_index = max(finish_index, item['finish_index'])
+                    finished[str(item['id'])] = item['status']
+
+                for task in [task for task in pending if task in finished]:
+                    status = finished.pop(task)
+                    if status == 'FINISHED':
+                        submit_processing_task('FINISHED', task)
+                    elif status == 'ERROR':
+                        submit_processing_task('error', task)
+                    else:
+                        raise NotImplementedError('Unknown task status {!r}'.format(status))
+                    del pending[task]
 
             if not receiving and len(pending) == 0:
-                for _ in range(self.__workers):
-                    self.mqs['processing tasks'].put(None)
+                self.mqs['processing tasks'].put(None)
                 self.mqs['processing tasks'].close()
                 break
 
@@ -156,6 +170,53 @@ class VRP(klever.core.components.Component):
 
         self.logger.debug("Shutting down result processing gracefully")
 
+    def __download_loop(self):
+        self.logger.info("VRP downloader is ready to work")
+        session = klever.core.session.Session(self.logger, self.conf['Klever Bridge'], self.conf['identifier'])
+        os.makedirs('decisions', exist_ok=True)
+        downloads = set()
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=self.__download_workers) as executor:
+            while True:
+                element = self.mqs['processing tasks'].get()
+                if element is None:
+                    break
+
+                status, data, attempt, source_paths = element
+                if status == 'finished':
+                    # Keep the number of downloads in flight bounded.
+                    if len(downloads) >= self.__download_workers:
+                        done, downloads = concurrent.futures.wait(downloads,
+                                                                  return_when=concurrent.futures.FIRST_COMPLETED)
+                        for download in done:
+                            download.result()
+                    downloads.add(executor.submit(self.__prefetch, session, element))
+                else:
+                    self.mqs['prefetched tasks'].put(element + [None])
+
+            for download in concurrent.futures.as_completed(downloads):
+                download.result()
+
+        for _ in range(self.__workers):
+            self.mqs['prefetched tasks'].put(None)
+        self.mqs['prefetched tasks'].close()
+
+        self.logger.info("VRP downloader finishes its work")
+
+    def __prefetch(self, session, element):
+        task_id = element[1][0]
+        archive = os.path.abspath(os.path.join('decisions', '{0}.zip'.format(str(task_id).replace('/', '-'))))
+        try:
+            session.download_decision(task_id, archive)
+        except Exception:
+            # RP will try to download the decision itself and it will report the failure properly.
+            self.logger.warning('Failed to download decision of task {!r} in advance:\n{}'
+                                .format(task_id, traceback.format_exc().rstrip()))
+            archive = None
+
+        # This blocks until some worker will take one of already prefetched tasks.
+        self.mqs['prefetched tasks'].put(element + [archive])
+
     def __loop_worker(self):
         self.logger.info("VRP fetcher is ready to work")
 
@@ -164,11 +225,11 @@ class VRP(klever.core.components.Component):
         self.vals['task solution triples'] = multiprocessing.Manager().dict()
 
         while True:
-            element = self.mqs['processing tasks'].get()
+            element = self.mqs['prefetched tasks'].get()
             if element is None:
                 break
 
-            status, data, attempt, source_paths = element
+            status, data, attempt, source_paths, decision_archive = element
             pf, rule_class, envmodel, requirement, _, envattrs = data[1]
             result_key = f'{pf}:{envmodel}:{requirement}'
             self.logger.info(f'Receive solution {result_key}')
@@ -188,7 +249,7 @@ class VRP(klever.core.components.Component):
             try:
                 rp = RP(self.conf, self.logger, self.id, self.callbacks, self.mqs, self.vals, new_id,
                         workdir, attrs, separate_from_parent=True, qos_resource_limits=qos_resource_limits,
-                        source_paths=source_paths, element=[status, data])
+                        source_paths=source_paths, element=[status, data], decision_archive=decision_archive)
                 rp.start()
                 rp.join()
                 self.logger.info(f'Successfully processed {result_key}')
@@ -199,6 +260,9 @@ class VRP(klever.core.components.Component):
                 solution = tuple(self.vals['task solution triples'].get(result_key))
                 del self.vals['task solution triples'][result_key]
                 self.mqs['processed'].put(('Task', tuple(data[1]), solution))
+                # RP moves the prefetched decision to its working directory unless it fails before that.
+                if decision_archive and os.path.exists(decision_archive):
+                    os.remove(decision_archive)
             self.logger.debug(f'Continue fetching items after processing {result_key}')
 
         self.logger.info("VRP fetcher finishes its work")
@@ -217,9 +281,10 @@ class RP(klever.core.components.Component):
 
     def __init__(self, conf, logger, parent_id, callbacks, mqs, vals, id=None, work_dir=None, attrs=None,
                  separate_from_parent=False, include_child_resources=False, qos_resource_limits=None, source_paths=None,
-                 element=None):
+                 element=None, decision_archive=None):
         # Read this in a callback
         self.element = element
+        self.decision_archive = decision_archive
         self.verdict = None
         self.req_spec_id = None
         self.program_fragment_id = None
@@ -504,7 +569,10 @@ class RP(klever.core.components.Component):
 
     def process_finished_task(self, task_id, opts, verifier):
         """Function has a callback at Job.py."""
-        self.session.download_decision(task_id)
+        if self.decision_archive:
+            shutil.move(self.decision_archive, 'decision result files.zip')
+        else:
+            self.session.download_decision(task_id)
 
         with zipfile.ZipFile('decision result files.zip') as zfp:
             zfp.extractall()
@@ -23,6 +23,84 @@ import klever.core.utils
 from klever.core.highlight import Highlight
 
 
+class _Record:
+    """
+    Compact record that provides the dictionary interface for the given keys. Error traces consist of huge numbers of
+    nodes and edges, so storing them as dictionaries takes several times more memory. Values for other keys are kept in
+    an auxiliary dictionary created on demand.
+    """
+    __slots__ = ('_extra',)
+    # Keys with corresponding slots
+    KEYS = dict()
+
+    def __getitem__(self, key):
+        try:
+            attr = self.KEYS.get(key)
+            return getattr(self, attr) if attr else self._extra[key]
+        except AttributeError:
+            raise KeyError(key) from None
+
+    def __setitem__(self, key, value):
+        attr = self.KEYS.get(key)
+        if attr:
+            setattr(self, attr, value)
+        else:
+            try:
+                self._extra[key] = value
+            except AttributeError:
+                self._extra = {key: value}
+
+    def __delitem__(self, key):
+        try:
+            attr = self.KEYS.get(key)
+            if attr:
+                delattr(self, attr)
+            else:
+                del self._extra[key]
+        except AttributeError:
+            raise KeyError(key) from None
+
+    def __contains__(self, key):
+        attr = self.KEYS.get(key)
+        if attr:
+            return hasattr(self, attr)
+        try:
+            return key in self._extra
+        except AttributeError:
+            return False
+
+    def get(self, key, default=None):
+        attr = self.KEYS.get(key)
+        if attr:
+            return getattr(self, attr, default)
+        try:
+            return self._extra.get(key, default)
+        except AttributeError:
+            return default
+
+
+class Node(_Record):
+    KEYS = {'id': 'id', 'in': 'in_edges', 'out': 'out_edges'}
+    __slots__ = tuple(KEYS.values())
+
+    def __init__(self, node_id):
+        self.id = node_id
+        self.in_edges = list()
+        self.out_edges = list()
+
+
+class Edge(_Record):
+    KEYS = {key: key.replace(' ', '_') + '_' for key in (
+        'source node', 'target node', 'file', 'line', 'source', 'enter', 'unmerged enter', 'return',
+        'assumption scope', 'condition', 'assumption', 'thread', 'declaration', 'notes', 'action', 'display',
+        'entry_point')}
+    __slots__ = tuple(KEYS.values())
+
+    def __init__(self, source_node, target_node):
+        self.source_node_ = source_node
+        self.target_node_ = target_node
+
+
 class ErrorTrace:
     ERROR_TRACE_FORMAT_VERSION = 1
     MODEL_COMMENT_TYPES = r'NOTE\d?|ASSERT|CIF|EMG_WRAPPER'
@@ -359,16 +437,16 @@ class ErrorTrace:
     def add_node(self, node_id):
         if node_id in self._nodes:
             raise ValueError('There is already added node with an identifier {!r}'.format(node_id))
-        self._nodes[node_id] = {'id': node_id, 'in': list(), 'out': list()}
+        self._nodes[node_id] = Node(node_id)
         return self._nodes[node_id]
 
     def add_edge(self, source, target):
         source_node = self._nodes[source]
         target_node = self._nodes[target]
 
-        edge = {'source node': source_node, 'target node': target_node}
-        source_node['out'].append(edge)
-        target_node['in'].append(edge)
+        edge = Edge(source_node, target_node)
+        source_node.out_edges.append(edge)
+        target_node.in_edges.append(edge)
         return edge
 
     def add_violation_node_id(self, identifier):
@@ -459,11 +537,8 @@ class ErrorTrace:
                     yield current
 
     def insert_edge_and_target_node(self, edge, after=True):
-        new_edge = {
-            'target node': None,
-            'source node': None,
-            'file': 0
-        }
+        new_edge = Edge(None, None)
+        new_edge['file'] = 0
         new_node = self.add_node(int(len(self._nodes)))
 
         if after:
@@ -535,15 +610,18 @@ class ErrorTrace:
 
     @staticmethod
     def next_edge(edge):
-        if len(edge['target node']['out']) > 0:
-            return edge['target node']['out'][0]
+        # These are called for each edge every time the error trace is traversed, so bypass the dictionary interface.
+        out_edges = edge.target_node_.out_edges
+        if len(out_edges) > 0:
+            return out_edges[0]
         else:
             return None
 
     @staticmethod
     def previous_edge(edge):
-        if len(edge['source node']['in']) > 0:
-            return edge['source node']['in'][0]
+        in_edges = edge.source_node_.in_edges
+        if len(in_edges) > 0:
+            return in_edges[0]
         else:
             return None
 
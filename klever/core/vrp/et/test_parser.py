@@ -0,0 +1,195 @@
+#
+# Copyright (c) 2021 ISP RAS (http://www.ispras.ru)
+# Ivannikov Institute for System Programming of the Russian Academy of Sciences
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import os
+import logging
+import resource
+import collections
+import multiprocessing
+
+import pytest
+
+from klever.core.vrp.et.parser import ErrorTraceParser
+
+EDGES_NUM = 200000
+# Memory per edge of the error trace including its target node
+MAX_BYTES_PER_EDGE = 1024
+STATEMENTS = ('x = 1;', 'ldv_func();', 'y == 0', 'z = x + y;')
+PROGRAMFILE_DATA = '<data key="programfile">cil.i</data>\n'
+
+
+def get_node(node_id, data_key=None):
+    return '<node id="{0}">{1}</node>\n'.format(
+        node_id, '<data key="{0}">true</data>'.format(data_key) if data_key else '')
+
+
+def get_edge(source, target, statement_id=None, offset=0, control=None):
+    """Get edge referring to the given statement of the program file which statements start at offset."""
+    if statement_id is None:
+        return '<edge source="{0}" target="{1}"><data key="startline">2</data></edge>\n'.format(source, target)
+
+    startoffset = offset + sum(len(statement) + 1 for statement in STATEMENTS[:statement_id])
+    return '<edge source="{0}" target="{1}">' \
+           '<data key="startline">{2}</data>' \
+           '<data key="startoffset">{3}</data>' \
+           '<data key="endoffset">{4}</data>' \
+           '<data key="threadId">0</data>' \
+           '{5}' \
+           '</edge>\n'.format(source, target, statement_id + 2, startoffset,
+                              startoffset + len(STATEMENTS[statement_id]) - 1,
+                              '<data key="control">condition-{0}</data>'.format(control) if control else '')
+
+
+def write_witness(path, elements):
+    with open(path, 'w', encoding='utf-8') as fp:
+        fp.write('<?xml version="1.0" encoding="UTF-8" standalone="no"?>\n'
+                 '<graphml xmlns="http://graphml.graphdrawing.org/xmlns">\n'
+                 '<key attr.name="programFile" attr.type="string" for="graph" id="programfile"/>\n'
+                 '<graph edgedefault="directed">\n'
+                 '<data key="Requirement" klever-attrs="true" associate="true" compare="true">rule</data>\n')
+        for element in elements:
+            fp.write(element)
+        fp.write('</graph>\n</graphml>\n')
+
+
+def generate_witness(path, offset, edges_num):
+    """Generate linear witness with sink branches that refers to statements of the program file starting at offset."""
+    def get_elements():
+        yield PROGRAMFILE_DATA
+        yield get_node('A0', 'entry')
+        for i in range(1, edges_num + 1):
+            yield get_node('A{0}'.format(i), 'violation' if i == edges_num else None)
+            if i % 1000 == 0:
+                yield get_node('sink{0}'.format(i), 'sink')
+                yield get_edge('A{0}'.format(i - 1), 'sink{0}'.format(i))
+
+            statement_id = i % len(STATEMENTS)
+            yield get_edge('A{0}'.format(i - 1), 'A{0}'.format(i), statement_id, offset,
+                           ('true' if i % 2 else 'false') if STATEMENTS[statement_id] == 'y == 0' else None)
+
+    write_witness(path, get_elements())
+
+
+def create_task(path):
+    """Create program file and return verification task files and offset of the first statement in the program file."""
+    source = os.path.join(path, 'main.c')
+    with open(source, 'w') as fp:
+        fp.write('\n'.join(STATEMENTS) + '\n')
+
+    programfile = os.path.join(path, 'cil.i')
+    line_directive = '#line 1 "{0}"\n'.format(source)
+    with open(programfile, 'w') as fp:
+        fp.write(line_directive + '\n'.join(STATEMENTS) + '\n')
+
+    return {'cil.i': programfile}, len(line_directive)
+
+
+@pytest.fixture
+def parse(tmp_path, monkeypatch):
+    monkeypatch.setattr(ErrorTraceParser, 'PROGRAMFILE_LINE_MAP', dict())
+    monkeypatch.setattr(ErrorTraceParser, 'PROGRAMFILE_CONTENT', '')
+    monkeypatch.setattr(ErrorTraceParser, 'FILE_NAMES', collections.OrderedDict())
+    verification_task_files, offset = create_task(str(tmp_path))
+    witness = str(tmp_path / 'witness.graphml')
+
+    def _parse(elements):
+        write_witness(witness, elements(offset))
+        return list(ErrorTraceParser(logging.getLogger(), witness, verification_task_files).error_trace
+                    .trace_iterator())
+
+    return _parse
+
+
+def test_conditions(parse):
+    edges = parse(lambda offset: (
+        PROGRAMFILE_DATA,
+        get_node('A0', 'entry'), get_node('A1'), get_node('A2'), get_node('A3'), get_node('A4', 'violation'),
+        get_edge('A0', 'A1', 0, offset),
+        get_edge('A1', 'A2', 2, offset, 'false'),
+        get_edge('A2', 'A3', 2, offset, 'true'),
+        get_edge('A3', 'A4', 1, offset)
+    ))
+
+    assert [edge['source'] for edge in edges] == ['x = 1;', 'y != 0', 'y == 0', 'ldv_func();']
+    assert [edge['line'] for edge in edges] == [1, 3, 3, 2]
+    assert [edge.get('condition', False) for edge in edges] == [False, True, True, False]
+    assert edges[0]['file'] == 0 and edges[0]['thread'] == 0
+
+
+def test_postponed_edges(parse):
+    # Edges referring nodes that are not parsed yet and all following edges are postponed. Nevertheless, their order
+    # should be kept.
+    edges = parse(lambda offset: (
+        PROGRAMFILE_DATA,
+        get_node('A0', 'entry'),
+        get_edge('A0', 'A1', 0, offset),
+        get_node('A1'), get_node('A2', 'violation'),
+        get_edge('A1', 'A2', 1, offset)
+    ))
+
+    assert [edge['source'] for edge in edges] == ['x = 1;', 'ldv_func();']
+
+
+def test_sink_edges(parse):
+    # Edges leading to sink nodes are removed regardless of whether sink nodes precede them.
+    edges = parse(lambda offset: (
+        PROGRAMFILE_DATA,
+        get_node('A0', 'entry'), get_node('A1'), get_node('sink1', 'sink'),
+        get_edge('A0', 'sink1'),
+        get_edge('A0', 'A1', 0, offset),
+        get_edge('A1', 'sink2'),
+        get_node('sink2', 'sink'), get_node('A2', 'violation'),
+        get_edge('A1', 'A2', 3, offset)
+    ))
+
+    assert [edge['source'] for edge in edges] == ['x = 1;', 'z = x + y;']
+    assert [edge['target node']['id'] for edge in edges] == ['A1', 'A2']
+
+
+def test_programfile_after_nodes(parse):
+    # Sources of edges can be got just after the program file is parsed.
+    edges = parse(lambda offset: (
+        get_node('A0', 'entry'), get_node('A1'), get_node('A2', 'violation'),
+        get_edge('A0', 'A1', 0, offset),
+        get_edge('A1', 'A2', 2, offset, 'false'),
+        PROGRAMFILE_DATA
+    ))
+
+    assert [edge['source'] for edge in edges] == ['x = 1;', 'y != 0']
+    assert edges[1]['condition']
+
+
+def measure_parser_memory(edges_num, path):
+    """Get the growth of the peak resident set size at parsing the witness. This should be run in a fresh process."""
+    verification_task_files, offset = create_task(path)
+    witness = os.path.join(path, 'witness.graphml')
+    generate_witness(witness, offset, edges_num)
+    # Tracing of allocations slows parsing down by an order of magnitude, so measure the growth of the peak resident
+    # set size.
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    error_trace = ErrorTraceParser(logging.getLogger(), witness, verification_task_files).error_trace
+    used = (resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - rss) * 1024
+    assert len(list(error_trace.trace_iterator())) == edges_num
+    return used
+
+
+@pytest.mark.skipif(not os.environ.get('KLEVER_BENCHMARKS'), reason='set KLEVER_BENCHMARKS to run benchmarks')
+def test_parser_memory(tmp_path):
+    # Peak resident set size of the test process was likely reached before, so measure it in a fresh process.
+    with multiprocessing.get_context('spawn').Pool(1) as pool:
+        used = pool.apply(measure_parser_memory, (EDGES_NUM, str(tmp_path)))
+    assert 0 < used / EDGES_NUM < MAX_BYTES_PER_EDGE
@@ -0,0 +1,160 @@
+#
+# Copyright (c) 2021 ISP RAS (http://www.ispras.ru)
+# Ivannikov Institute for System Programming of the Russian Academy of Sciences
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import os
+import time
+import logging
+import multiprocessing
+
+import pytest
+
+import klever.core.session
+from klever.core.vrp import VRP
+
+WORKERS_NUM = 3
+SOURCE_PATHS = ['/src']
+
+
+class FakeSession:
+    """Session that writes task identifiers to decision archives instead of downloading them from Bridge."""
+
+    failing = set()
+    delay = 0
+    # Shared with the downloading process
+    in_flight = None
+    max_in_flight = None
+
+    def __init__(self, logger, bridge, job_id):
+        pass
+
+    def download_decision(self, task_id, archive):
+        with self.in_flight.get_lock():
+            self.in_flight.value += 1
+            self.max_in_flight.value = max(self.max_in_flight.value, self.in_flight.value)
+        try:
+            time.sleep(self.delay)
+            if task_id in self.failing:
+                raise ValueError('Decision of task {!r} is unavailable'.format(task_id))
+            with open(archive, 'w', encoding='utf-8') as fp:
+                fp.write(task_id)
+        finally:
+            with self.in_flight.get_lock():
+                self.in_flight.value -= 1
+
+
+@pytest.fixture
+def fake_session(tmp_path, monkeypatch):
+    monkeypatch.chdir(str(tmp_path))
+    monkeypatch.setattr(klever.core.session, 'Session', FakeSession)
+    monkeypatch.setattr(FakeSession, 'in_flight', multiprocessing.Value('i', 0))
+    monkeypatch.setattr(FakeSession, 'max_in_flight', multiprocessing.Value('i', 0))
+    return FakeSession
+
+
+def get_element(status, task_id):
+    return [status, [task_id, ('pf', 'class', 'envmodel', 'requirement', None, {})], 0, SOURCE_PATHS]
+
+
+def download(elements, download_workers, prefetched_num=1):
+    """Pass elements through the downloading loop of VRP running in a separate process as in Core and get elements
+    handed off to workers before the end markers, the number of end markers and the exit code of the process."""
+    mqs = {
+        'processing tasks': multiprocessing.Queue(),
+        'prefetched tasks': multiprocessing.Queue(prefetched_num)
+    }
+    vrp = VRP({'Klever Bridge': {}, 'identifier': 'job'}, logging.getLogger(), '/', {}, mqs, {}, id='VRP')
+    vrp._VRP__workers = WORKERS_NUM
+    vrp._VRP__download_workers = download_workers
+
+    for element in elements:
+        mqs['processing tasks'].put(element)
+    mqs['processing tasks'].put(None)
+
+    downloader = multiprocessing.get_context('fork').Process(target=vrp._VRP__download_loop)
+    downloader.start()
+
+    prefetched = []
+    end_markers = 0
+    while end_markers < WORKERS_NUM:
+        element = mqs['prefetched tasks'].get(timeout=30)
+        if element is None:
+            end_markers += 1
+        else:
+            # Nothing can follow end markers.
+            assert end_markers == 0
+            prefetched.append(element)
+
+    downloader.join(30)
+    assert mqs['prefetched tasks'].empty()
+
+    return prefetched, end_markers, downloader.exitcode
+
+
+def test_download_order(fake_session):
+    task_ids = ['task{}'.format(i) for i in range(10)]
+    prefetched, end_markers, exitcode = download([get_element('finished', task_id) for task_id in task_ids], 1)
+
+    # A single downloader hands tasks off in the order of their receiving.
+    assert [element[1][0] for element in prefetched] == task_ids
+    for element, task_id in zip(prefetched, task_ids):
+        assert element[:4] == get_element('finished', task_id)
+        assert element[4] == os.path.abspath(os.path.join('decisions', '{}.zip'.format(task_id)))
+        with open(element[4], encoding='utf-8') as fp:
+            assert fp.read() == task_id
+
+    assert end_markers == WORKERS_NUM
+    assert exitcode == 0
+
+
+def test_download_failures_and_errors(fake_session, monkeypatch):
+    monkeypatch.setattr(FakeSession, 'failing', {'task/3', 'task/7'})
+    monkeypatch.setattr(FakeSession, 'delay', 0.05)
+    elements = [get_element('error' if i % 4 == 1 else 'finished', 'task/{}'.format(i)) for i in range(12)]
+    prefetched, end_markers, exitcode = download(elements, 3, prefetched_num=2)
+
+    # Each task is handed off exactly once.
+    assert len(prefetched) == len(elements)
+    prefetched = {element[1][0]: element for element in prefetched}
+    assert len(prefetched) == len(elements)
+
+    for element in elements:
+        status, data, _, _ = element
+        task_id = data[0]
+        assert prefetched[task_id][:4] == element
+        archive = prefetched[task_id][4]
+        if status == 'error':
+            # There is nothing to download for tasks finished with errors.
+            assert archive is None
+        elif task_id in FakeSession.failing:
+            # Workers will try to download these decisions themselves.
+            assert archive is None
+            assert not os.path.exists(os.path.join('decisions', '{}.zip'.format(task_id.replace('/', '-'))))
+        else:
+            assert archive == os.path.abspath(os.path.join('decisions', '{}.zip'.format(task_id.replace('/', '-'))))
+            assert os.path.isfile(archive)
+
+    assert 1 < FakeSession.max_in_flight.value <= 3
+    assert FakeSession.in_flight.value == 0
+    assert end_markers == WORKERS_NUM
+    assert exitcode == 0
+
+
+def test_download_nothing(fake_session):
+    prefetched, end_markers, exitcode = download([], 2)
+    assert prefetched == []
+    assert end_markers == WORKERS_NUM
+    assert exitcode == 0
@@ -21,8 +21,10 @@ import json
 import copy
 import hashlib
 import importlib
+import time
 import collections
 import multiprocessing
+import multiprocessing.connection
 
 import klever.core.components
 import klever.core.utils
@@ -521,6 +523,11 @@ class VTGWL(klever.core.components.Component):
     def task_generating_loop(self):
         number = klever.core.utils.get_parallel_threads_num(self.logger, self.conf, 'Tasks generation')
 
+        # VTG workers and plugins are forked from this process, so it serves as a fork server for them. Plugin modules
+        # imported here are inherited by all plugin processes instead of being imported again for each task.
+        if self.conf.get('preload plugins', True):
+            self.__preload_plugins()
+
         self.logger.info("Start EMG workers")
         klever.core.components.launch_queue_workers(self.logger, self.mqs['prepare'],
                                                     self.factory, number, True)
@@ -556,6 +563,17 @@ class VTGWL(klever.core.components.Component):
 
     main = task_generating_loop
 
+    def __preload_plugins(self):
+        plugin_names = sorted({plugin_desc['name']
+                               for req_spec_descs in self.req_spec_classes.values()
+                               for req_spec_desc in req_spec_descs.values()
+                               for plugin_desc in req_spec_desc['plugins']})
+
+        for plugin_name in plugin_names:
+            start_time = time.time()
+            importlib.import_module(f'.{plugin_name.lower()}', 'klever.core.vtg')
+            self.logger.debug(f'Plugin {plugin_name} was preloaded in {time.time() - start_time:.3f}s')
+
 
 class VTGW(klever.core.components.Component):
 
@@ -613,7 +631,20 @@ class VTGW(klever.core.components.Component):
         self.logger.debug(f"There is no data has been prepared for {self.task}")
         return type(self.task).__name__, tuple(self.task)
 
-    def _run_plugin(self, plugin_desc, initial_abstract_task_desc_file=None, out_abstract_task_desc_file=None):
+    def _run_plugin(self, plugin_desc, initial_abstract_task_desc_file=None, out_abstract_task_desc_file=None,
+                    abstract_task_desc=None, get_out_abstract_task_desc=False):
+        """
+        Run plugin in a separate process.
+
+        :param plugin_desc: Plugin description.
+        :param initial_abstract_task_desc_file: File with input abstract verification task description.
+        :param out_abstract_task_desc_file: File where plugin will put modified abstract verification task description.
+        :param abstract_task_desc: Input abstract verification task description to pass to plugin directly instead of
+                                   reading it from file.
+        :param get_out_abstract_task_desc: Receive modified abstract verification task description from plugin directly.
+                                           It is put to file just when intermediate files should be kept.
+        :return: Modified abstract verification task description if it was requested and None otherwise.
+        """
         plugin_name = plugin_desc['name']
         plugin_work_dir = plugin_desc['name'].lower()
         plugin_conf = copy.deepcopy(plugin_desc['options'])
@@ -633,10 +664,12 @@ class VTGW(klever.core.components.Component):
         # Get plugin configuration on the basis of common configuration, plugin options specific for requirement
         # specification and information on requirement itself. In addition put either initial or
         # current description of abstract verification task into plugin configuration.
-        self.logger.debug(f'Put configuration of plugin "{plugin_name} to file {plugin_conf_file}')
-        with open(plugin_conf_file, 'w', encoding='utf-8') as fp:
-            klever.core.utils.json_dump(plugin_conf, fp, self.conf['keep intermediate files'])
+        if self.conf['keep intermediate files']:
+            self.logger.debug(f'Put configuration of plugin "{plugin_name} to file {plugin_conf_file}')
+            with open(plugin_conf_file, 'w', encoding='utf-8') as fp:
+                klever.core.utils.json_dump(plugin_conf, fp, self.conf['keep intermediate files'])
 
+        start_time = time.time()
         plugin = getattr(importlib.import_module(f'.{plugin_name.lower()}', 'klever.core.vtg'), plugin_name)
         p = plugin(plugin_conf, self.logger, self.id, self.callbacks, self.mqs, self.vals,
                    plugin_name, plugin_work_dir, separate_from_parent=True,
@@ -647,9 +680,28 @@ class VTGW(klever.core.components.Component):
                    # consumed by workers. Moreover, we even wouldn't like to execute them in separate working
                    # directories like sub-jobs to simplify the workflow and debugging.
                    include_child_resources=True if plugin_name != 'Weaver' else False)
+        # Plugin process is forked, so it gets input abstract verification task description without serialization.
+        p.abstract_task_desc = abstract_task_desc
+        receiver = None
+        if get_out_abstract_task_desc:
+            receiver, p.out_abstract_task_desc_conn = multiprocessing.Pipe(duplex=False)
         p.start()
+        self.logger.debug(f'Plugin {plugin_name} was started in {time.time() - start_time:.3f}s')
+
+        out_abstract_task_desc = None
+        if receiver:
+            p.out_abstract_task_desc_conn.close()
+            # Receive result before joining since otherwise plugin may block forever on sending large data. Plugin
+            # does not send anything if it fails.
+            multiprocessing.connection.wait([receiver, p.sentinel])
+            if receiver.poll():
+                out_abstract_task_desc = receiver.recv()
+            receiver.close()
+
         p.join()
 
+        return out_abstract_task_desc
+
     def plugin_fail_processing(self):
         """Has a callback in job.py!"""
         self.logger.debug('Submit the information about the failure to the Job processing class')
@@ -850,8 +902,11 @@ class PLUGINS(VTGW):
         self.logger.info(f"Start generating tasks for {self.task}")
         self._prepare_initial_task_desc()
 
-        # Invoke all plugins one by one.
-        for plugin_desc in plugins:
+        # Invoke all plugins one by one. Plugins pass abstract verification task description to each other through
+        # this process. Just the last plugin puts it to file since it is necessary to submit the task and to repeat
+        # its solution later.
+        abstract_task_desc = None
+        for i, plugin_desc in enumerate(plugins):
             # Here plugin will put modified abstract verification task description.
             out_abstract_task_desc_file = '{0} abstract task.json'.format(plugin_desc['name'].lower())
             plugin_desc.get('options', {}).update({
@@ -860,7 +915,9 @@ class PLUGINS(VTGW):
             })
 
             try:
-                self._run_plugin(plugin_desc, cur_abstract_task_desc_file, out_abstract_task_desc_file)
+                abstract_task_desc = self._run_plugin(plugin_desc, cur_abstract_task_desc_file,
+                                                      out_abstract_task_desc_file, abstract_task_desc,
+                                                      get_out_abstract_task_desc=i < len(plugins) - 1)
             except klever.core.components.ComponentError:
                 self.logger.warning('Plugin {} failed'.format(plugin_desc['name']))
 
@@ -15,6 +15,7 @@
 # limitations under the License.
 #
 
+import concurrent.futures
 import fileinput
 import os
 from clade import Clade
@@ -74,11 +75,21 @@ class ASE(klever.core.vtg.plugins.Plugin):
             raise RuntimeError('Build base is not OK')
         meta = clade.get_meta()
 
+        # Prepare all CIF invocations beforehand since they are independent from each other and can be executed in
+        # parallel. Each invocation outputs argument signatures to its own file to avoid races between concurrent CIF
+        # processes. These files are concatenated in the order of invocations after all of them finish.
+        cif_invocations = []
+        arg_signs_files = {}
         for request_aspect in self.conf['request aspects']:
             request_aspect = klever.core.vtg.utils.find_file_or_dir(self.logger, self.conf['main working directory'],
                                                                     request_aspect)
             self.logger.debug('Request aspect is "{0}"'.format(request_aspect))
 
+            arg_signs_file = os.path.realpath(
+                os.path.splitext(os.path.splitext(os.path.basename(request_aspect))[0])[0])
+            self.logger.debug('Argument signature file is "{0}"'.format(os.path.relpath(arg_signs_file)))
+            arg_signs_files.setdefault(arg_signs_file, [])
+
             for grp in self.abstract_task_desc['grps']:
                 self.logger.info('Request argument signatures for C files of group "{0}"'.format(grp['id']))
 
@@ -89,10 +100,8 @@ class ASE(klever.core.vtg.plugins.Plugin):
                     cc = clade.get_cmd(*extra_cc['CC'], with_opts=True)
 
                     env = dict(os.environ)
-                    env['LDV_ARG_SIGNS_FILE'] = os.path.realpath(
-                        os.path.splitext(os.path.splitext(os.path.basename(request_aspect))[0])[0])
-                    self.logger.debug('Argument signature file is "{0}"'
-                                      .format(os.path.relpath(env['LDV_ARG_SIGNS_FILE'])))
+                    env['LDV_ARG_SIGNS_FILE'] = '{0}.{1}'.format(arg_signs_file, len(cif_invocations))
+                    arg_signs_files[arg_signs_file].append(env['LDV_ARG_SIGNS_FILE'])
 
                     # Add plugin aspects produced thus far (by EMG) since they can include additional headers for which
                     # additional argument signatures should be extracted. Like in Weaver.
@@ -129,16 +138,21 @@ class ASE(klever.core.vtg.plugins.Plugin):
                     # Like in Weaver.
                     opts.append(klever.core.vtg.utils.define_arch_dependent_macro(self.conf))
 
-                    klever.core.utils.execute(
-                        self.logger,
+                    outfile = '{0}.c'.format(klever.core.utils.unique_file_name(
+                        os.path.splitext(os.path.basename(infile))[0], '.c.aux'))
+                    # Create empty output file in advance, so subsequent invocations of unique_file_name() will not
+                    # return the same name until CIF will create it.
+                    with open(outfile + '.aux', 'w'):
+                        pass
+
+                    cif_invocations.append((
                         tuple(
                             [
                                 klever.core.vtg.utils.get_cif_or_aspectator_exec(self.conf, 'cif'),
                                 '--in', storage_path,
                                 '--aspect', os.path.realpath(aspect),
                                 '--stage', 'instrumentation',
-                                '--out', os.path.realpath('{0}.c'.format(klever.core.utils.unique_file_name(
-                                    os.path.splitext(os.path.basename(infile))[0], '.c.aux'))),
+                                '--out', os.path.realpath(outfile),
                                 '--debug', 'DEBUG'
                             ] +
                             (['--keep'] if self.conf['keep intermediate files'] else []) +
@@ -148,8 +162,37 @@ class ASE(klever.core.vtg.plugins.Plugin):
                             ['-I' + os.path.join(os.path.dirname(self.conf['specifications base']), 'include')]
                         ),
                         env,
-                        cwd=clade.get_storage_path(cc['cwd']),
-                        timeout=0.01,
-                        filter_func=klever.core.vtg.utils.CIFErrorFilter())
+                        clade.get_storage_path(cc['cwd'])
+                    ))
+
+        # Like in Weaver since this is the same work for CIF.
+        workers_num = klever.core.utils.get_parallel_threads_num(self.logger, self.conf, 'Weaving')
+        with concurrent.futures.ThreadPoolExecutor(max_workers=workers_num) as executor:
+            futures = [
+                executor.submit(klever.core.utils.execute, self.logger, args, env, cwd=cwd, timeout=0.01,
+                                filter_func=klever.core.vtg.utils.CIFErrorFilter())
+                for args, env, cwd in cif_invocations
+            ]
+            # Stop at the first failure like sequential invocations did. klever.core.utils.execute() raises SystemExit
+            # in this case.
+            for future in concurrent.futures.as_completed(futures):
+                if future.exception():
+                    for not_done_future in futures:
+                        not_done_future.cancel()
+                    future.result()
+
+        for arg_signs_file, invocation_arg_signs_files in arg_signs_files.items():
+            invocation_arg_signs_files = [f for f in invocation_arg_signs_files if os.path.isfile(f)]
+            if not invocation_arg_signs_files:
+                continue
+
+            with open(arg_signs_file, 'w', encoding='utf-8') as fout, fileinput.input(
+                    invocation_arg_signs_files, openhook=fileinput.hook_encoded('utf-8')) as fin:
+                for line in fin:
+                    fout.write(line)
+
+            if not self.conf['keep intermediate files']:
+                for invocation_arg_signs_file in invocation_arg_signs_files:
+                    os.remove(invocation_arg_signs_file)
 
     main = extract_argument_signatures
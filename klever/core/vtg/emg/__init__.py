@@ -15,8 +15,10 @@
 # limitations under the License.
 #
 
-import copy
-from klever.core.utils import report
+import concurrent.futures
+import multiprocessing
+
+from klever.core.utils import report, get_parallel_threads_num
 from klever.core.vtg.plugins import Plugin
 from klever.core.vtg.emg.common import get_or_die
 from klever.core.vtg.emg.generators import generate_processes
@@ -24,6 +26,7 @@ from klever.core.vtg.emg.common.process import ProcessCollection
 from klever.core.vtg.emg.translation import translate_intermediate_model
 from klever.core.vtg.emg.decomposition import decompose_intermediate_model
 from klever.core.vtg.emg.common.c.source import create_source_representation
+from klever.core.vtg.emg.common.c.types.typeParser import flush_persistent_parse_results
 
 
 class EMG(Plugin):
@@ -64,15 +67,21 @@ class EMG(Plugin):
         abstract_task = self.abstract_task_desc
         self.abstract_task_desc = list()
         used_attributed_names = set()
+        models = list()
         for number, model in enumerate(decompose_intermediate_model(self.logger, self.conf, collection)):
             model.name = str(number)
             if model.attributed_name in used_attributed_names:
                 raise ValueError(f"The model with name '{model.attributed_name}' has been already been generated")
             else:
                 used_attributed_names.add(model.attributed_name)
-            new_description = translate_intermediate_model(self.logger, self.conf, copy.deepcopy(abstract_task), sa,
-                                                           model)
+            models.append(model)
+
+        workers_num = min(len(models), self.conf['translation options'].get(
+            'translation workers', get_parallel_threads_num(self.logger, self.conf, 'Weaving')))
+        new_descriptions = _translate_models(self.logger, self.conf, abstract_task, sa, models, workers_num)
 
+        # Keep the order of decomposed models.
+        for model, new_description in zip(models, new_descriptions):
             new_description["environment model attributes"] = model.attributes
             new_description["environment model pathname"] = model.name
             self.abstract_task_desc.append(new_description)
@@ -82,3 +91,73 @@ class EMG(Plugin):
             raise ValueError('There is no generated environment models')
 
     main = generate_environment
+
+
+# State of EMG that is inherited by forked translation workers.
+_translation_state = None
+
+
+def _translate_models(logger, conf, abstract_task, sa, models, workers_num):
+    """
+    Translate models into abstract verification task descriptions. Models are translated independently from each other,
+    so do this in parallel. Workers are forked and thus they inherit the source representation and models instead of
+    getting them pickled.
+
+    :param logger: Logger object.
+    :param conf: Configuration dictionary.
+    :param abstract_task: Abstract verification task description dictionary.
+    :param sa: Source object.
+    :param models: List of ProcessCollection objects.
+    :param workers_num: The number of translation workers.
+    :return: List of abstract verification task descriptions in the order of models.
+    """
+    global _translation_state
+
+    if workers_num > 1:
+        _translation_state = (logger, conf, abstract_task, sa, models)
+        try:
+            with concurrent.futures.ProcessPoolExecutor(
+                    max_workers=workers_num, mp_context=multiprocessing.get_context('fork')) as executor:
+                return list(executor.map(_translate_model, range(len(models))))
+        finally:
+            # Do not keep references to the source representation and models if translation failed.
+            _translation_state = None
+    else:
+        new_descriptions = [translate_intermediate_model(logger, conf, _copy_abstract_task(abstract_task), sa, model)
+                            for model in models]
+        flush_persistent_parse_results()
+        return new_descriptions
+
+
+def _translate_model(index):
+    logger, conf, abstract_task, sa, models = _translation_state
+    new_description = translate_intermediate_model(logger, conf, _copy_abstract_task(abstract_task), sa,
+                                                   models[index])
+    flush_persistent_parse_results()
+    return new_description
+
+
+def _copy_abstract_task(abstract_task):
+    """
+    Copy the abstract verification task description for translation of a particular model. Translation sets entry
+    points and the environment model and extends extra C files and plugin aspects of extra CCs, so just corresponding
+    containers are copied, while everything else is shared with the original description.
+
+    :param abstract_task: Abstract verification task description dictionary.
+    :return: Abstract verification task description dictionary.
+    """
+    new_abstract_task = dict(abstract_task)
+    if 'extra C files' in abstract_task:
+        new_abstract_task['extra C files'] = list(abstract_task['extra C files'])
+    new_abstract_task['grps'] = []
+    for grp in abstract_task['grps']:
+        new_grp = dict(grp)
+        new_grp['Extra CCs'] = []
+        for extra_cc in grp['Extra CCs']:
+            new_extra_cc = dict(extra_cc)
+            if 'plugin aspects' in extra_cc:
+                new_extra_cc['plugin aspects'] = list(extra_cc['plugin aspects'])
+            new_grp['Extra CCs'].append(new_extra_cc)
+        new_abstract_task['grps'].append(new_grp)
+
+    return new_abstract_task
@@ -17,12 +17,16 @@
 
 import os
 import re
+import hashlib
+import sqlite3
 import ujson
 import sortedcontainers
 from clade import Clade
 
 from klever.core.vtg.emg.common.c import Function, Variable, Macro, import_declaration
 from klever.core.vtg.emg.common.c.types import import_typedefs, extract_name, dump_types
+from klever.core.vtg.emg.common.c.types.typeParser import setup_persistent_parse_results, \
+    flush_persistent_parse_results
 from klever.core.vtg.utils import find_file_or_dir
 
 
@@ -49,7 +53,18 @@ def create_source_representation(logger, conf, abstract_task):
     collection = Source(cfiles, prefixes, dep_paths)
     collection.c_full_paths = _c_full_paths(collection, cfiles)
 
-    _import_code_analysis(logger, conf, clade, files_map, collection)
+    # Source analysis results are the same for all EMG runs of the job, so get them from the job-level index if
+    # possible.
+    if 'cache directory' in conf:
+        os.makedirs(conf['cache directory'], exist_ok=True)
+        code_analysis = CladeIndex(clade, os.path.join(conf['cache directory'], 'EMG code analysis.sqlite'))
+        setup_persistent_parse_results(os.path.join(conf['cache directory'], 'EMG declarations.sqlite'))
+    else:
+        code_analysis = clade
+
+    _import_code_analysis(logger, conf, code_analysis, files_map, collection)
+    # Share signatures parsed during import with other EMG runs at once.
+    flush_persistent_parse_results()
     if conf.get('dump types'):
         dump_types('type collection.json')
     if conf.get('dump source code analysis'):
@@ -202,6 +217,78 @@ def _import_code_analysis(logger, conf, clade, dependencies, collection):
                     collection.set_macro(obj)
 
 
+class CladeIndex:
+    """
+    Job-level index of Clade source analysis results. It is stored in SQLite database and has the same interface as
+    Clade has for getting typedefs, variables, callgraph, functions and macros expansions. Each table is indexed by
+    files, so EMG runs read just data for files of their program fragments rather than whole Clade tables. The index is
+    filled in lazily, i.e. data for a file is obtained from Clade only when it is requested for the first time within
+    the job.
+    """
+
+    def __init__(self, clade, db_file):
+        self.clade = clade
+        # There may be many concurrent EMG runs within the job, so wait for them rather than fail immediately.
+        self.db = sqlite3.connect(db_file, timeout=600)
+        with self.db:
+            self.db.execute('PRAGMA journal_mode=WAL')
+            self.db.execute('CREATE TABLE IF NOT EXISTS analysis '
+                            '(kind TEXT NOT NULL, file TEXT NOT NULL, data TEXT, PRIMARY KEY (kind, file))')
+
+    def get_typedefs(self, files):
+        return self.__get('typedefs', files, self.clade.get_typedefs)
+
+    def get_variables(self, files):
+        return self.__get('variables', files, self.clade.get_variables)
+
+    # Clade adds the "unknown" scope with functions without known definitions to the callgraph and to functions.
+    # It does not depend on requested files, so it is stored and returned as any other file.
+    def get_callgraph(self, files):
+        return self.__get('callgraph', set(files).union({'unknown'}), self.clade.get_callgraph)
+
+    def get_functions_by_file(self, files):
+        return self.__get('functions', set(files).union({'unknown'}), self.clade.get_functions_by_file)
+
+    def get_macros_expansions(self, files, white_list):
+        # Expansions depend on the white list of macros that can be different for different requirements.
+        kind = 'macros {0}'.format(hashlib.sha256(ujson.dumps(white_list).encode('utf-8')).hexdigest())
+        return self.__get(kind, files, lambda missing: self.clade.get_macros_expansions(sorted(missing), white_list))
+
+    def get_used_in_vars_functions(self):
+        # This table is not split by files, so it is stored as a single entry. It is used just to check membership.
+        return set(self.__get('used in vars functions', [''],
+                              lambda _: {'': list(self.clade.get_used_in_vars_functions())})[''])
+
+    def __get(self, kind, files, get_from_clade):
+        files = set(files)
+        result = dict()
+        for file, data in self.__select(kind, files):
+            files.discard(file)
+            # Clade has no data for this file.
+            if data is not None:
+                result[file] = ujson.loads(data)
+
+        if files:
+            data = get_from_clade(files)
+            with self.db:
+                self.db.executemany('INSERT OR IGNORE INTO analysis (kind, file, data) VALUES (?, ?, ?)',
+                                    ((kind, file, ujson.dumps(data[file]) if file in data else None)
+                                     for file in files))
+            for file in files:
+                if file in data:
+                    result[file] = data[file]
+
+        return result
+
+    def __select(self, kind, files):
+        files = list(files)
+        # Keep the number of query parameters below SQLite limits.
+        for i in range(0, len(files), 500):
+            chunk = files[i:i + 500]
+            yield from self.db.execute('SELECT file, data FROM analysis WHERE kind = ? AND file IN ({0})'
+                                       .format(', '.join('?' * len(chunk))), [kind] + chunk).fetchall()
+
+
 def _collect_file_dependencies(clade, abstract_task):
     collection = sortedcontainers.SortedDict()
     c_files = sortedcontainers.SortedSet()
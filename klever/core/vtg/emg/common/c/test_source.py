@@ -0,0 +1,71 @@
+#
+# Copyright (c) 2021 ISP RAS (http://www.ispras.ru)
+# Ivannikov Institute for System Programming of the Russian Academy of Sciences
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import pytest
+
+from klever.core.vtg.emg.common.c.source import CladeIndex
+
+CALLGRAPH = {
+    'a.c': {'f': {'calls': {'unknown': {'g': {}}}}},
+    'b.c': {'h': {'calls': {'a.c': {'f': {}}}}},
+    'unknown': {'g': {'called_in': {'a.c': {'f': {}}}}}
+}
+
+
+class FakeClade:
+    """Clade that returns the callgraph like the real one does with add_unknown=True and counts requests."""
+
+    def __init__(self):
+        self.requests = []
+
+    def get_callgraph(self, files, add_unknown=True):
+        self.requests.append(set(files))
+        files = set(files)
+        if add_unknown:
+            files.add('unknown')
+        return {file: CALLGRAPH[file] for file in files if file in CALLGRAPH}
+
+    get_functions_by_file = get_callgraph
+
+
+@pytest.fixture
+def clade():
+    return FakeClade()
+
+
+@pytest.fixture
+def index(clade, tmp_path):
+    return CladeIndex(clade, str(tmp_path / 'index.db'))
+
+
+@pytest.mark.parametrize('method', ['get_callgraph', 'get_functions_by_file'])
+def test_unknown_scope(clade, index, method):
+    # Miss path: the index requests Clade and stores the "unknown" scope along with files.
+    assert getattr(index, method)(['a.c']) == {'a.c': CALLGRAPH['a.c'], 'unknown': CALLGRAPH['unknown']}
+    assert len(clade.requests) == 1
+
+    # Hit path: the "unknown" scope is taken from the index.
+    assert getattr(index, method)(['a.c']) == {'a.c': CALLGRAPH['a.c'], 'unknown': CALLGRAPH['unknown']}
+    assert len(clade.requests) == 1
+
+    # Partial hit: just missing files are requested from Clade.
+    assert getattr(index, method)({'a.c', 'b.c', 'c.c'}) == CALLGRAPH
+    assert clade.requests[1] == {'b.c', 'c.c'}
+
+    # Files without data are remembered as well.
+    assert getattr(index, method)(['c.c']) == {'unknown': CALLGRAPH['unknown']}
+    assert len(clade.requests) == 2
@@ -236,6 +236,7 @@ class Declaration:
         self.typedef = None
         self._str = None
         self._str_no_specifiers = None
+        self._hash = None
 
     def __str__(self):
         if not self._str:
@@ -243,7 +244,10 @@ class Declaration:
         return self._str
 
     def __hash__(self):
-        return hash(self.to_string(declarator='', qualifiers=True))
+        # Declarations are not changed after import, so there is no need to print them each time.
+        if self._hash is None:
+            self._hash = hash(self.to_string(declarator='', qualifiers=True))
+        return self._hash
 
     def __eq__(self, other):
         if isinstance(other, Declaration):
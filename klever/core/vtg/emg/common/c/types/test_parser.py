@@ -15,7 +15,10 @@
 # limitations under the License.
 #
 
+import pytest
+
 from klever.core.vtg.emg.common.c.types import import_declaration
+from klever.core.vtg.emg.common.c.types import typeParser
 
 
 def parser_test(method):
@@ -264,3 +267,64 @@ def test_mess_declarations():
     return [
         'void (*((*a)(int, ...)) []) (void) []'
     ]
+
+
+DECLARATIONS = [
+    'static int a;',
+    'const unsigned long *a',
+    'struct A {int x; int y;} __attribute__((__packed__));',
+    'int (*(*(*(a) []))) []',
+    'void (*a)(struct device *, size_t *, ...)'
+]
+
+
+@pytest.fixture
+def persistent_parse_results(tmp_path, monkeypatch):
+    db_file = str(tmp_path / 'declarations.sqlite')
+    monkeypatch.setattr(typeParser, '__parse_results', dict())
+    monkeypatch.setattr(typeParser, '__persistent_parse_results', typeParser.PersistentParseResults(db_file))
+    return db_file
+
+
+def test_persistent_parse_results(persistent_parse_results):
+    asts = [typeParser.parse_declaration(test) for test in DECLARATIONS]
+    # Nothing is written until the batch is full or it is flushed explicitly.
+    assert typeParser.PersistentParseResults(persistent_parse_results).get(DECLARATIONS[0]) is None
+    typeParser.flush_persistent_parse_results()
+
+    # Emulate another EMG run that does not have parse results in memory.
+    typeParser.__dict__['__parse_results'].clear()
+    typeParser.setup_persistent_parse_results(persistent_parse_results)
+    typeParser.__dict__['__parser'] = None
+    for test, ast in zip(DECLARATIONS, asts):
+        assert typeParser.parse_declaration(test) == ast
+    # The parser was not needed at all.
+    assert typeParser.__dict__['__parser'] is None
+
+    # Callers modify ASTs, so they get copies of cached ones.
+    ast = typeParser.parse_declaration(DECLARATIONS[0])
+    ast['specifiers'] = None
+    assert typeParser.parse_declaration(DECLARATIONS[0]) == asts[0]
+
+
+def test_persistent_parse_results_batches(persistent_parse_results, monkeypatch):
+    monkeypatch.setattr(typeParser.PersistentParseResults, 'BATCH_SIZE', 2)
+    for test in DECLARATIONS[:3]:
+        typeParser.parse_declaration(test)
+
+    persistent_parse_results = typeParser.PersistentParseResults(persistent_parse_results)
+    assert [persistent_parse_results.get(test) is not None for test in DECLARATIONS[:3]] == [True, True, False]
+
+
+def test_hash():
+    for test in DECLARATIONS:
+        obj = import_declaration(test)
+        # Memoized hash is the same as the one computed from scratch.
+        assert hash(obj) == hash(obj.to_string(declarator='', qualifiers=True))
+        assert hash(obj) == hash(obj)
+
+        # The same declarations imported again have equal hashes and can be used interchangeably as keys.
+        other = import_declaration(test)
+        assert obj == other
+        assert hash(obj) == hash(other)
+        assert {obj: test}[other] == test
@@ -15,13 +15,20 @@
 # limitations under the License.
 #
 
+import os
 import re
+import pickle
+import sqlite3
 import sortedcontainers
 import ply.lex as lex
 import ply.yacc as yacc
 
 __parser = None
 __lexer = None
+# Pickled abstract syntax trees of already parsed declarations. ASTs are modified by their users, so each time a new
+# copy is unpickled.
+__parse_results = dict()
+__persistent_parse_results = None
 
 tokens = (
     'STRING',
@@ -799,6 +806,86 @@ def setup_parser():
     __parser = yacc.yacc(debug=0, write_tables=0)
 
 
+class PersistentParseResults:
+    """
+    Parse results stored in SQLite database and shared between all EMG runs of the job. Signatures are the same for
+    all program fragments including the same header files, so most of them are parsed just once per job. New parse
+    results are written by batches since committing each of them separately takes much more time than parsing.
+    """
+
+    BATCH_SIZE = 1000
+
+    def __init__(self, db_file):
+        self.db_file = db_file
+        self.pid = None
+        self._db = None
+        self.pending = []
+
+    def _connect(self):
+        """
+        Get the database connection of the current process.
+
+        SQLite connections can not be used after fork, e.g. in parallel translation workers, so each process
+        establishes its own one. Parse results pending in the parent process are dropped since the parent process
+        writes them itself.
+
+        :return: sqlite3.Connection object.
+        """
+        if self.pid != os.getpid():
+            self.pid = os.getpid()
+            self.pending = []
+            # There may be many concurrent EMG runs within the job, so wait for them rather than fail immediately.
+            self._db = sqlite3.connect(self.db_file, timeout=600)
+            with self._db:
+                self._db.execute('PRAGMA journal_mode=WAL')
+                self._db.execute('PRAGMA synchronous=NORMAL')
+                self._db.execute('CREATE TABLE IF NOT EXISTS declarations '
+                                 '(declaration TEXT PRIMARY KEY, ast BLOB NOT NULL)')
+        return self._db
+
+    def get(self, string):
+        row = self._connect().execute('SELECT ast FROM declarations WHERE declaration = ?', (string,)).fetchone()
+        return row[0] if row else None
+
+    def put(self, string, data):
+        # Connect before adding the parse result, otherwise the first connection in the forked process would drop it.
+        self._connect()
+        self.pending.append((string, data))
+        if len(self.pending) >= self.BATCH_SIZE:
+            self.flush()
+
+    def flush(self):
+        db = self._connect()
+        if self.pending:
+            with db:
+                db.executemany('INSERT OR IGNORE INTO declarations (declaration, ast) VALUES (?, ?)', self.pending)
+            self.pending = []
+
+
+def setup_persistent_parse_results(db_file):
+    """
+    Share parse results with other processes through the given database file.
+
+    :param db_file: SQLite database file name.
+    :return: None
+    """
+    global __persistent_parse_results
+
+    __persistent_parse_results = PersistentParseResults(db_file)
+
+
+def flush_persistent_parse_results():
+    """
+    Write parse results that were not shared with other processes yet.
+
+    :return: None
+    """
+    global __persistent_parse_results
+
+    if __persistent_parse_results:
+        __persistent_parse_results.flush()
+
+
 def parse_declaration(string):
     """
     Parse the given C declaration string with the possible interface extensions.
@@ -808,8 +895,25 @@ def parse_declaration(string):
     """
     global __parser
     global __lexer
+    global __parse_results
+    global __persistent_parse_results
+
+    data = __parse_results.get(string)
+    if data is None and __persistent_parse_results:
+        data = __persistent_parse_results.get(string)
+        if data is not None:
+            __parse_results[string] = data
+    if data is not None:
+        return pickle.loads(data)
 
     if not __parser:
         setup_parser()
 
-    return __parser.parse(string, lexer=__lexer)
+    ast = __parser.parse(string, lexer=__lexer)
+
+    data = pickle.dumps(ast, protocol=pickle.HIGHEST_PROTOCOL)
+    __parse_results[string] = data
+    if __persistent_parse_results:
+        __persistent_parse_results.put(string, data)
+
+    return ast
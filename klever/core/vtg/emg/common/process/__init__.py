@@ -99,7 +99,7 @@ class Process:
         inst.actions = self.actions.clone()
 
         # Change declarations and definition keys
-        for collection in (self.declarations, self.definitions):
+        for collection in (inst.declarations, inst.definitions):
             for item in collection:
                 collection[item] = copy.copy(collection[item])
 
@@ -304,6 +304,20 @@ class Action:
     def __lt__(self, other):
         return str(self) < str(other)
 
+    def clone(self):
+        """
+        Copy the description. Its containers are copied as well, so they can be changed independently, but their
+        items, e.g. savepoints, and the action of a subprocess are shared with the original description.
+
+        :return: Action.
+        """
+        new = copy.copy(self)
+        for att, val in self.__dict__.items():
+            if isinstance(val, (list, set, dict)):
+                setattr(new, att, copy.copy(val))
+        new._require = self.require
+        return new
+
     @property
     def require(self):
         return copy.deepcopy(self._require)
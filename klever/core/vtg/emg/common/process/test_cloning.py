@@ -15,12 +15,18 @@
 # limitations under the License.
 #
 
+import os
+import copy
+import timeit
+
 import pytest
 
 from klever.core.vtg.emg.common.process import Process
 from klever.core.vtg.emg.common.process.labels import Label
 from klever.core.vtg.emg.common.process.parser import parse_process
-from klever.core.vtg.emg.common.process.actions import Receive, Dispatch, Block
+from klever.core.vtg.emg.common.process.actions import Receive, Dispatch, Block, Subprocess
+
+CALLBACKS_NUM = 200
 
 
 @pytest.fixture
@@ -46,6 +52,23 @@ def clone(process):
     return process.clone()
 
 
+@pytest.fixture
+def callbacks():
+    """Subprocess that calls one of many callbacks and then repeats itself like generated models of drivers do."""
+    process = Process('callbacks')
+    assert parse_process(process, '{main}')
+    process.actions['main'] = Subprocess('main')
+    process.actions['main'].action = parse_process(
+        process, ' | '.join('<callback{0}>.{{main}}'.format(i) for i in range(CALLBACKS_NUM)))
+    for i in range(CALLBACKS_NUM):
+        block = Block('callback{0}'.format(i))
+        block.statements = ['ldv_callback{0}(%container%);'.format(i)]
+        block.condition = ['%ret% == 0']
+        process.actions[block.name] = block
+
+    return process
+
+
 def test_labels(process, clone):
     for label_name in process.labels:
         assert label_name in clone.labels, f'Missing label {label_name}'
@@ -74,3 +97,44 @@ def test_clone_behaviours(process, clone):
     assert clone.actions['d']
     assert clone.actions.behaviour('d').pop()
     assert len(clone.actions.behaviour('d').pop().my_operator) == len(operator) + 1
+
+
+def test_clone_description(process):
+    block = process.actions['b']
+    block.statements.append('a = 1;')
+    block.condition.append('a == 1')
+    block.add_required_process('c/p', {'d'})
+
+    new = block.clone()
+    assert new is not block
+    assert new.name == block.name
+    assert new.statements == block.statements and new.statements is not block.statements
+    assert new.condition == block.condition and new.condition is not block.condition
+    assert new.require == block.require
+
+    new.statements.insert(0, 'ldv_assume(a == 1);')
+    new.condition = []
+    new.add_required_process('c/p', {'e'})
+    assert block.statements == ['a = 1;']
+    assert block.condition == ['a == 1']
+    assert block.require == {'c/p': {'include': {'d'}}}
+
+
+def test_clone_subprocess(callbacks):
+    subprocess = callbacks.actions['main']
+    new = subprocess.clone()
+    # The behaviour graph is shared rather than copied.
+    assert new.action is subprocess.action
+
+    new.comment = 'Changed'
+    new.savepoints.add('savepoint')
+    assert subprocess.comment != 'Changed'
+    assert not subprocess.savepoints
+
+
+@pytest.mark.skipif(not os.environ.get('KLEVER_BENCHMARKS'), reason='set KLEVER_BENCHMARKS to run benchmarks')
+def test_clone_subprocess_benchmark(callbacks):
+    subprocess = callbacks.actions['main']
+    deepcopy_time = min(timeit.repeat(lambda: copy.deepcopy(subprocess), number=10, repeat=3))
+    clone_time = min(timeit.repeat(subprocess.clone, number=10, repeat=3))
+    assert clone_time * 100 < deepcopy_time
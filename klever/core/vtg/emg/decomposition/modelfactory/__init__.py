@@ -15,7 +15,6 @@
 # limitations under the License.
 #
 
-import copy
 import logging
 
 from klever.core.vtg.emg.common.process.actions import Receive
@@ -343,7 +342,7 @@ class ModelFactory:
         selector = self.strategy(self.logger, self.conf, processes_to_scenarios, model)
         for batch, related_process in selector():
             new = ProcessCollection(batch.name)
-            new.attributes = copy.deepcopy(batch.attributes)
+            new.attributes = dict(batch.attributes)
             original_name = batch.attributed_name
 
             # Do sanity check to catch several savepoints in a model
@@ -14,7 +14,6 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 #
-import copy
 
 from klever.core.vtg.emg.common.process import Process
 from klever.core.vtg.emg.decomposition.scenario import Scenario
@@ -102,7 +101,11 @@ class SelectiveSelector(Selector):
             for model in sorted(iterate_over_models, key=lambda x: x.attributed_name):
                 self.logger.info(f"Consider adding scenarios to model '{model.attributed_name}'")
                 local_model_pool = set()
-                local_coverage = copy.deepcopy(coverage)
+                # Just the coverage of the current process is changed below, so copy only it.
+                local_coverage = dict(coverage)
+                if process_name in coverage:
+                    local_coverage[process_name] = {name: set(actions)
+                                                    for name, actions in coverage[process_name].items()}
 
                 if process_name not in model.environment:
                     self.logger.warning(
@@ -15,8 +15,6 @@
 # limitations under the License.
 #
 
-import copy
-
 from klever.core.vtg.emg.decomposition.scenario import Scenario, Path
 from klever.core.vtg.emg.decomposition.separation import SeparationStrategy, ScenarioExtractor
 from klever.core.vtg.emg.common.process.actions import Choice, Operator, Concatenation, Action, Behaviour, Subprocess, \
@@ -47,7 +45,7 @@ class LinearExtractor(ScenarioExtractor):
             for behaviour in processing_path:
                 new_scenario.add_action_copy(behaviour, new_scenario.initial_action)
                 if behaviour.name not in new_scenario.actions:
-                    new_description = copy.deepcopy(self._actions[behaviour.name])
+                    new_description = self._actions[behaviour.name].clone()
                     new_scenario.actions[behaviour.name] = new_description
 
                     # Transform blocks
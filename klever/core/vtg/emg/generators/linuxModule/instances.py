@@ -979,6 +979,10 @@ def _remove_statics(logger, sa, process):
                             _values_map[file] = sortedcontainers.SortedDict()
                         _values_map[file][new_value] = implementation.value
 
+                        # Implementations are shared between access maps of different instances, so change a copy.
+                        implementation = copy.copy(implementation)
+                        access_map[access][interface] = implementation
+
                         # This is quite precise match to avoid an exception assign valus through a void* match
                         if implementation.declaration != declaration and \
                                 isinstance(implementation.declaration, Pointer):
@@ -1019,6 +1023,17 @@ def _copy_process(process, instances_left):
     return inst
 
 
+def _copy_access_map(access_map):
+    """
+    Copy the access map. Implementation objects are not copied and thus they are shared between maps. Implementations
+    should be copied before they will be changed.
+
+    :param access_map: {'Access.expression string'->'Interface string'->'Implementation object/None'}.
+    :return: {'Access.expression string'->'Interface string'->'Implementation object/None'}.
+    """
+    return {expression: dict(interfaces) for expression, interfaces in access_map.items()}
+
+
 def _split_into_instances(sa, interfaces, process, resource_new_insts, simplified_map=None):
     """
     Get a process and calculate instances to get automata with exactly one implementation per interface.
@@ -1056,7 +1071,7 @@ def _split_into_instances(sa, interfaces, process, resource_new_insts, simplifie
         ivector = [0 for _ in enumerate(final_options_list)]
 
         for _ in enumerate(interface_to_value[final_options_list[0]]):
-            new_map = copy.deepcopy(access_map)
+            new_map = _copy_access_map(access_map)
             chosen_values = sortedcontainers.SortedSet()
 
             # Set chosen implementations
@@ -1091,7 +1106,7 @@ def _split_into_instances(sa, interfaces, process, resource_new_insts, simplifie
             # container
             if access_map[expression][interface] and [val for val in interface_to_value[interface]
                                                       if interface_to_value[interface][val]]:
-                new = [copy.deepcopy(maps[0][0]), copy.copy(maps[0][1])]
+                new = [_copy_access_map(maps[0][0]), copy.copy(maps[0][1])]
                 new[1].remove(new[0][expression][interface])
                 new[0][expression][interface] = None
                 maps.append(new)
@@ -1386,7 +1401,7 @@ def _fulfil_map(expression, interface, value_map, reuse, value_to_implementation
             if reuse:
                 new = reuse.pop()
             else:
-                new = [copy.deepcopy(first[0]), copy.copy(first[1])]
+                new = [_copy_access_map(first[0]), copy.copy(first[1])]
                 new_maps.append(new)
 
         new[0][expression][interface] = value_to_implementation[value]
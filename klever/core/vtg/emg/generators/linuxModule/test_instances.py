@@ -0,0 +1,107 @@
+#
+# Copyright (c) 2021 ISP RAS (http://www.ispras.ru)
+# Ivannikov Institute for System Programming of the Russian Academy of Sciences
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import logging
+
+import pytest
+import sortedcontainers
+
+from klever.core.vtg.emg.common.c import Function
+from klever.core.vtg.emg.common.c.types import import_declaration
+from klever.core.vtg.emg.generators.linuxModule import instances
+from klever.core.vtg.emg.generators.linuxModule.interface import Implementation
+from klever.core.vtg.emg.generators.linuxModule.process import ExtendedProcess
+
+
+class FakeSource:
+    """Source collection with the only static function."""
+
+    def __init__(self, function):
+        self.function = function
+
+    def get_source_variable(self, name, file):
+        return None
+
+    def get_source_function(self, name, file, declaration=None):
+        return self.function if name == self.function.name else None
+
+    def get_source_functions(self, name):
+        return [self.function] if name == self.function.name else []
+
+    def refined_name(self, name):
+        return name
+
+
+@pytest.fixture
+def source(monkeypatch):
+    # Wrappers are remembered globally, so start from scratch.
+    monkeypatch.setattr(instances, '_declarations', {'environment model': list()})
+    monkeypatch.setattr(instances, '_definitions', {'environment model': list()})
+    monkeypatch.setattr(instances, '_values_map', sortedcontainers.SortedDict())
+
+    function = Function('probe', 'static int probe(struct device *dev)')
+    function.definition_file = 'main.c'
+    # Source collection sets this attribute when it imports functions.
+    function.static = True
+    return FakeSource(function)
+
+
+@pytest.fixture
+def access_map():
+    return {
+        '%ops.probe%': {'ops.probe': Implementation('probe', import_declaration('int (*probe)(struct device *)'),
+                                                    'probe', 'main.c')},
+        '%ops.remove%': {'ops.remove': None}
+    }
+
+
+def test_copy_access_map(access_map):
+    new_map = instances._copy_access_map(access_map)
+    assert new_map == access_map
+    # Implementations are shared, while containers are not.
+    assert new_map['%ops.probe%']['ops.probe'] is access_map['%ops.probe%']['ops.probe']
+    assert new_map['%ops.probe%'] is not access_map['%ops.probe%']
+
+    new_map['%ops.probe%']['ops.probe'] = None
+    new_map['%ops.remove%']['ops.other'] = None
+    new_map['%ops.new%'] = {}
+    assert access_map['%ops.probe%']['ops.probe'].value == 'probe'
+    assert access_map['%ops.remove%'] == {'ops.remove': None}
+    assert '%ops.new%' not in access_map
+
+
+def test_remove_statics_copy_on_write(source, access_map):
+    implementation = access_map['%ops.probe%']['ops.probe']
+    processes = []
+    for name in ('first', 'second'):
+        process = ExtendedProcess(name, 'test')
+        process.allowed_implementations = instances._copy_access_map(access_map)
+        processes.append(process)
+
+    instances._remove_statics(logging.getLogger(), source, processes[0])
+
+    # The clone got a changed copy of the implementation that calls the wrapper.
+    new_implementation = processes[0].allowed_implementations['%ops.probe%']['ops.probe']
+    assert new_implementation is not implementation
+    assert new_implementation.value == 'emg_wrapper_probe'
+    assert 'emg_wrapper_probe' in processes[0].definitions['main.c']
+
+    # Neither the original access map nor other clones see these changes.
+    for other_map in (access_map, processes[1].allowed_implementations):
+        assert other_map['%ops.probe%']['ops.probe'] is implementation
+    assert implementation.value == 'probe'
+    assert str(implementation.declaration) == str(import_declaration('int (*probe)(struct device *)'))
@@ -0,0 +1,79 @@
+#
+# Copyright (c) 2021 ISP RAS (http://www.ispras.ru)
+# Ivannikov Institute for System Programming of the Russian Academy of Sciences
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import os
+import glob
+import json
+import logging
+
+import pytest
+
+from klever.core.vtg.emg import _translate_models
+from klever.core.vtg.emg.decomposition import decompose_intermediate_model
+from klever.core.vtg.emg.common.process import ProcessCollection
+from klever.core.vtg.emg.common.process.serialization import CollectionDecoder
+from klever.core.vtg.emg.common.process.model_for_testing import raw_model_preset, source_preset
+
+
+def get_model(source):
+    # Translation does not support $CALLOC.
+    raw_model = json.loads(json.dumps(raw_model_preset()).replace('$CALLOC', '$ALLOC'))
+    model = CollectionDecoder(logging.getLogger(), dict()).parse_event_specification(source, raw_model,
+                                                                                    ProcessCollection())
+    model.establish_peers()
+    return model
+
+
+def translate(path, workers_num):
+    """Translate all models of the preset within the given directory and get descriptions and generated files."""
+    os.makedirs(path)
+    cwd = os.getcwd()
+    os.chdir(path)
+    try:
+        conf = {
+            'main working directory': path,
+            'single environment model per fragment': False,
+            'translation options': {'additional headers': ['ldv/linux/common.h']}
+        }
+        source = source_preset()
+        source.c_full_paths = {'main.c', 'lib.c'}
+        models = list(decompose_intermediate_model(logging.getLogger(), conf, get_model(source)))
+        for number, model in enumerate(models):
+            model.name = str(number)
+        abstract_task = {'grps': [{'id': 'main', 'Extra CCs': [{'in file': 'main.c'}, {'in file': 'lib.c'}]}]}
+
+        descriptions = _translate_models(logging.getLogger(), conf, abstract_task, source, models, workers_num)
+        files = dict()
+        for file in glob.glob('**/*.[ch]', recursive=True) + glob.glob('**/*.aspect', recursive=True):
+            with open(file) as fp:
+                files[file] = fp.read()
+        return descriptions, files
+    finally:
+        os.chdir(cwd)
+
+
+def test_parallel_translation(tmp_path, monkeypatch):
+    # Images of processes are not compared and Graphviz executables may be not installed.
+    monkeypatch.setattr(ProcessCollection, 'save_digraphs', lambda self, directory: None)
+    seq_descriptions, seq_files = translate(str(tmp_path / 'seq'), 1)
+    par_descriptions, par_files = translate(str(tmp_path / 'par'), 2)
+
+    assert len(seq_descriptions) > 1
+    assert seq_files
+    assert str(par_descriptions).replace(str(tmp_path / 'par'), '') == \
+        str(seq_descriptions).replace(str(tmp_path / 'seq'), '')
+    assert par_files == seq_files
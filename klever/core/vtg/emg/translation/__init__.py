@@ -103,7 +103,8 @@ def translate_intermediate_model(logger, conf, avt, source, collection):
     entry_file = os.path.join(model_path,
                               conf['translation options'].get('environment model file', 'environment_model.c'))
     entry_point_name = get_or_die(conf['translation options'], 'entry point')
-    files = source.c_full_paths
+    # Do not add entry point files to the source representation shared by all models.
+    files = set(source.c_full_paths)
     if entry_file not in files:
         files.add(entry_file)
         try:
@@ -15,8 +15,10 @@
 # limitations under the License.
 #
 
+import hashlib
 import os
 import re
+import shutil
 import zipfile
 import json
 import klever.core.utils
@@ -36,10 +38,11 @@ def merge_files(logger, conf, abstract_task_desc):
     else:
         logger.info('Merge source files by means of CIL')
 
+        input_files = [os.path.join(conf['main working directory'], extra_c_file['C file'])
+                       for extra_c_file in abstract_task_desc['extra C files'] if 'C file' in extra_c_file]
         with open('input files', 'w', encoding='utf-8') as fp:
-            for extra_c_file in abstract_task_desc['extra C files']:
-                if 'C file' in extra_c_file:
-                    fp.write(os.path.join(conf['main working directory'], extra_c_file['C file']) + '\n')
+            for input_file in input_files:
+                fp.write(input_file + '\n')
 
         args = ['toplevel.opt'] + \
             conf.get('CIL additional opts', []) + \
@@ -75,12 +78,34 @@ def merge_files(logger, conf, abstract_task_desc):
                 '-more-files', 'input files'
             ]
 
-        klever.core.utils.execute(logger, args=args, enforce_limitations=True,
-                                  cpu_time_limit=conf["resource limits"]["CPU time for executed commands"],
-                                  memory_limit=conf["resource limits"]["memory size for executed commands"])
-        # There will be empty file if CIL succeeded. Remove it to avoid unknown reports of whole FVTP later.
-        if os.path.isfile('problem desc.txt'):
-            os.unlink('problem desc.txt')
+        # Merged file depends just on contents of input files, their order and CIL options, so it can be shared
+        # between all verification tasks of the job including rescheduled ones.
+        cache_file = None
+        if 'cache directory' in conf:
+            hash_sha256 = hashlib.sha256()
+            hash_sha256.update(json.dumps([args, [klever.core.utils.get_file_checksum(input_file)
+                                                  for input_file in input_files]]).encode('utf-8'))
+            cache_file = os.path.join(conf['cache directory'], 'CIL', hash_sha256.hexdigest() + '.i')
+
+        if cache_file and os.path.isfile(cache_file):
+            logger.info('Get merged source files from cache')
+            shutil.copy(cache_file, 'cil.i')
+        else:
+            klever.core.utils.execute(logger, args=args, enforce_limitations=True,
+                                      cpu_time_limit=conf["resource limits"]["CPU time for executed commands"],
+                                      memory_limit=conf["resource limits"]["memory size for executed commands"])
+            # There will be empty file if CIL succeeded. Remove it to avoid unknown reports of whole FVTP later.
+            if os.path.isfile('problem desc.txt'):
+                os.unlink('problem desc.txt')
+
+            if cache_file:
+                # Concurrent workers may merge the same files simultaneously. Each of them stores its result to its
+                # own temporary file and then atomically renames it, so cache entries are always complete.
+                logger.info('Store merged source files to cache')
+                os.makedirs(os.path.dirname(cache_file), exist_ok=True)
+                cache_file_tmp = '{0}.{1}.tmp'.format(cache_file, os.getpid())
+                shutil.copy('cil.i', cache_file_tmp)
+                os.replace(cache_file_tmp, cache_file)
 
         logger.debug('Merged source files was outputted to "cil.i"')
 
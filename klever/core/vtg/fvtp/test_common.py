@@ -0,0 +1,135 @@
+#
+# Copyright (c) 2021 ISP RAS (http://www.ispras.ru)
+# Ivannikov Institute for System Programming of the Russian Academy of Sciences
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import os
+import shutil
+import logging
+
+import pytest
+
+import klever.core.utils
+from klever.core.vtg.fvtp.common import merge_files
+
+
+@pytest.fixture
+def conf(tmp_path):
+    return {
+        'main working directory': str(tmp_path),
+        'cache directory': str(tmp_path / 'cache'),
+        'CIL': {'machine': 'gcc_x86_64'},
+        'resource limits': {'CPU time for executed commands': 100, 'memory size for executed commands': 1000000}
+    }
+
+
+@pytest.fixture
+def merge(conf, monkeypatch):
+    """Merge input files in new working directories of verification tasks with emulation of CIL."""
+    for c_file in ('main.i', 'model.i'):
+        with open(os.path.join(conf['main working directory'], c_file), 'w', encoding='utf-8') as fp:
+            fp.write('int {0};\n'.format(os.path.splitext(c_file)[0]))
+
+    merged = []
+
+    def fake_execute(logger, args, **kwargs):
+        merged.append(args)
+        with open('input files', encoding='utf-8') as fin, open('cil.i', 'w', encoding='utf-8') as fout:
+            for input_file in fin:
+                with open(input_file.rstrip('\n'), encoding='utf-8') as fp:
+                    fout.write(fp.read())
+
+    monkeypatch.setattr(klever.core.utils, 'execute', fake_execute)
+
+    def run(task, conf=conf, c_files=('main.i', 'model.i')):
+        work_dir = os.path.join(conf['main working directory'], task)
+        os.makedirs(work_dir)
+        monkeypatch.chdir(work_dir)
+        merge_files(logging.getLogger(), conf, {'extra C files': [{'C file': c_file} for c_file in c_files]})
+        with open('cil.i', encoding='utf-8') as fp:
+            return fp.read()
+
+    run.merged = merged
+    return run
+
+
+def get_cache_entries(conf):
+    return sorted(os.listdir(os.path.join(conf['cache directory'], 'CIL')))
+
+
+def test_cil_cache(conf, merge):
+    assert merge('task1') == 'int main;\nint model;\n'
+    assert len(merge.merged) == 1
+    entries = get_cache_entries(conf)
+    assert len(entries) == 1 and entries[0].endswith('.i')
+
+    # Other verification tasks merging the same files with the same options get the result from the cache.
+    assert merge('task2') == 'int main;\nint model;\n'
+    assert len(merge.merged) == 1
+    assert get_cache_entries(conf) == entries
+
+    # Order of input files
+    assert merge('task3', c_files=('model.i', 'main.i')) == 'int model;\nint main;\n'
+    assert len(merge.merged) == 2
+
+    # CIL options
+    merge('task4', conf=dict(conf, CIL={'machine': 'gcc_x86_32'}))
+    assert len(merge.merged) == 3
+    merge('task5', conf=dict(conf, **{'CIL additional opts': ['-no-remove-unused']}))
+    assert len(merge.merged) == 4
+
+    # Content of input files
+    with open(os.path.join(conf['main working directory'], 'model.i'), 'a', encoding='utf-8') as fp:
+        fp.write('int model2;\n')
+    assert merge('task6') == 'int main;\nint model;\nint model2;\n'
+    assert len(merge.merged) == 5
+
+    assert len(get_cache_entries(conf)) == 5
+
+
+def test_cil_cache_disabled(conf, merge):
+    conf = dict(conf)
+    del conf['cache directory']
+    merge('task1', conf=conf)
+    merge('task2', conf=conf)
+    assert len(merge.merged) == 2
+    assert not os.path.exists(os.path.join(conf['main working directory'], 'cache'))
+
+
+def test_cil_cache_publish_failure(conf, merge, monkeypatch):
+    def fail(*args, **kwargs):
+        raise OSError('No space left on device')
+
+    # The worker fails when storing the merged file to the cache.
+    with monkeypatch.context() as m:
+        m.setattr(os, 'replace', fail)
+        with pytest.raises(OSError):
+            merge('task1')
+    assert not any(entry.endswith('.i') for entry in get_cache_entries(conf))
+
+    # The worker fails when copying the merged file to the cache.
+    with monkeypatch.context() as m:
+        m.setattr(shutil, 'copy', fail)
+        with pytest.raises(OSError):
+            merge('task2')
+    assert not any(entry.endswith('.i') for entry in get_cache_entries(conf))
+
+    # The next worker merges files itself and stores the complete result to the cache.
+    assert merge('task3') == 'int main;\nint model;\n'
+    assert len(merge.merged) == 3
+    entries = [entry for entry in get_cache_entries(conf) if entry.endswith('.i')]
+    assert len(entries) == 1
+    with open(os.path.join(conf['cache directory'], 'CIL', entries[0]), encoding='utf-8') as fp:
+        assert fp.read() == 'int main;\nint model;\n'
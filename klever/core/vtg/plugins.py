@@ -24,17 +24,27 @@ import klever.core.utils
 
 class Plugin(klever.core.components.Component):
     depend_on_requirement = True
+    # Parent can pass abstract verification task description to the plugin process directly rather than through file.
+    abstract_task_desc = None
+    # Connection to send modified abstract verification task description back to parent rather than through file.
+    out_abstract_task_desc_conn = None
 
     def run(self):
-        in_abstract_task_desc_file = os.path.relpath(
-            os.path.join(self.conf['main working directory'], self.conf['in abstract task desc file']))
-        with open(in_abstract_task_desc_file, encoding='utf-8') as fp:
-            self.abstract_task_desc = json.load(fp)
+        if self.abstract_task_desc is None:
+            in_abstract_task_desc_file = os.path.relpath(
+                os.path.join(self.conf['main working directory'], self.conf['in abstract task desc file']))
+            with open(in_abstract_task_desc_file, encoding='utf-8') as fp:
+                self.abstract_task_desc = json.load(fp)
         super(Plugin, self).run()
-        out_abstract_task_desc_file = os.path.relpath(
-            os.path.join(self.conf['main working directory'], self.conf['out abstract task desc file']))
-        self.logger.info(
-            'Put modified abstract verification task description to file "{0}"'.format(out_abstract_task_desc_file))
-        with open(out_abstract_task_desc_file, 'w', encoding='utf-8') as fp:
-            klever.core.utils.json_dump(self.abstract_task_desc, fp, self.conf['keep intermediate files'])
+        if self.out_abstract_task_desc_conn:
+            self.logger.info('Send modified abstract verification task description to parent')
+            self.out_abstract_task_desc_conn.send(self.abstract_task_desc)
+            self.out_abstract_task_desc_conn.close()
+        if not self.out_abstract_task_desc_conn or self.conf['keep intermediate files']:
+            out_abstract_task_desc_file = os.path.relpath(
+                os.path.join(self.conf['main working directory'], self.conf['out abstract task desc file']))
+            self.logger.info(
+                'Put modified abstract verification task description to file "{0}"'.format(out_abstract_task_desc_file))
+            with open(out_abstract_task_desc_file, 'w', encoding='utf-8') as fp:
+                klever.core.utils.json_dump(self.abstract_task_desc, fp, self.conf['keep intermediate files'])
         self.logger.info('Plugin has finished')
@@ -0,0 +1,78 @@
+#
+# Copyright (c) 2021 ISP RAS (http://www.ispras.ru)
+# Ivannikov Institute for System Programming of the Russian Academy of Sciences
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import os
+import time
+import logging
+import importlib
+import multiprocessing
+
+import pytest
+
+PLUGINS = ('EMG', 'ASE', 'TR', 'RSG', 'Weaver', 'FVTP')
+TASKS_NUM = 20
+# Preloading should remove most of the overhead of starting plugins
+MIN_SPEEDUP = 5
+
+
+def get_plugin(plugin_name):
+    # This is how VTG workers get plugins before starting them.
+    return getattr(importlib.import_module('.{0}'.format(plugin_name.lower()), 'klever.core.vtg'), plugin_name)
+
+
+def measure_plugins_startup(preload, results):
+    """Put the mean time of starting all plugins in separate processes per verification task along with exit codes of
+    these processes to the queue. This should be run in a fresh process."""
+    from klever.core.vtg import VTGWL
+
+    if preload:
+        vtgwl = VTGWL.__new__(VTGWL)
+        vtgwl.logger = logging.getLogger()
+        vtgwl.req_spec_classes = {
+            'class': {'requirement': {'plugins': [{'name': plugin_name} for plugin_name in PLUGINS]}}
+        }
+        vtgwl._VTGWL__preload_plugins()
+
+    context = multiprocessing.get_context('fork')
+    exitcodes = set()
+    start_time = time.time()
+    for _ in range(TASKS_NUM):
+        for plugin_name in PLUGINS:
+            p = context.Process(target=get_plugin, args=(plugin_name,))
+            p.start()
+            p.join()
+            exitcodes.add(p.exitcode)
+
+    results.put(((time.time() - start_time) / TASKS_NUM, exitcodes))
+
+
+def get_plugins_startup(preload):
+    # Plugin modules are likely imported by other tests, so measure startup in a fresh process. It can not be a worker
+    # of a pool since the latter can not have children.
+    context = multiprocessing.get_context('spawn')
+    results = context.Queue()
+    p = context.Process(target=measure_plugins_startup, args=(preload, results))
+    p.start()
+    startup, exitcodes = results.get()
+    p.join()
+    assert exitcodes == {0}
+    return startup
+
+
+@pytest.mark.skipif(not os.environ.get('KLEVER_BENCHMARKS'), reason='set KLEVER_BENCHMARKS to run benchmarks')
+def test_preload_plugins():
+    assert get_plugins_startup(True) * MIN_SPEEDUP < get_plugins_startup(False)
@@ -21,6 +21,36 @@ import jinja2
 
 import klever.core.vtg.plugins
 
+def get_environment(conf):
+    # All templates reside in the same directory as specifications base.
+    templates_dir = os.path.dirname(conf['specifications base'])
+
+    # TR is run in a new process for each verification task, so compiled templates can not be kept in memory between
+    # verification tasks. Instead they are stored to the job cache directory, so other processes will not compile them
+    # again.
+    cache_dir = os.path.join(conf['cache directory'], 'templates') if 'cache directory' in conf else None
+    if cache_dir:
+        os.makedirs(cache_dir, exist_ok=True)
+
+    return jinja2.Environment(
+        loader=jinja2.FileSystemLoader(templates_dir),
+        bytecode_cache=jinja2.FileSystemBytecodeCache(cache_dir) if cache_dir else None,
+        # This allows to start template statements with the specified prefix rather than to put them inside
+        # special "braces", e.g. in "{% ... %}" by default.
+        # "//" is the beginning of one-line C/C++ comments, so editors will likely treat these lines as
+        # comments if one will use C syntax highlighting.
+        line_statement_prefix='//',
+        # Remove excessive whitespaces. Users needn't know that they see on rendered templates.
+        trim_blocks=True,
+        lstrip_blocks=True,
+        # Keep new line at the EOF. This is required, for instance, for aspect templates since they are
+        # concatenated with other aspects after rendering.
+        keep_trailing_newline=True,
+        # Raise exception if some template value is undefined. This can happens if template or/and template
+        # context is incorrect.
+        undefined=jinja2.StrictUndefined
+    )
+
 
 class TR(klever.core.vtg.plugins.Plugin):
 
@@ -40,24 +70,7 @@ class TR(klever.core.vtg.plugins.Plugin):
             # Here files containing rendered templates will be stored.
             self.abstract_task_desc['files'] = []
 
-            env = jinja2.Environment(
-                # All templates reside in the same directory as specifications base.
-                loader=jinja2.FileSystemLoader(os.path.dirname(self.conf['specifications base'])),
-                # This allows to start template statements with the specified prefix rather than to put them inside
-                # special "braces", e.g. in "{% ... %}" by default.
-                # "//" is the beginning of one-line C/C++ comments, so editors will likely treat these lines as
-                # comments if one will use C syntax highlighting.
-                line_statement_prefix='//',
-                # Remove excessive whitespaces. Users needn't know that they see on rendered templates.
-                trim_blocks=True,
-                lstrip_blocks=True,
-                # Keep new line at the EOF. This is required, for instance, for aspect templates since they are
-                # concatenated with other aspects after rendering.
-                keep_trailing_newline=True,
-                # Raise exception if some template value is undefined. This can happens if template or/and template
-                # context is incorrect.
-                undefined=jinja2.StrictUndefined
-            )
+            env = get_environment(self.conf)
 
             for tmpl in self.conf['templates']:
                 self.logger.info('Render template "{0}"'.format(tmpl))
@@ -16,6 +16,7 @@
 #
 
 import glob
+import hashlib
 import json
 import multiprocessing
 import os
@@ -54,6 +55,9 @@ class Weaver(klever.core.vtg.plugins.Plugin):
         # solution of verification tasks from time to time.
         env['LDV_C_BACKEND_OMIT_TYPE_QUALS'] = "1"
 
+        # Identify CIF to be used by all Weaver workers to key cache entries of woven in C files.
+        cif_version = self.__get_cif_version()
+
         # Put all extra CC descriptions into the queue prior to launching parallel workers.
         self.extra_ccs = []
         for grp in self.abstract_task_desc['grps']:
@@ -85,6 +89,7 @@ class Weaver(klever.core.vtg.plugins.Plugin):
                                          search_dirs=search_dirs,
                                          clade=clade, clade_meta=clade_meta,
                                          env=env,
+                                         cif_version=cif_version,
                                          grp_id=self.extra_ccs[extra_cc_index][0],
                                          extra_cc=self.extra_ccs[extra_cc_index][1],
                                          lock=lock)
@@ -160,11 +165,23 @@ class Weaver(klever.core.vtg.plugins.Plugin):
 
     main = weave
 
+    def __get_cif_version(self):
+        # CIF is not versioned separately from Klever deployments, so its identity is defined by the path of its
+        # executable along with size and time of last modification of the latter. This changes whenever CIF is updated.
+        cif = klever.core.vtg.utils.get_cif_or_aspectator_exec(self.conf, 'cif')
+        cif_path = shutil.which(cif) or cif
+        try:
+            cif_stat = os.stat(cif_path)
+        except OSError:
+            return cif_path
+
+        return '{0}:{1}:{2}'.format(os.path.realpath(cif_path), cif_stat.st_size, cif_stat.st_mtime_ns)
+
 
 class WeaverWorker(klever.core.components.Component):
     def __init__(self, conf, logger, parent_id, callbacks, mqs, vals, id=None, work_dir=None, attrs=None,
                  separate_from_parent=False, include_child_resources=False, search_dirs=None, clade=None,
-                 clade_meta=None, env=None, grp_id=None, extra_cc=None, lock=None):
+                 clade_meta=None, env=None, cif_version=None, grp_id=None, extra_cc=None, lock=None):
         super(WeaverWorker, self).__init__(conf, logger, parent_id, callbacks, mqs, vals, id, work_dir, attrs,
                                            separate_from_parent, include_child_resources)
 
@@ -174,6 +191,7 @@ class WeaverWorker(klever.core.components.Component):
         self.clade = clade
         self.clade_meta = clade_meta
         self.env = env
+        self.cif_version = cif_version
         self.grp_id = grp_id
         self.extra_cc = extra_cc
         self.lock = lock
@@ -269,71 +287,100 @@ class WeaverWorker(klever.core.components.Component):
 
         is_model = (self.grp_id == 'models')
 
-        # Original sources should be woven in and we do not need to get cross references for them since this
-        # was already done before.
-        if not is_model:
-            self.__weave(infile, opts, aspect, outfile_unique, cwd, is_model)
-        # For generated models we need to weave them in (actually, just pass through C Back-end) and to get
-        # cross references always since most likely they all are different.
-        elif 'generated' in self.extra_cc:
+        # Original sources do not need cross references since this was already done before. For models cross
+        # references are required unless code coverage is restricted to original sources.
+        get_cross_refs = is_model and self.conf['code coverage details'] != 'Original C source files'
+
+        # Generated models are placed to unique directories of particular verification tasks and most likely they
+        # all are different, so caching them would just fill in the cache with entries that will be never hit.
+        if 'generated' in self.extra_cc:
             self.__weave(infile, opts, aspect, outfile_unique, cwd, is_model)
-            if self.conf['code coverage details'] != 'Original C source files':
+            if get_cross_refs:
                 self.__get_cross_refs(infile, opts, outfile_unique, cwd)
-        # For non-generated models use results cache in addition.
-        else:
-            cache_dir = os.path.join(self.conf['cache directory'],
-                                     klever.core.utils.get_file_name_checksum(infile))
-            with klever.core.utils.LockedOpen(cache_dir + '.tmp', 'w'):
-                if os.path.exists(cache_dir):
-                    self.logger.info('Get woven in C file from cache')
-                    outfile = os.path.join(cache_dir, os.path.basename(outfile))
-                    if not os.path.exists(outfile):
-                        raise FileExistsError('Cache misses woven in C file (perhaps your models are broken)')
-                    self.vals['extra C files'].append(
-                         {'C file': os.path.relpath(outfile, self.conf['main working directory'])})
-                    if self.conf['code coverage details'] != 'Original C source files':
-                        self.logger.info('Get cross references from cache')
-                        additional_srcs = os.path.join(cache_dir, 'additional sources')
-                        if not os.path.exists(additional_srcs):
-                            raise FileExistsError(
-                                'Cache misses cross references (perhaps your models are broken)')
-                        self.__merge_additional_srcs(os.path.join(cache_dir, 'additional sources'))
-                else:
-                    os.makedirs(cache_dir)
-                    self.__weave(infile, opts, aspect, outfile_unique, cwd, is_model)
-                    self.logger.info('Store woven in C file to cache')
-                    shutil.copy(outfile_unique, os.path.join(cache_dir, outfile))
-
-                    if self.conf['code coverage details'] != 'Original C source files':
-                        self.__get_cross_refs(infile, opts, outfile_unique, cwd)
-                        self.logger.info('Store cross references to cache')
-                        shutil.copytree(outfile_unique + ' additional sources',
-                                        os.path.join(cache_dir, 'additional sources'))
+            return
+
+        # Many verification tasks share the same extra CCs with the same aspects, e.g. when program fragments are
+        # checked against several requirements specifications or models are weaved in for various program
+        # fragments. Thus results are cached by content rather than by names of input files.
+        cache_dir = os.path.join(self.conf['cache directory'],
+                                 self.__get_cache_key(infile, opts, aspect, cwd, is_model, get_cross_refs))
+        with klever.core.utils.LockedOpen(cache_dir + '.tmp', 'w'):
+            if os.path.exists(cache_dir):
+                self.logger.info('Get woven in C file from cache')
+                outfile = os.path.join(cache_dir, os.path.basename(outfile))
+                if not os.path.exists(outfile):
+                    raise FileExistsError('Cache misses woven in C file (perhaps your models are broken)')
+                self.vals['extra C files'].append(
+                     {'C file': os.path.relpath(outfile, self.conf['main working directory'])})
+                if get_cross_refs:
+                    self.logger.info('Get cross references from cache')
+                    additional_srcs = os.path.join(cache_dir, 'additional sources')
+                    if not os.path.exists(additional_srcs):
+                        raise FileExistsError(
+                            'Cache misses cross references (perhaps your models are broken)')
+                    self.__merge_additional_srcs(additional_srcs)
+            else:
+                self.__weave(infile, opts, aspect, outfile_unique, cwd, is_model)
+                if get_cross_refs:
+                    self.__get_cross_refs(infile, opts, outfile_unique, cwd)
+
+                # Fill in cache entry completely before it will become visible, so other workers and verification
+                # tasks never meet incomplete cache entries even if this worker will be killed in the middle.
+                self.logger.info('Store woven in C file to cache')
+                cache_dir_tmp = cache_dir + '.part'
+                shutil.rmtree(cache_dir_tmp, ignore_errors=True)
+                os.makedirs(cache_dir_tmp)
+                shutil.copy(outfile_unique, os.path.join(cache_dir_tmp, outfile))
+                if get_cross_refs:
+                    self.logger.info('Store cross references to cache')
+                    shutil.copytree(outfile_unique + ' additional sources',
+                                    os.path.join(cache_dir_tmp, 'additional sources'))
+                os.rename(cache_dir_tmp, cache_dir)
 
     main = process_extra_cc
 
+    def __get_cache_key(self, infile, opts, aspect, cwd, is_model, get_cross_refs):
+        # Woven in C file depends on the input file content, all CIF options including ones coming from the
+        # configuration, the aspect content, CIF itself and environment variables affecting C Back-end. Input file and
+        # working directory paths are taken into account as well since they are referred by line directives and cross
+        # references. Output file name does not matter, so it is replaced with a placeholder.
+        hash_sha256 = hashlib.sha256()
+        hash_sha256.update(json.dumps([
+            infile,
+            klever.core.utils.get_file_checksum(infile),
+            cwd,
+            self.__get_cif_args(infile, opts, aspect and 'aspect', 'out', is_model),
+            klever.core.utils.get_file_checksum(aspect) if aspect else None,
+            self.cif_version,
+            [self.env.get(var) for var in ('LDV_INLINE_ASM_STUB', 'LDV_C_BACKEND_OMIT_TYPE_QUALS')],
+            get_cross_refs
+        ]).encode('utf-8'))
+        return hash_sha256.hexdigest()
+
+    def __get_cif_args(self, infile, opts, aspect, outfile, is_model):
+        return [
+                   klever.core.vtg.utils.get_cif_or_aspectator_exec(self.conf, 'cif'),
+                   '--in', infile,
+                   # Besides header files specific for requirements specifications will be searched for.
+                   '--general-opts',
+                   '-I' + os.path.join(os.path.dirname(self.conf['specifications base']), 'include'),
+                   '--aspect-preprocessing-opts', ' '.join(self.conf['aspect preprocessing options'])
+                   if 'aspect preprocessing options' in self.conf else '',
+                   '--out', outfile,
+                   '--back-end', 'src',
+                   '--debug', 'DEBUG'
+               ] + \
+               (['--keep'] if self.conf['keep intermediate files'] else []) + \
+               (['--aspect', aspect] if aspect else ['--stage', 'C-backend']) + \
+               ['--', '-include', self.conf['LDV inline Assembler header file']] + \
+               klever.core.vtg.utils.prepare_cif_opts(opts, self.clade, is_model) + \
+               ['-I' + self.clade.get_storage_path(p) for p in self.conf['working source trees']]
+
     def __weave(self, infile, opts, aspect, outfile, cwd, is_model):
         klever.core.utils.execute(
             self.logger,
-            tuple(
-                [
-                    klever.core.vtg.utils.get_cif_or_aspectator_exec(self.conf, 'cif'),
-                    '--in', infile,
-                    # Besides header files specific for requirements specifications will be searched for.
-                    '--general-opts',
-                    '-I' + os.path.join(os.path.dirname(self.conf['specifications base']), 'include'),
-                    '--aspect-preprocessing-opts', ' '.join(self.conf['aspect preprocessing options'])
-                    if 'aspect preprocessing options' in self.conf else '',
-                    '--out', os.path.realpath(outfile),
-                    '--back-end', 'src',
-                    '--debug', 'DEBUG'
-                ] +
-                (['--keep'] if self.conf['keep intermediate files'] else []) +
-                (['--aspect', os.path.realpath(aspect)] if aspect else ['--stage', 'C-backend']) +
-                ['--', '-include', self.conf['LDV inline Assembler header file']] +
-                klever.core.vtg.utils.prepare_cif_opts(opts, self.clade, is_model) +
-                ['-I' + self.clade.get_storage_path(p) for p in self.conf['working source trees']]
-            ),
+            tuple(self.__get_cif_args(infile, opts, os.path.realpath(aspect) if aspect else None,
+                                      os.path.realpath(outfile), is_model)),
             env=self.env,
             cwd=cwd,
             timeout=0.01,
@@ -0,0 +1,209 @@
+#
+# Copyright (c) 2021 ISP RAS (http://www.ispras.ru)
+# Ivannikov Institute for System Programming of the Russian Academy of Sciences
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import os
+import json
+import shutil
+import logging
+import threading
+
+import pytest
+
+from klever.core.vtg.weaver import WeaverWorker
+
+ENV = {'LDV_INLINE_ASM_STUB': '', 'LDV_C_BACKEND_OMIT_TYPE_QUALS': '1'}
+CIF_VERSION = '/usr/bin/cif:100:1'
+
+
+class FakeClade:
+    def __init__(self, preprocess_cmds=False):
+        self.storage_dir = '/storage'
+        self.meta = {'conf': {'Compiler.preprocess_cmds': preprocess_cmds}}
+
+    def get_meta(self):
+        return self.meta
+
+    def get_storage_path(self, path):
+        return self.storage_dir + path
+
+
+@pytest.fixture
+def conf(tmp_path):
+    return {
+        'main working directory': str(tmp_path),
+        'cache directory': str(tmp_path / 'cache'),
+        'architecture': 'x86-64',
+        'code coverage details': 'All source files',
+        'CIF': {'cross compile prefix': ''},
+        'specifications base': str(tmp_path / 'specifications' / 'base.yml'),
+        'keep intermediate files': False,
+        'LDV inline Assembler header file': str(tmp_path / 'ldv-inline-asm.h'),
+        'working source trees': ['/src']
+    }
+
+
+@pytest.fixture
+def files(tmp_path):
+    infile = tmp_path / 'main.c'
+    infile.write_text('int main(void) { return 0; }\n')
+    aspect = tmp_path / 'models.aspect'
+    aspect.write_text('before: call(int main(void)) { }\n')
+    return str(infile), str(aspect)
+
+
+def get_worker(conf, grp_id='models', extra_cc=None, env=ENV, cif_version=CIF_VERSION, clade=None):
+    return WeaverWorker(conf, logging.getLogger(), 'Weaver', {}, {}, {'extra C files': []}, id='0',
+                        clade=clade or FakeClade(), clade_meta={'conf': {}}, env=dict(env), cif_version=cif_version,
+                        grp_id=grp_id, extra_cc=extra_cc, lock=threading.Lock())
+
+
+def get_cache_key(worker, infile, aspect, opts=('-DX',), cwd='/cwd', is_model=True, get_cross_refs=True):
+    return worker._WeaverWorker__get_cache_key(infile, list(opts), aspect, cwd, is_model, get_cross_refs)
+
+
+def test_cache_key(conf, files):
+    infile, aspect = files
+    key = get_cache_key(get_worker(conf), infile, aspect)
+
+    # The key does not depend on the worker and names of output files.
+    assert get_cache_key(get_worker(conf), infile, aspect) == key
+    # Unrelated environment variables are not taken into account.
+    assert get_cache_key(get_worker(conf, env=dict(ENV, HOME='/home')), infile, aspect) == key
+
+    keys = {key}
+
+    def add_key(new_key):
+        assert new_key not in keys
+        keys.add(new_key)
+
+    # Input file content
+    with open(infile, 'a', encoding='utf-8') as fp:
+        fp.write('int x;\n')
+    add_key(get_cache_key(get_worker(conf), infile, aspect))
+
+    # CIF options either from compiler commands or from the configuration
+    add_key(get_cache_key(get_worker(conf), infile, aspect, opts=('-DY',)))
+    add_key(get_cache_key(get_worker(dict(conf, **{'aspect preprocessing options': ['-DZ']})), infile, aspect))
+    add_key(get_cache_key(get_worker(dict(conf, **{'working source trees': ['/linux']})), infile, aspect))
+    add_key(get_cache_key(get_worker(dict(conf, CIF={'cross compile prefix': 'arm-'})), infile, aspect))
+    # Build options are dropped for preprocessed input files except for models.
+    assert get_cache_key(get_worker(conf, clade=FakeClade(True)), infile, aspect) == \
+        get_cache_key(get_worker(conf), infile, aspect)
+    add_key(get_cache_key(get_worker(conf, clade=FakeClade(True)), infile, aspect, is_model=False))
+
+    # Aspect content and its absence
+    with open(aspect, 'a', encoding='utf-8') as fp:
+        fp.write('after: call(int main(void)) { }\n')
+    add_key(get_cache_key(get_worker(conf), infile, aspect))
+    add_key(get_cache_key(get_worker(conf), infile, None))
+
+    # CIF version
+    add_key(get_cache_key(get_worker(conf, cif_version='/usr/bin/cif:100:2'), infile, aspect))
+
+    # Environment
+    add_key(get_cache_key(get_worker(conf, env=dict(ENV, LDV_C_BACKEND_OMIT_TYPE_QUALS='0')), infile, aspect))
+
+    # Cross references and the working directory they refer to
+    add_key(get_cache_key(get_worker(conf), infile, aspect, get_cross_refs=False))
+    add_key(get_cache_key(get_worker(conf), infile, aspect, cwd='/other'))
+
+
+@pytest.fixture
+def weave(conf, files, monkeypatch):
+    """Run Weaver worker for the input file in new working directories with emulation of CIF and Clade."""
+    infile, _ = files
+    with open(os.path.join(conf['main working directory'], 'cc.json'), 'w', encoding='utf-8') as fp:
+        json.dump({'in': [infile], 'opts': ['-DX'], 'cwd': '/cwd'}, fp)
+
+    woven = []
+
+    def fake_weave(self, infile, opts, aspect, outfile, cwd, is_model):
+        woven.append(infile)
+        with open(infile, encoding='utf-8') as fin, open(outfile, 'w', encoding='utf-8') as fout:
+            fout.write('/* woven */\n' + fin.read())
+        self.vals['extra C files'].append({'C file': os.path.relpath(outfile, self.conf['main working directory'])})
+
+    def fake_get_cross_refs(self, infile, opts, outfile, cwd):
+        model = os.path.join(outfile + ' additional sources', 'generated models', 'model.c')
+        os.makedirs(os.path.dirname(model))
+        with open(model, 'w', encoding='utf-8') as fp:
+            fp.write('void model(void) {}\n')
+        self._WeaverWorker__merge_additional_srcs(outfile + ' additional sources')
+
+    monkeypatch.setattr(WeaverWorker, '_WeaverWorker__weave', fake_weave)
+    monkeypatch.setattr(WeaverWorker, '_WeaverWorker__get_cross_refs', fake_get_cross_refs)
+    os.makedirs(conf['cache directory'])
+
+    def run(task):
+        work_dir = os.path.join(conf['main working directory'], task)
+        os.makedirs(work_dir)
+        monkeypatch.chdir(work_dir)
+        worker = get_worker(conf, extra_cc={'CC': 'cc.json'})
+        worker.process_extra_cc()
+        return worker.vals['extra C files']
+
+    run.woven = woven
+    return run
+
+
+def get_cache_entries(conf):
+    # Skip files used for locking cache entries.
+    return sorted(entry for entry in os.listdir(conf['cache directory']) if not entry.endswith(('.tmp', '.lock')))
+
+
+def test_cache_publish(conf, weave):
+    weave('task1')
+    assert len(weave.woven) == 1
+    entries = get_cache_entries(conf)
+    assert len(entries) == 1
+    assert sorted(os.listdir(os.path.join(conf['cache directory'], entries[0]))) == ['additional sources', 'main.i']
+
+    # The other task gets both the woven in C file and cross references from the cache.
+    extra_c_files = weave('task2')
+    assert len(weave.woven) == 1
+    with open(os.path.join(conf['main working directory'], extra_c_files[0]['C file']), encoding='utf-8') as fp:
+        assert fp.read().startswith('/* woven */\n')
+    assert os.path.isfile(os.path.join('additional sources', 'generated models', 'model.c'))
+
+
+def test_cache_publish_failure(conf, weave, monkeypatch):
+    def fail(*args, **kwargs):
+        raise OSError('No space left on device')
+
+    # The worker is killed when filling in the cache entry.
+    with monkeypatch.context() as m:
+        m.setattr(shutil, 'copytree', fail)
+        with pytest.raises(OSError):
+            weave('task1')
+    entries = get_cache_entries(conf)
+    assert len(entries) == 1
+    assert entries[0].endswith('.part')
+
+    # The worker fails to weave in the C file.
+    with monkeypatch.context() as m:
+        m.setattr(WeaverWorker, '_WeaverWorker__weave', fail)
+        with pytest.raises(OSError):
+            weave('task2')
+    assert get_cache_entries(conf) == entries
+
+    # The next worker does not see the incomplete cache entry and replaces it with the complete one.
+    weave('task3')
+    assert len(weave.woven) == 2
+    entry = os.path.join(conf['cache directory'], entries[0][:-len('.part')])
+    assert get_cache_entries(conf) == [os.path.basename(entry)]
+    assert sorted(os.listdir(entry)) == ['additional sources', 'main.i']
+    assert os.listdir(os.path.join(entry, 'additional sources')) == ['generated models']